@@ -1,38 +1,91 @@
-# Create a comprehensive starter TSV user dictionary for university abbreviations / slang.
-# Format: <token>\tNNP
-
-entries = [
-"컴공", "컴과", "소공", "인지",
-"전전컴", "전컴"
-"화공",
-"건공", "토공", 
-"환공", "환원", 
-"도공", "교공", "도행"
-"생공",
-
-"국문", "영문", "영문과", "중문", "중문과",
-"사학", "사복", 
-
-"미대", "시디", "산디", "체대", "음대",
-
-"과사", "과방", "학식", "중도", "전필", "전선", "일선", "교선", "교필", "공소", "선수", 
-"랩실", "랩장", "졸논", "졸작"
-
-"공대", "인문대", "정경대", "경영대", "예체대", "자과대", "도과대", "자융대"
-]
-
-# Deduplicate while preserving order
-seen = set()
-deduped = []
-for e in entries:
-    if e and e not in seen:
-        deduped.append(e)
-        seen.add(e)
-
-# Write to TSV
-path = "/mnt/data/user_dic.tsv"
-with open(path, "w", encoding="utf-8") as f:
-    for token in deduped:
-        f.write(f"{token}\tNNP\n")
-
-path
+# Build the campus abbreviation / slang dictionary.
+#
+#   python data/make_tsv.py            → data/abbreviations.tsv, data/user_dic.tsv
+#
+# abbreviations.tsv : <줄임말>\t<정식 명칭>\t<종류>   (런타임 확장기 uosai.preprocess.abbrev 가 읽음)
+# user_dic.tsv      : <token>\tNNP                  (형태소 분석기 사용자 사전)
+#
+# 예전에는 문자열 리스트였는데 쉼표가 빠진 항목("전컴" "화공" → "전컴화공")이 조용히 합쳐졌다.
+# 이제 dict 리터럴 + 검증으로, 같은 실수는 문법 오류나 검증 실패로 드러난다.
+import os, sys
+
+KINDS = ("department", "college", "term")
+
+# 줄임말 → 정식 명칭 (college 는 categories.CATEGORY_LABELS 의 게시판 이름과 같아야 함)
+# 문맥 없이 뜻이 갈리는 말은 넣지 않는다: 선수(운동선수/선수과목), 생공(생명공학/생명과학과 등)
+ENTRIES = {
+    "department": {
+        "컴공": "컴퓨터과학부", "컴과": "컴퓨터과학부",
+        "소공": "소프트웨어공학",
+        "인지": "인공지능학과",
+        "전전컴": "전자전기컴퓨터공학부", "전컴": "전자전기컴퓨터공학부",
+        "화공": "화학공학과",
+        "건공": "건축공학", "토공": "토목공학과",
+        "환공": "환경공학부", "환원": "환경원예학과",
+        "도공": "도시공학과", "교공": "교통공학과", "도행": "도시행정학과",
+        "국문": "국어국문학과",
+        "영문": "영어영문학과", "영문과": "영어영문학과",
+        "중문": "중국어문화학과", "중문과": "중국어문화학과",
+        "사학": "국사학과", "사복": "사회복지학과",
+        "산디": "산업디자인학과", "시디": "시각디자인",
+    },
+    "college": {
+        "공대": "공과대학", "인문대": "인문대학", "정경대": "정경대학", "경영대": "경영대학",
+        "예체대": "예술체육대학", "자과대": "자연과학대학", "도과대": "도시과학대학", "자융대": "자유융합대학",
+        "미대": "예술체육대학", "체대": "예술체육대학", "음대": "예술체육대학",
+    },
+    "term": {
+        "과사": "학과사무실", "과방": "학과 학생회실", "학식": "학생식당", "중도": "중앙도서관",
+        "전필": "전공필수", "전선": "전공선택", "일선": "일반선택", "교선": "교양선택", "교필": "교양필수",
+        "공소": "공학소양",
+        "랩실": "연구실", "랩장": "연구실장", "졸논": "졸업논문", "졸작": "졸업작품",
+    },
+}
+
+COLLEGE_LABELS = {"공과대학", "인문대학", "정경대학", "도시과학대학", "예술체육대학",
+                  "경영대학", "자연과학대학", "자유융합대학"}
+
+
+def validate(entries: dict) -> list:
+    """(abbr, canonical, kind) 목록. 문제가 있으면 ValueError"""
+    rows, seen, errors = [], {}, []
+    for kind, table in entries.items():
+        if kind not in KINDS:
+            errors.append(f"unknown kind: {kind}")
+        for abbr, canon in table.items():
+            if not (2 <= len(abbr) <= 3) or not all("가" <= ch <= "힣" for ch in abbr):
+                errors.append(f"suspicious abbreviation (합쳐진 항목?): {abbr!r}")
+            if not canon or "\t" in canon or len(canon) <= len(abbr):
+                errors.append(f"bad canonical for {abbr!r}: {canon!r}")
+            if kind == "college" and canon not in COLLEGE_LABELS:
+                errors.append(f"college {abbr!r} → {canon!r} is not a board label")
+            if abbr in seen:
+                errors.append(f"duplicate abbreviation: {abbr!r} ({seen[abbr]}, {kind})")
+            seen[abbr] = kind
+            rows.append((abbr, canon, kind))
+    if errors:
+        raise ValueError("\n".join(errors))
+    return rows
+
+
+def main() -> int:
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.abspath(__file__))
+    rows = validate(ENTRIES)
+
+    path = os.path.join(out_dir, "abbreviations.tsv")
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("abbr\tcanonical\tkind\n")
+        for abbr, canon, kind in rows:
+            f.write(f"{abbr}\t{canon}\t{kind}\n")
+
+    dic_path = os.path.join(out_dir, "user_dic.tsv")
+    with open(dic_path, "w", encoding="utf-8", newline="\n") as f:
+        for abbr, _, _ in rows:
+            f.write(f"{abbr}\tNNP\n")
+
+    print(f"{len(rows)} entries → {path}, {dic_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+# main.py : 컨테이너 ASGI 진입점 (Dockerfile APP_MODULE=main:app)
+import sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent / "src"))
+
+from uosai.chat.chatbot import app  # noqa: E402,F401
@@ -0,0 +1,97 @@
+# scripts/bench_embed.py
+# 길이 버킷 인코딩(embed_documents) vs 기존 단일 encode 호출 비교 벤치마크
+#
+#   python scripts/bench_embed.py                # 합성 청크 분포 (오프라인)
+#   python scripts/bench_embed.py --from-db      # MySQL notice → split_docs 실제 청크
+import sys, pathlib, argparse, random, time
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+
+from uosai.common.utils import (
+    CHUNK_SIZE, CHUNK_OVERLAP, fetch_all_rows, row_to_doc, split_docs, get_embedding_instance,
+)
+
+_WORDS = (
+    "2024학년도 1학기 교내장학금 신청 안내 대상 학부 재학생 제출 서류 성적증명서 "
+    "신청 기간 학생처 장학팀 문의 수강신청 정정 기간 졸업요건 복수전공 부전공 "
+    "이수 학점 전공필수 교양선택 온라인 포털 접수 마감 결과 발표 공지 참고 바랍니다"
+).split()
+
+
+def synthetic_chunks(n_docs: int, seed: int = 42) -> list[str]:
+    """
+    split_docs 출력과 비슷한 길이 분포의 합성 청크.
+    - 문서 길이: 로그정규(짧은 공지가 많고 긴 공지는 드묾)
+    - 문서 하나가 CHUNK_SIZE 단위로 잘리고 마지막 청크는 짧게 남음
+    """
+    rnd = random.Random(seed)
+    chunks: list[str] = []
+    step = max(1, CHUNK_SIZE - CHUNK_OVERLAP)
+    for _ in range(n_docs):
+        doc_len = int(min(12000, max(40, rnd.lognormvariate(6.6, 0.9))))
+        words: list[str] = []
+        size = 0
+        while size < doc_len:
+            w = rnd.choice(_WORDS)
+            words.append(w)
+            size += len(w) + 1
+        doc = " ".join(words)[:doc_len]
+        for start in range(0, len(doc), step):
+            chunks.append(doc[start:start + CHUNK_SIZE])
+            if start + CHUNK_SIZE >= len(doc):
+                break
+    return chunks
+
+
+def db_chunks() -> list[str]:
+    rows = fetch_all_rows()
+    return [d.page_content for d in split_docs([row_to_doc(r) for r in rows])]
+
+
+def timed(fn, repeat: int) -> tuple[float, object]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="embed_documents 길이 버킷 벤치마크")
+    ap.add_argument("--from-db", action="store_true", help="MySQL notice 테이블의 실제 청크 사용")
+    ap.add_argument("--docs", type=int, default=300, help="합성 문서 수")
+    ap.add_argument("--repeat", type=int, default=2)
+    args = ap.parse_args()
+
+    texts = db_chunks() if args.from_db else synthetic_chunks(args.docs)
+    if not texts:
+        print("No chunks")
+        return 1
+
+    emb = get_embedding_instance()
+    model = emb.model
+    lengths = emb._token_lengths(texts)
+    print(f"chunks={len(texts)} chars(avg)={np.mean([len(t) for t in texts]):.0f} "
+          f"tokens(avg/p50/max)={np.mean(lengths):.0f}/{np.median(lengths):.0f}/{max(lengths)}")
+
+    # 워밍업
+    model.encode(texts[:8], show_progress_bar=False)
+
+    # 기존 호출: 입력 순서 그대로 단일 encode
+    t_base, base = timed(lambda: model.encode(texts, convert_to_tensor=False, show_progress_bar=False), args.repeat)
+    t_new, new = timed(lambda: emb.embed_documents(texts), args.repeat)
+
+    new = np.asarray(new, dtype=np.float32)
+    max_diff = float(np.abs(np.asarray(base, dtype=np.float32) - new).max())
+
+    print(f"baseline  : {t_base:.2f}s  ({len(texts) / t_base:.1f} chunks/s)")
+    print(f"bucketed  : {t_new:.2f}s  ({len(texts) / t_new:.1f} chunks/s)")
+    print(f"speedup   : x{t_base / t_new:.2f}")
+    print(f"max |diff|: {max_diff:.2e}  (순서 복원 확인용)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+# scripts/bench_rerank.py
+# Reranker 백엔드별 지연/품질 비교 (고정 질의셋 data/bench/rerank_queries.json)
+#
+#   python scripts/bench_rerank.py                       # none(벡터 순서) vs local
+#   python scripts/bench_rerank.py --backends none,local,cohere
+import sys, pathlib, argparse, asyncio, json, time
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import numpy as np
+
+from uosai.common.utils import get_embedding_instance
+from uosai.chat.rerank import get_reranker
+
+
+def ranks_by_vector(emb, queries, passages):
+    """벡터 검색 순서 (rerank 없음 기준선)"""
+    P = np.asarray(emb.embed_documents([f"{p['title']}\n{p['text']}" for p in passages]), dtype=np.float32)
+    P /= np.linalg.norm(P, axis=1, keepdims=True)
+    out, lat = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        v = np.asarray(emb.embed_query(q["query"]), dtype=np.float32)
+        order = np.argsort(-(P @ (v / np.linalg.norm(v))))
+        lat.append(time.perf_counter() - t0)
+        out.append([int(i) for i in order])
+    return out, lat
+
+
+async def ranks_by_reranker(rr, queries, passages, candidate_orders, lat):
+    """벡터 순서 후보 전체를 reranker로 재정렬 (질의별 지연은 lat에 누적)"""
+    out = []
+    for q, cand in zip(queries, candidate_orders):
+        texts = [f"{passages[i]['title']}\n{passages[i]['text']}" for i in cand]
+        t0 = time.perf_counter()
+        ranked = await rr.rerank(q["query"], texts, len(texts))
+        lat.append(time.perf_counter() - t0)
+        out.append([cand[i] for i, _ in ranked])
+    return out
+
+
+def report(name, queries, passages, orders, lat):
+    ids = [p["id"] for p in passages]
+    rr, top1 = [], 0
+    for q, order in zip(queries, orders):
+        ranked_ids = [ids[i] for i in order]
+        rank = next((k + 1 for k, pid in enumerate(ranked_ids) if pid in q["relevant"]), None)
+        rr.append(1.0 / rank if rank else 0.0)
+        top1 += int(rank == 1)
+    ms = np.asarray(lat) * 1000
+    print(f"{name:<8} top1={top1 / len(queries):.3f}  MRR={np.mean(rr):.3f}  "
+          f"p50={np.percentile(ms, 50):7.1f}ms  p95={np.percentile(ms, 95):7.1f}ms")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Reranker latency/quality benchmark")
+    ap.add_argument("--data", default=str(ROOT / "data" / "bench" / "rerank_queries.json"))
+    ap.add_argument("--backends", default="none,local")
+    args = ap.parse_args()
+
+    data = json.loads(pathlib.Path(args.data).read_text(encoding="utf-8"))
+    queries, passages = data["queries"], data["passages"]
+    print(f"queries={len(queries)} candidates/query={len(passages)}")
+
+    emb = get_embedding_instance()
+    emb.embed_query("워밍업")
+    vec_orders, vec_lat = ranks_by_vector(emb, queries, passages)
+
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        if backend == "none":
+            report("none", queries, passages, vec_orders, vec_lat)
+            continue
+        rr = get_reranker(backend)
+        rr.warmup()
+        lat: list = []
+        orders = asyncio.run(ranks_by_reranker(rr, queries, passages, vec_orders, lat))
+        report(backend, queries, passages, orders, lat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
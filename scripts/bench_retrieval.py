@@ -0,0 +1,224 @@
+# scripts/bench_retrieval.py
+# 검색 품질(recall@k/MRR)과 단계별 지연(embed/search/rerank p50/p95/p99) 벤치마크
+# 고정 스냅샷(data/bench/notices_snapshot.jsonl)으로 메모리 인덱스를 만들어 완전 오프라인으로 실행.
+#
+#   python scripts/bench_retrieval.py                              # 결과 출력
+#   python scripts/bench_retrieval.py --rerank local --out r.json  # rerank 포함, JSON 리포트
+#   python scripts/bench_retrieval.py --save-baseline              # 현재 결과를 기준선으로 저장
+#   python scripts/bench_retrieval.py --check --max-regression 0.2 # CI: 기준선 대비 p95 20%↑ 또는 품질 하락 시 exit 1
+#                                                                  #     (기준선 파일이 없으면 exit 2)
+#   python scripts/bench_retrieval.py --export                     # MySQL → 스냅샷 갱신 (DB 필요)
+import sys, pathlib, argparse, asyncio, json, time
+from datetime import date
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import numpy as np
+
+from uosai.common.utils import row_to_doc, split_docs, get_embedding_instance
+from uosai.common.local_index import LocalVectorStore
+from uosai.chat.retrieval import search_notices
+from uosai.preprocess.query_parser import parse_query
+from uosai.preprocess.abbrev import expand_query
+
+BENCH_DIR = ROOT / "data" / "bench"
+STAGES = ("embed", "search", "rerank")
+
+
+def load_snapshot(path: pathlib.Path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def export_snapshot(path: pathlib.Path) -> int:
+    from uosai.common.utils import fetch_all_rows
+    rows = fetch_all_rows()
+    with open(path, "w", encoding="utf-8") as f:
+        for r in rows:
+            r = dict(r)
+            r["posted_date"] = r["posted_date"].isoformat() if r.get("posted_date") else None
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    print(f"exported {len(rows)} notices → {path}")
+    return 0
+
+
+def notice_key(doc) -> str:
+    return f"{doc.metadata.get('category')}:{doc.metadata.get('post_number')}"
+
+
+def run(queries, store, emb, reranker, today: date, k: int):
+    """질의별 공지 순위(청크 → 공지 단위 중복 제거)와 단계별 지연(초)"""
+    departments = sorted({d.metadata.get("department") for d in store.docs if d.metadata.get("department")})
+    rankings, lat = [], {s: [] for s in STAGES}
+    for q in queries:
+        req = parse_query(q["query"], today)
+        text = expand_query(req.get("search_query") or q["query"])
+
+        t0 = time.perf_counter()
+        vec = emb.embed_query(text)
+        lat["embed"].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        hits = search_notices(store, vec, req, k, departments, today)
+        lat["search"].append(time.perf_counter() - t0)
+
+        if reranker is not None and hits:
+            passages = [f"{d.metadata.get('title', '')}\n{d.page_content}" for d, _ in hits]
+            t0 = time.perf_counter()
+            ranked = asyncio.run(reranker.rerank(text, passages, len(passages)))
+            lat["rerank"].append(time.perf_counter() - t0)
+            hits = [hits[i] for i, _ in ranked]
+
+        seen = []
+        for d, _ in hits:
+            key = notice_key(d)
+            if key not in seen:
+                seen.append(key)
+        rankings.append(seen)
+    return rankings, lat
+
+
+def validate_queries(queries, rows):
+    """질의 파일 점검 — 빈 질의/빈 relevant(recall 분모 0)/스냅샷에 없는 공지 키"""
+    known = {f"{r.get('category')}:{r.get('post_number')}" for r in rows}
+    errors = []
+    for i, q in enumerate(queries):
+        if not str(q.get("query") or "").strip():
+            errors.append(f"#{i}: empty query")
+        rel = q.get("relevant")
+        if not isinstance(rel, list) or not rel:
+            errors.append(f"#{i} {q.get('query')!r}: relevant must be a non-empty list")
+            continue
+        missing = [key for key in rel if key not in known]
+        if missing:
+            errors.append(f"#{i} {q.get('query')!r}: not in snapshot {missing}")
+    return errors
+
+
+def evaluate(queries, rankings, lat, ks):
+    recall = {f"recall@{n}": 0.0 for n in ks}
+    rr, misses = [], []
+    for q, ranked in zip(queries, rankings):
+        rel = set(q["relevant"])
+        for n in ks:
+            recall[f"recall@{n}"] += len(rel & set(ranked[:n])) / len(rel)
+        rank = next((i + 1 for i, key in enumerate(ranked) if key in rel), None)
+        rr.append(1.0 / rank if rank else 0.0)
+        if rank != 1:
+            misses.append({"query": q["query"], "rank": rank, "top": ranked[:3]})
+    out = {name: round(v / len(queries), 4) for name, v in recall.items()}
+    out["mrr"] = round(float(np.mean(rr)), 4)
+    latency = {}
+    for s, xs in lat.items():
+        if xs:
+            ms = np.asarray(xs) * 1000
+            latency[s] = {f"p{p}_ms": round(float(np.percentile(ms, p)), 2) for p in (50, 95, 99)}
+    return {"quality": out, "latency": latency, "misses": misses}
+
+
+def compare(result, baseline, max_regression: float, min_recall: float, ks):
+    """기준선 대비 회귀 목록 (비어 있으면 통과)"""
+    fails = []
+    for name, v in baseline.get("quality", {}).items():
+        cur = result["quality"].get(name)
+        if cur is not None and cur + 1e-9 < v:
+            fails.append(f"{name} {v:.3f} → {cur:.3f}")
+    for s, base in baseline.get("latency", {}).items():
+        cur = result["latency"].get(s, {}).get("p95_ms")
+        if cur is not None and base.get("p95_ms") and cur > base["p95_ms"] * (1 + max_regression):
+            fails.append(f"{s} p95 {base['p95_ms']:.1f}ms → {cur:.1f}ms (> +{max_regression:.0%})")
+    name = f"recall@{max(ks)}"
+    if result["quality"][name] < min_recall:
+        fails.append(f"{name} {result['quality'][name]:.3f} < {min_recall:.3f}")
+    return fails
+
+
+def report(result, n_notices, n_chunks, index_sec):
+    print(f"notices={n_notices} chunks={n_chunks} index_build={index_sec:.2f}s")
+    print("  ".join(f"{k}={v:.3f}" for k, v in result["quality"].items()))
+    for s, v in result["latency"].items():
+        print(f"{s:<7} p50={v['p50_ms']:7.1f}ms  p95={v['p95_ms']:7.1f}ms  p99={v['p99_ms']:7.1f}ms")
+    for m in result["misses"]:
+        print(f"  miss rank={m['rank']} {m['query']!r} top={m['top']}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Offline retrieval quality/latency benchmark")
+    ap.add_argument("--snapshot", default=str(BENCH_DIR / "notices_snapshot.jsonl"))
+    ap.add_argument("--queries", default=str(BENCH_DIR / "retrieval_queries.json"))
+    ap.add_argument("--rerank", choices=["none", "local", "cohere"], default="none")
+    ap.add_argument("--k", type=int, default=20, help="벡터 검색 후보 수 (청크, RETRIEVE_K)")
+    ap.add_argument("--repeat", type=int, default=3, help="지연 분위수 안정화를 위한 반복 횟수")
+    ap.add_argument("--out", help="JSON 리포트 경로")
+    ap.add_argument("--baseline", default=str(BENCH_DIR / "retrieval_baseline.json"))
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--check", action="store_true", help="게이트 모드: 기준선이 없으면 실패 (exit 2)")
+    ap.add_argument("--max-regression", type=float, default=0.2, help="허용 p95 지연 증가율")
+    ap.add_argument("--min-recall", type=float, default=0.0, help="recall@max(k) 하한")
+    ap.add_argument("--export", action="store_true", help="MySQL 공지를 스냅샷으로 덤프하고 종료")
+    args = ap.parse_args()
+
+    snapshot = pathlib.Path(args.snapshot)
+    if args.export:
+        return export_snapshot(snapshot)
+
+    spec = json.loads(pathlib.Path(args.queries).read_text(encoding="utf-8"))
+    queries, ks = spec["queries"], spec.get("k", [1, 3, 5, 10])
+    today = date.fromisoformat(spec["today"]) if spec.get("today") else date.today()
+
+    rows = load_snapshot(snapshot)
+    errors = validate_queries(queries, rows)
+    for e in errors:
+        print(f"INVALID: {e}")
+    if errors:
+        return 2
+    baseline = pathlib.Path(args.baseline)
+    if args.check and not args.save_baseline and not baseline.exists():
+        print(f"--check: baseline {baseline} not found (먼저 --save-baseline 으로 기준선을 만들어 커밋)")
+        return 2
+
+    emb = get_embedding_instance()
+    emb.embed_query("워밍업")
+    t0 = time.perf_counter()
+    docs = split_docs([row_to_doc(r) for r in rows])
+    store = LocalVectorStore.from_documents(docs, emb)
+    index_sec = time.perf_counter() - t0
+
+    reranker = None
+    if args.rerank != "none":
+        from uosai.chat.rerank import get_reranker
+        reranker = get_reranker(args.rerank)
+        reranker.warmup()
+
+    lat = {s: [] for s in STAGES}
+    for _ in range(max(1, args.repeat)):
+        rankings, run_lat = run(queries, store, emb, reranker, today, args.k)
+        for s in STAGES:
+            lat[s] += run_lat[s]
+    result = evaluate(queries, rankings, lat, ks)
+    result.update({"rerank": args.rerank, "k": args.k, "queries": len(queries),
+                   "notices": len(rows), "chunks": len(docs), "index_build_sec": round(index_sec, 3)})
+    report(result, len(rows), len(docs), index_sec)
+
+    if args.out:
+        pathlib.Path(args.out).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"report → {args.out}")
+    if args.save_baseline:
+        keep = {k: result[k] for k in ("quality", "latency", "rerank", "k")}
+        baseline.write_text(json.dumps(keep, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"baseline → {baseline}")
+        return 0
+    if baseline.exists():
+        base = json.loads(baseline.read_text(encoding="utf-8"))
+        if base.get("rerank", args.rerank) != args.rerank:
+            print(f"baseline rerank={base.get('rerank')} ≠ {args.rerank}, latency 비교 생략")
+            base.pop("latency", None)
+        fails = compare(result, base, args.max_regression, args.min_recall, ks)
+    else:
+        fails = compare(result, {}, args.max_regression, args.min_recall, ks)
+    for f in fails:
+        print(f"REGRESSION: {f}")
+    return 1 if fails else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,221 @@
+# scripts/load_chat.py
+# 챗 API 부하 테스트: 가상 사용자들이 여러 턴짜리 세션을 반복 재생, 워커 수별 처리량/지연/메모리 측정
+# LLM/Reranker는 지연만 흉내 내는 가짜(uosai.chat.loadtest), 검색은 스냅샷 공지의 로컬 인덱스.
+#
+#   python scripts/load_chat.py --mode inproc --users 20 --duration 30       # 같은 프로세스에서 ASGI 직접 호출
+#   python scripts/load_chat.py --workers 1,2,4 --users 50 --stream          # localhost uvicorn 워커 수별 비교
+#   python scripts/load_chat.py --url http://127.0.0.1:9000 --users 50       # 이미 떠 있는 서버 (실제 LLM 주의)
+#   LOADTEST_FIRST_MS=800 LOADTEST_FAKE_EMBED=1 python scripts/load_chat.py  # 가짜 지연/임베딩 조정
+import os, sys, json, time, random, asyncio, argparse, pathlib, subprocess, uuid
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import httpx
+import numpy as np
+
+QUERIES = ROOT / "data" / "bench" / "retrieval_queries.json"
+
+# 첫 질문 뒤에 이어지는 후속 질문 (맥락 의존 → LLM 추출 경로) / 잡담
+FOLLOW_UPS = [
+    "그거 신청 기간 언제까지야?", "대상이 누구야?", "어디서 신청해?", "대학원생도 돼?",
+    "제출 서류는 뭐가 필요해?", "그럼 문의는 어디로 해?",
+]
+SMALLTALK = ["고마워!", "안녕", "오늘 날씨 좋다", "ㅋㅋ 알겠어"]
+
+
+def make_session(rng: random.Random, first_questions):
+    """첫 질문 1개 + 후속 0~3개 (+ 가끔 잡담)"""
+    turns = [rng.choice(first_questions)]
+    turns += rng.sample(FOLLOW_UPS, rng.randint(0, 3))
+    if rng.random() < 0.3:
+        turns.append(rng.choice(SMALLTALK))
+    return turns
+
+
+# ===== 클라이언트 =====
+async def one_turn(client: httpx.AsyncClient, query: str, session_id: str, stream: bool):
+    """(전체 지연, 첫 토큰 지연 또는 None, 성공 여부)"""
+    body = {"query": query, "session_id": session_id}
+    t0 = time.perf_counter()
+    if not stream:
+        r = await client.post("/chat", json=body)
+        return time.perf_counter() - t0, None, r.status_code == 200
+    ttft, ok = None, False
+    async with client.stream("POST", "/chat/stream", json=body) as r:
+        async for line in r.aiter_lines():
+            if line.startswith("event: token") and ttft is None:
+                ttft = time.perf_counter() - t0
+            elif line.startswith("event: done"):
+                ok = True
+            elif line.startswith("event: error"):
+                break
+    return time.perf_counter() - t0, ttft, ok and r.status_code == 200
+
+
+async def virtual_user(client, uid: int, first_questions, deadline: float, think_ms: float,
+                       stream: bool, seed: int, stats: dict):
+    rng = random.Random(seed + uid)
+    while time.perf_counter() < deadline:
+        session_id = f"load-{uid}-{uuid.uuid4().hex[:8]}"
+        for query in make_session(rng, first_questions):
+            if time.perf_counter() >= deadline:
+                return
+            try:
+                lat, ttft, ok = await one_turn(client, query, session_id, stream)
+            except httpx.HTTPError:
+                lat, ttft, ok = None, None, False
+            if ok:
+                stats["latency"].append(lat)
+                if ttft is not None:
+                    stats["ttft"].append(ttft)
+            else:
+                stats["errors"] += 1
+            # 사람이 답을 읽고 다음 질문을 치는 시간
+            await asyncio.sleep(rng.expovariate(1000 / think_ms) if think_ms > 0 else 0)
+        stats["sessions"] += 1
+
+
+async def drive(client, args, first_questions) -> dict:
+    stats = {"latency": [], "ttft": [], "errors": 0, "sessions": 0}
+    # 워밍업 (첫 요청의 지연 제외)
+    await one_turn(client, first_questions[0], "load-warmup", False)
+    t0 = time.perf_counter()
+    deadline = t0 + args.duration
+    await asyncio.gather(*(
+        virtual_user(client, i, first_questions, deadline, args.think_ms, args.stream, args.seed, stats)
+        for i in range(args.users)
+    ))
+    stats["wall_sec"] = time.perf_counter() - t0
+    return stats
+
+
+# ===== 메모리 =====
+def rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def child_pids(pid: int):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", encoding="utf-8") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+# ===== 실행 모드 =====
+async def run_inproc(args, first_questions) -> dict:
+    from uosai.chat.chatbot import create_app
+    from uosai.chat.loadtest import build_fake_service
+
+    app = create_app(build_fake_service())
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+            stats = await drive(client, args, first_questions)
+    stats["rss_mb"] = [round(rss_mb(os.getpid()), 1)]
+    return stats
+
+
+async def run_http(args, first_questions, url: str) -> dict:
+    limits = httpx.Limits(max_connections=args.users + 4, max_keepalive_connections=args.users + 4)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        return await drive(client, args, first_questions)
+
+
+def spawn_server(workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    cmd = [sys.executable, "-m", "uvicorn", "uosai.chat.loadtest:create_fake_app", "--factory",
+           "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=str(ROOT), env=env)
+    deadline = time.time() + 300   # 워커마다 모델/인덱스 로드
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                # 모든 워커가 준비될 때까지 조금 더 기다림 (health는 먼저 뜬 워커가 받을 수 있음)
+                time.sleep(2 + workers)
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(1)
+    proc.terminate()
+    raise RuntimeError("server did not become ready")
+
+
+def summarize(label: str, stats: dict) -> dict:
+    lat = np.asarray(stats["latency"]) * 1000
+    ttft = np.asarray(stats["ttft"]) * 1000
+    pct = lambda xs, p: round(float(np.percentile(xs, p)), 1) if len(xs) else None
+    n = len(lat) + stats["errors"]
+    out = {
+        "label": label,
+        "turns": len(lat), "sessions": stats["sessions"], "errors": stats["errors"],
+        "error_rate": round(stats["errors"] / n, 4) if n else 0.0,
+        "rps": round(len(lat) / stats["wall_sec"], 2) if stats["wall_sec"] else 0.0,
+        "latency_ms": {f"p{p}": pct(lat, p) for p in (50, 95, 99)},
+        "ttft_ms": {f"p{p}": pct(ttft, p) for p in (50, 95, 99)} if len(ttft) else None,
+        "rss_mb": stats.get("rss_mb", []),
+    }
+    lm = out["latency_ms"]
+    line = (f"{label:<12} rps={out['rps']:7.2f}  turns={out['turns']:<6} err={out['error_rate']:.2%}  "
+            f"p50={lm['p50']}ms p95={lm['p95']}ms p99={lm['p99']}ms")
+    if out["ttft_ms"]:
+        line += f"  ttft_p95={out['ttft_ms']['p95']}ms"
+    if out["rss_mb"]:
+        line += f"  rss/worker={'/'.join(f'{m:.0f}' for m in out['rss_mb'])}MB"
+    print(line, flush=True)
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Chat API load test (fake LLM/reranker, local vector store)")
+    ap.add_argument("--mode", choices=["inproc", "http"], default="http")
+    ap.add_argument("--url", help="이미 떠 있는 서버 (지정하면 서버를 띄우지 않음)")
+    ap.add_argument("--workers", default="1", help="http 모드 uvicorn 워커 수 목록, 예: 1,2,4")
+    ap.add_argument("--port", type=int, default=9100)
+    ap.add_argument("--users", type=int, default=20, help="동시 가상 사용자 수")
+    ap.add_argument("--duration", type=float, default=30, help="워커 수별 측정 시간(초)")
+    ap.add_argument("--think-ms", type=float, default=1000, help="턴 사이 평균 대기(지수 분포)")
+    ap.add_argument("--stream", action="store_true", help="/chat/stream 으로 첫 토큰 지연도 측정")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="JSON 리포트 경로")
+    args = ap.parse_args()
+
+    first_questions = [q["query"] for q in json.loads(QUERIES.read_text(encoding="utf-8"))["queries"]]
+    print(f"users={args.users} duration={args.duration}s think={args.think_ms}ms stream={args.stream} "
+          f"cpus={os.cpu_count()}")
+
+    results = []
+    if args.url:
+        results.append(summarize("external", asyncio.run(run_http(args, first_questions, args.url))))
+    elif args.mode == "inproc":
+        results.append(summarize("inproc", asyncio.run(run_inproc(args, first_questions))))
+    else:
+        for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+            proc = spawn_server(workers, args.port)
+            try:
+                stats = asyncio.run(run_http(args, first_questions, f"http://127.0.0.1:{args.port}"))
+                stats["rss_mb"] = [round(rss_mb(p), 1) for p in child_pids(proc.pid)] or [round(rss_mb(proc.pid), 1)]
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+            results.append(summarize(f"workers={workers}", stats))
+
+    if args.out:
+        report = {"users": args.users, "duration_sec": args.duration, "think_ms": args.think_ms,
+                  "stream": args.stream, "cpus": os.cpu_count(), "results": results}
+        pathlib.Path(args.out).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"report → {args.out}")
+    return 0 if all(r["turns"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
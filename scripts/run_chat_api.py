@@ -1 +1,13 @@
-﻿print('Hello from run_chat_api')
+﻿# scripts/run_chat_api.py
+import os, sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import uvicorn
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "uosai.chat.chatbot:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "9000")),
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
@@ -0,0 +1,42 @@
+# scripts/run_crawl_queue.py
+# crawl_job 큐 모드 (마이그레이션 009 필요)
+#
+#   python scripts/run_crawl_queue.py enqueue                # 게시판 목록 → 작업 등록 (cron 등에서 주기 실행)
+#   python scripts/run_crawl_queue.py work                   # 큐가 빌 때까지 처리 (여러 프로세스/러너에서 동시 실행 가능)
+#   python scripts/run_crawl_queue.py work --loop            # 상주 워커
+#   python scripts/run_crawl_queue.py status
+import sys, pathlib, argparse
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from uosai.common.metrics import run_job
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="MySQL-backed crawl job queue")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    enq = sub.add_parser("enqueue", help="최근 목록을 작업으로 등록")
+    enq.add_argument("--retry-failed", action="store_true", help="failed 작업도 다시 pending 으로")
+    work = sub.add_parser("work", help="작업 처리")
+    work.add_argument("--max-jobs", type=int)
+    work.add_argument("--loop", action="store_true", help="큐가 비어도 종료하지 않고 대기")
+    work.add_argument("--poll-sec", type=float, default=10.0)
+    sub.add_parser("status", help="상태별 작업 수")
+    args = ap.parse_args()
+
+    from uosai.crawler import notice_crawler as crawler
+
+    if args.cmd == "enqueue":
+        run_job("crawler.enqueue", lambda: crawler.enqueue_recent(args.retry_failed))
+    elif args.cmd == "work":
+        run_job("crawler.worker", lambda: crawler.run_worker(args.max_jobs, not args.loop, args.poll_sec))
+    else:
+        from uosai.common.job_queue import status_counts
+        with crawler.mysql_conn() as conn:
+            cur = conn.cursor()
+            print(status_counts(cur))
+            cur.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
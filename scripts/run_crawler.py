@@ -3,6 +3,10 @@ import sys, pathlib
 sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
 
 from uosai.crawler.notice_crawler import main
+from uosai.common.metrics import run_job
+from uosai.common.profiling import profile_args, profiled
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    # --profile cprofile|sample, --trace-memory (또는 PROFILE / PROFILE_MEMORY 환경변수)
+    mode, memory = profile_args()
+    raise SystemExit(run_job("crawler", lambda: profiled("crawler", main, mode, memory)))
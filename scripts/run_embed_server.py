@@ -0,0 +1,22 @@
+# scripts/run_embed_server.py
+# 임베딩 서버: 모델 1벌 + 동적 마이크로 배칭 (uosai.common.embed_service)
+#
+#   python scripts/run_embed_server.py                                # unix:/tmp/uosai-embed.sock
+#   EMBED_SERVICE_URL=http://127.0.0.1:9300 python scripts/run_embed_server.py
+import os, sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import uvicorn
+
+from uosai.common.embed_service import EMBED_SERVICE_URL, DEFAULT_SOCKET, split_url
+
+if __name__ == "__main__":
+    uds, base_url = split_url(EMBED_SERVICE_URL or DEFAULT_SOCKET)
+    kwargs = {"uds": uds} if uds else {
+        "host": base_url.split("://", 1)[-1].rsplit(":", 1)[0],
+        "port": int(base_url.rsplit(":", 1)[-1]),
+    }
+    if uds and os.path.exists(uds):
+        os.unlink(uds)   # 이전 실행이 남긴 소켓 파일
+    # 워커 1개: 모델을 한 벌만 올리는 것이 목적
+    uvicorn.run("uosai.common.embed_service:create_app", factory=True, workers=1, log_level="warning", **kwargs)
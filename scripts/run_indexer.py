@@ -3,6 +3,10 @@ import sys, pathlib
 sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
 
 from uosai.indexer.index import main
+from uosai.common.metrics import run_job
+from uosai.common.profiling import profile_args, profiled
 
 if __name__ == "__main__":
-    main()
+    # --profile cprofile|sample, --trace-memory (또는 PROFILE / PROFILE_MEMORY 환경변수)
+    mode, memory = profile_args()
+    run_job("indexer", lambda: profiled("indexer", main, mode, memory))
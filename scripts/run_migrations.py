@@ -0,0 +1,8 @@
+# scripts/run_migrations.py
+import sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from uosai.common.migrations import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
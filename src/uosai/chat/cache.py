@@ -0,0 +1,121 @@
+# src/uosai/chat/cache.py : 의미 기반 답변 캐시 (비슷한 질문 → 이전 답변 재사용)
+import os, time, threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+# ===== Env =====
+ANSWER_CACHE_ENABLED     = os.getenv("ANSWER_CACHE_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+ANSWER_CACHE_THRESHOLD   = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.93"))  # 질문 간 코사인 유사도
+ANSWER_CACHE_TTL_SEC     = int(os.getenv("ANSWER_CACHE_TTL_SEC", str(6 * 3600)))  # 크롤 주기와 동일
+ANSWER_CACHE_MAX         = int(os.getenv("ANSWER_CACHE_MAX", "5000"))
+ANSWER_CACHE_POLL_SEC    = int(os.getenv("ANSWER_CACHE_POLL_SEC", "60"))       # 인덱스 변경 폴링 주기
+# 새로 인덱싱된 공지 제목과 이 이상 비슷한 질문의 캐시는 무효화 (더 맞는 공지가 생겼을 수 있음)
+ANSWER_CACHE_INVALIDATE_SIM = float(os.getenv("ANSWER_CACHE_INVALIDATE_SIM", "0.6"))
+
+NoticeKey = Tuple[str, int]
+
+
+class CachedAnswer(NamedTuple):
+    response: str
+    recommended_notice: Optional[Dict[str, Any]]
+
+
+def _normalize(vec) -> np.ndarray:
+    v = np.asarray(vec, dtype=np.float32)
+    n = float(np.linalg.norm(v))
+    return v / n if n > 0 else v
+
+
+class SemanticCache:
+    """
+    질문 임베딩(정규화)을 고정 크기 행렬에 보관하고 내적 한 번으로 최근접 질문을 찾는다.
+    - threshold 이상 + ttl_sec 이내 항목만 적중
+    - 가득 차면 가장 오래된 슬롯을 덮어씀
+    - 항목마다 참조한 공지 키를 기록해 인덱스 변경 시 해당 항목만 무효화
+    """
+
+    def __init__(self,
+                 threshold: float = ANSWER_CACHE_THRESHOLD,
+                 ttl_sec: int = ANSWER_CACHE_TTL_SEC,
+                 max_entries: int = ANSWER_CACHE_MAX):
+        self.threshold = threshold
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._vecs: Optional[np.ndarray] = None          # (max_entries, dim), 차원은 첫 put에서 결정
+        self._created = np.zeros(max_entries, dtype=np.float64)
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._answers: List[Optional[CachedAnswer]] = [None] * max_entries
+        self._notice: List[Optional[NoticeKey]] = [None] * max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _live_mask(self) -> np.ndarray:
+        return self._valid & (self._created >= time.monotonic() - self.ttl_sec)
+
+    def lookup(self, query_vec) -> Optional[CachedAnswer]:
+        with self._lock:
+            if self._vecs is None or not self._valid.any():
+                self.misses += 1
+                return None
+            q = _normalize(query_vec)
+            sims = self._vecs @ q
+            sims[~self._live_mask()] = -1.0
+            i = int(np.argmax(sims))
+            if sims[i] >= self.threshold:
+                self.hits += 1
+                return self._answers[i]
+            self.misses += 1
+            return None
+
+    def put(self, query_vec, answer: CachedAnswer, notice_key: Optional[NoticeKey] = None) -> None:
+        with self._lock:
+            q = _normalize(query_vec)
+            if self._vecs is None:
+                self._vecs = np.zeros((self.max_entries, q.shape[0]), dtype=np.float32)
+            free = np.flatnonzero(~self._live_mask())
+            i = int(free[0]) if free.size else int(np.argmin(self._created))
+            self._vecs[i] = q
+            self._created[i] = time.monotonic()
+            self._valid[i] = True
+            self._answers[i] = answer
+            self._notice[i] = notice_key
+
+    def _drop(self, idx: Iterable[int]) -> int:
+        n = 0
+        for i in idx:
+            if self._valid[i]:
+                self._valid[i] = False
+                self._answers[i] = None
+                self._notice[i] = None
+                n += 1
+        return n
+
+    def invalidate(self, notice_keys: Set[NoticeKey], title_vecs: Optional[List[List[float]]] = None) -> int:
+        """
+        인덱스에서 바뀐 공지에 영향받는 항목 제거.
+        - 해당 공지를 추천했던 답변
+        - 추천 공지가 없던 답변 (새 공지로 답이 생겼을 수 있음)
+        - 새 공지 제목과 질문이 ANSWER_CACHE_INVALIDATE_SIM 이상 비슷한 답변
+        """
+        if not notice_keys:
+            return 0
+        with self._lock:
+            if self._vecs is None:
+                return 0
+            idx = {i for i in np.flatnonzero(self._valid)
+                   if self._notice[i] is None or self._notice[i] in notice_keys}
+            if title_vecs:
+                T = np.stack([_normalize(v) for v in title_vecs])
+                sims = (self._vecs @ T.T).max(axis=1)
+                idx.update(int(i) for i in np.flatnonzero(self._valid & (sims >= ANSWER_CACHE_INVALIDATE_SIM)))
+            return self._drop(idx)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._drop(np.flatnonzero(self._valid))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": int(self._live_mask().sum()), "hits": self.hits, "misses": self.misses}
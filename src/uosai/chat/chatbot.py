@@ -0,0 +1,433 @@
+# src/uosai/chat/chatbot.py : RAG 챗봇 ASGI 앱 (FastAPI, 비동기 + SSE 스트리밍)
+import os, json, asyncio, time, traceback
+_T_IMPORT = time.perf_counter()
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from langchain.schema import Document, SystemMessage, HumanMessage, AIMessage
+
+from uosai.common.metrics import STAGE_SECONDS, count, render_prometheus, stage
+from uosai.common.utils import (
+    DB_CONFIG, EMBED_MODEL, get_vectorstore, get_embedding_instance, fetch_indexed_since, fetch_departments,
+)
+from uosai.chat.session import SessionStore, Turn, get_session_store
+from uosai.chat.cache import (
+    ANSWER_CACHE_ENABLED, ANSWER_CACHE_POLL_SEC, CachedAnswer, SemanticCache,
+)
+from uosai.chat.rerank import Reranker, get_reranker
+from uosai.chat.retrieval import search_notices
+from uosai.preprocess.query_parser import RULE_CONFIDENCE, parse_query
+from uosai.preprocess.intent import IntentClassifier, load_intent_classifier
+from uosai.preprocess.abbrev import expand_query
+
+_IMPORT_SEC = time.perf_counter() - _T_IMPORT
+
+# ===== Env =====
+CHAT_MODEL     = os.getenv("CHAT_MODEL", "gpt-4o-mini")
+RETRIEVE_K     = int(os.getenv("RETRIEVE_K", "20"))      # 벡터 검색 후보 수 (청크)
+RERANK_TOP_N   = int(os.getenv("RERANK_TOP_N", "3"))
+MIN_SCORE      = float(os.getenv("MIN_SCORE", "0.3"))    # 이 점수 미만이면 명확화 질문
+MAX_TURNS      = int(os.getenv("MAX_TURNS", "10"))       # 세션당 최대 턴 (도달 시 completed)
+HISTORY_TURNS  = int(os.getenv("HISTORY_TURNS", "4"))    # 프롬프트에 넣을 최근 턴 수 (≤ SESSION_MAX_TURNS)
+EMBED_WORKERS  = int(os.getenv("EMBED_WORKERS", "2"))
+
+def log(msg: str) -> None:
+    print(f"[chat {datetime.now():%Y-%m-%d %H:%M:%S}] {msg}")
+
+# ===== Prompts =====
+EXTRACT_PROMPT = """너는 서울시립대학교 공지사항 검색 도우미야. 오늘 날짜는 {today}이다.
+대화 맥락과 사용자 질문을 보고 아래 JSON 형식으로만 답해.
+{{
+  "is_notice_related": true/false,   // 공지(학사, 장학, 수강, 졸업, 행사, 채용 등) 검색이 필요한 질문인지
+  "category": "GENERAL|ACADEMIC|COLLEGE_ENGINEERING|COLLEGE_HUMANITIES|COLLEGE_SOCIAL_SCIENCES|COLLEGE_URBAN_SCIENCE|COLLEGE_ARTS_SPORTS|COLLEGE_BUSINESS|COLLEGE_NATURAL_SCIENCES|COLLEGE_LIBERAL_CONVERGENCE" 또는 null,
+  "department": "학과/부서명" 또는 null,
+  "keywords": ["핵심 키워드", ...],
+  "target_audience": "대상(예: 학부 재학생, 대학원생)" 또는 null,
+  "date_from": "YYYY-MM-DD" 또는 null,  // "이번 달", "지난주" 같은 상대 표현은 오늘 기준으로 변환
+  "date_to": "YYYY-MM-DD" 또는 null,
+  "recent": true/false,               // "최근", "요즘"처럼 기간 없이 최신 공지를 원하면 true
+  "search_query": "벡터 검색에 사용할 한 문장 질의"
+}}"""
+
+ANSWER_PROMPT = """너는 서울시립대학교 공지사항 안내 챗봇 UoScholar야. 오늘 날짜는 {today}이다.
+아래 공지 내용만 근거로 사용자 질문에 답해. 공지 제목을 먼저 알려주고, 일정/대상/방법 등 핵심을 간결하게 정리해.
+공지에 없는 내용은 추측하지 말고 링크를 확인하라고 안내해.
+
+[공지]
+제목: {title}
+게시일: {posted_date}
+부서: {department}
+링크: {link}
+내용:
+{content}"""
+
+CLARIFY_PROMPT = """너는 서울시립대학교 공지사항 안내 챗봇 UoScholar야.
+사용자 질문에 맞는 공지를 찾지 못했어. 검색 범위를 좁힐 수 있도록
+학과/단과대, 대상(학부/대학원), 시기 등 필요한 정보를 한두 문장으로 자연스럽게 되물어봐."""
+
+SMALLTALK_PROMPT = """너는 서울시립대학교 학생을 돕는 친근한 챗봇 UoScholar야.
+공지 검색이 필요 없는 일반 대화에는 짧고 자연스럽게 답하고, 필요하면 공지 관련 질문을 할 수 있다고 안내해."""
+
+# ===== Schemas =====
+class ChatRequest(BaseModel):
+    query: str
+    session_id: str
+
+class ChatResponse(BaseModel):
+    response: str
+    turn: int
+    completed: bool
+    recommended_notice: Optional[Dict[str, Any]] = None
+    cached: bool = False
+
+# ===== Service =====
+class ChatService:
+    """
+    요구사항 추출 → (공지 관련) 벡터 검색 + Rerank → 추천/명확화, (일반) 대화 응답.
+    모델/벡터스토어는 앱 시작 시 한 번 만들어 재사용하고,
+    임베딩은 전용 스레드 풀, LLM은 async 클라이언트로 호출한다.
+    """
+
+    def __init__(self, llm, embeddings, vectorstore, reranker: Optional[Reranker] = None,
+                 sessions: Optional[SessionStore] = None,
+                 cache: Optional[SemanticCache] = None,
+                 departments: Optional[List[str]] = None,
+                 intent: Optional[IntentClassifier] = None):
+        self.llm = llm
+        self.embeddings = embeddings
+        self.vectorstore = vectorstore
+        self.reranker = reranker
+        self.sessions = sessions or get_session_store()
+        self.cache = cache
+        self.departments = departments or []
+        self.intent = intent
+        self.executor = ThreadPoolExecutor(max_workers=EMBED_WORKERS, thread_name_prefix="embed")
+
+    # ----- 세션 -----
+    async def _session_call(self, fn, *args):
+        # DB 백엔드는 스레드로, 메모리 백엔드는 바로 호출
+        if self.sessions.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    def _history_messages(self, history: List[Turn]) -> list:
+        msgs = []
+        for t in history[-HISTORY_TURNS:]:
+            msgs += [HumanMessage(t.query), AIMessage(t.answer)]
+        return msgs
+
+    # ----- 단계별 처리 -----
+    async def understand(self, query: str, history: List[Turn],
+                         qvec: Optional[List[float]] = None) -> Tuple[Dict[str, Any], Optional[List[float]]]:
+        """
+        규칙 파서 → 의도 분류기 → LLM 순서로, 앞 단계에서 확정되면 뒤 단계는 생략.
+        분류기를 위해 계산한 쿼리 임베딩은 캐시/검색에서 재사용하도록 같이 돌려준다.
+        """
+        rule = parse_query(query)
+        if history and rule["needs_context"]:
+            # 이전 대화를 가리키는 질문은 맥락 해석이 필요하므로 LLM
+            return await self.extract_requirements(query, history, rule), qvec
+        if rule["confidence"] >= RULE_CONFIDENCE:
+            return rule, qvec
+
+        if self.intent is not None:
+            if qvec is None:
+                qvec = await self.embed_query(query)
+            routed = self.intent.route(qvec)
+            if routed is not None:
+                return {**rule, "is_notice_related": routed, "source": "intent"}, qvec
+        return await self.extract_requirements(query, history, rule), qvec
+
+    async def extract_requirements(self, query: str, history: List[Turn],
+                                   rule: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        rule = rule or parse_query(query)
+        today = datetime.now().strftime("%Y-%m-%d")
+        msgs = [SystemMessage(EXTRACT_PROMPT.format(today=today))]
+        msgs += self._history_messages(history)
+        msgs.append(HumanMessage(query))
+        try:
+            with stage("chat.extract_llm"):
+                resp = await self.llm.bind(response_format={"type": "json_object"}).ainvoke(msgs)
+            req = json.loads(resp.content or "{}")
+        except Exception as e:
+            log(f"requirement extraction failed: {type(e).__name__}: {e}")
+            req = {}
+        req.setdefault("is_notice_related", True)
+        req["search_query"] = (req.get("search_query") or query).strip()
+        # LLM이 비워둔 필드는 규칙 파서 결과로 보충
+        for k in ("category", "department", "target_audience", "date_from", "date_to", "recent"):
+            if not req.get(k) and rule.get(k):
+                req[k] = rule[k]
+        req["source"] = "llm"
+        return req
+
+    async def embed_query(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        with stage("chat.embed_query"):
+            return await loop.run_in_executor(self.executor, self.embeddings.embed_query, text)
+
+    async def retrieve(self, req: Dict[str, Any], vec: Optional[List[float]] = None) -> List[Tuple[Document, float]]:
+        if vec is None:
+            vec = await self.embed_query(req["search_query"])
+        # 카테고리/부서/기간 조건은 벡터 DB 메타데이터 필터로 넘김
+        with stage("chat.vector_search"):
+            hits = await asyncio.to_thread(
+                search_notices, self.vectorstore, vec, req, RETRIEVE_K, self.departments
+            )
+        # 같은 공지의 여러 청크 → 최고 점수 청크 하나만
+        best: Dict[Tuple[Any, Any], Tuple[Document, float]] = {}
+        for doc, score in hits:
+            m = doc.metadata or {}
+            key = (m.get("category"), m.get("post_number"))
+            if key not in best or score > best[key][1]:
+                best[key] = (doc, score)
+        return sorted(best.values(), key=lambda x: x[1], reverse=True)
+
+    async def rerank(self, query: str, hits: List[Tuple[Document, float]]) -> List[Tuple[Document, float]]:
+        if not hits or self.reranker is None:
+            return hits[:RERANK_TOP_N]
+        try:
+            passages = [f"{d.metadata.get('title', '')}\n{d.page_content}" for d, _ in hits]
+            with stage("chat.rerank"):
+                ranked = await self.reranker.rerank(query, passages, RERANK_TOP_N)
+            return [(hits[i][0], score) for i, score in ranked]
+        except Exception as e:
+            count("chat.rerank_fallback")
+            log(f"rerank failed, falling back to vector order: {type(e).__name__}: {e}")
+            return hits[:RERANK_TOP_N]
+
+    # ----- 턴 실행 -----
+    async def run_turn(self, query: str, session_id: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        한 턴을 처리하며 이벤트를 순서대로 내보낸다.
+        ("notice", dict) → ("token", str)* → ("done", ChatResponse dict)
+        """
+        t0 = time.perf_counter()
+        history = await self._session_call(self.sessions.get, session_id)
+
+        # 맥락 없는 첫 질문만 캐시 대상 (후속 질문은 히스토리에 따라 답이 달라짐)
+        qvec: Optional[List[float]] = None
+        if self.cache is not None and not history:
+            qvec = await self.embed_query(query)
+            hit = self.cache.lookup(qvec)
+            count("chat.cache_hit" if hit is not None else "chat.cache_miss")
+            if hit is not None:
+                # 요구사항 추출/검색/Rerank/LLM 전부 생략
+                if hit.recommended_notice:
+                    yield "notice", hit.recommended_notice
+                yield "token", hit.response
+                async for ev in self._finish(session_id, query, hit.response, hit.recommended_notice, cached=True):
+                    yield ev
+                return
+
+        with stage("chat.understand"):
+            req, vec = await self.understand(query, history, qvec)
+        count(f"chat.route.{req.get('source', 'llm')}")
+        # 줄임말 확장 (컴공 → 컴공(컴퓨터과학부)) 후 임베딩
+        req["search_query"] = expand_query(req["search_query"])
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        notice: Optional[Dict[str, Any]] = None
+        notice_key = None
+        if req.get("is_notice_related"):
+            if req["search_query"] != query:
+                vec = None
+            hits = await self.rerank(req["search_query"], await self.retrieve(req, vec))
+            if hits and hits[0][1] >= MIN_SCORE:
+                doc, score = hits[0]
+                m = doc.metadata or {}
+                if m.get("post_number") is not None:
+                    notice_key = (m.get("category"), int(m["post_number"]))
+                notice = {
+                    "title": m.get("title", ""),
+                    "link": m.get("link", ""),
+                    "posted_date": m.get("posted_ymd", ""),
+                    "department": m.get("department", ""),
+                    "score": round(float(score), 4),
+                }
+                system = ANSWER_PROMPT.format(today=today, content=doc.page_content, **{
+                    k: notice[k] for k in ("title", "posted_date", "department", "link")
+                })
+            else:
+                system = CLARIFY_PROMPT
+        else:
+            system = SMALLTALK_PROMPT
+
+        if notice:
+            yield "notice", notice
+
+        msgs = [SystemMessage(system)] + self._history_messages(history) + [HumanMessage(query)]
+        parts: List[str] = []
+        t_llm = time.perf_counter()
+        async for chunk in self.llm.astream(msgs):
+            if chunk.content:
+                if not parts:
+                    STAGE_SECONDS.observe(time.perf_counter() - t_llm, stage="chat.llm_first_token")
+                    STAGE_SECONDS.observe(time.perf_counter() - t0, stage="chat.time_to_first_token")
+                parts.append(chunk.content)
+                yield "token", chunk.content
+        answer = "".join(parts).strip()
+        STAGE_SECONDS.observe(time.perf_counter() - t_llm, stage="chat.llm_stream")
+
+        if qvec is not None and answer:  # 캐시 조회를 한 첫 질문만
+            self.cache.put(qvec, CachedAnswer(answer, notice), notice_key)
+
+        async for ev in self._finish(session_id, query, answer, notice):
+            yield ev
+
+    async def _finish(self, session_id: str, query: str, answer: str,
+                      notice: Optional[Dict[str, Any]], cached: bool = False) -> AsyncIterator[Tuple[str, Any]]:
+        turn = await self._session_call(self.sessions.append, session_id, query, answer)
+        completed = turn >= MAX_TURNS
+        if completed:
+            await self._session_call(self.sessions.reset, session_id)
+
+        yield "done", ChatResponse(
+            response=answer, turn=turn, completed=completed, recommended_notice=notice, cached=cached
+        ).model_dump()
+
+    async def chat(self, query: str, session_id: str) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        async for event, data in self.run_turn(query, session_id):
+            if event == "done":
+                result = data
+        return result
+
+# ===== App =====
+def build_service() -> ChatService:
+    """모델/벡터스토어/LLM 클라이언트 생성 (콜드 로드는 여기서 한 번만), 단계별 시작 시간 기록"""
+    t0 = time.perf_counter()
+    steps: Dict[str, float] = {"import": _IMPORT_SEC}
+
+    def step(name: str, fn):
+        t = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            steps[name] = time.perf_counter() - t
+            STAGE_SECONDS.observe(steps[name], stage=f"startup.{name}")
+
+    embeddings = step("embed_model", get_embedding_instance)
+    vectorstore = step("vectorstore", get_vectorstore)
+    # 첫 요청에서 그래프/토크나이저 초기화 비용이 나오지 않게
+    step("embed_warmup", lambda: embeddings.embed_query("워밍업"))
+
+    def make_llm():
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(model=CHAT_MODEL, temperature=0.3, streaming=True)
+    llm = step("llm_client", make_llm)
+
+    def load_departments() -> List[str]:
+        try:
+            return fetch_departments()
+        except Exception as e:
+            log(f"department list unavailable (department filter off): {type(e).__name__}: {e}")
+            return []
+    departments = step("departments", load_departments)
+
+    def load_reranker():
+        r = get_reranker()
+        if r:
+            r.warmup()
+        return r
+    reranker = step("reranker", load_reranker)
+    cache = SemanticCache() if ANSWER_CACHE_ENABLED else None
+    intent = step("intent", lambda: load_intent_classifier(embed_model=EMBED_MODEL))
+    log(f"service ready in {time.perf_counter() - t0:.1f}s "
+        f"(rerank={reranker.name if reranker else 'none'}, cache={'on' if cache else 'off'}, "
+        f"intent={'on' if intent else 'off'})")
+    log("startup: " + "  ".join(f"{k}={v:.2f}s" for k, v in sorted(steps.items(), key=lambda kv: -kv[1])))
+    return ChatService(llm, embeddings, vectorstore, reranker, cache=cache, departments=departments,
+                       intent=intent)
+
+
+async def poll_index_changes(svc: ChatService, interval: int = ANSWER_CACHE_POLL_SEC) -> None:
+    """인덱서가 기록한 notice_index_state 변경분을 폴링해 영향받는 캐시 항목을 무효화"""
+    since = datetime.now()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            rows = await asyncio.to_thread(fetch_indexed_since, since)
+            if not rows:
+                continue
+            since = max(r["indexed_at"] for r in rows)
+            keys = {(r["category"], int(r["post_number"])) for r in rows}
+            titles = [r["title"] for r in rows if r.get("title")]
+            title_vecs = None
+            if titles:
+                loop = asyncio.get_running_loop()
+                title_vecs = await loop.run_in_executor(svc.executor, svc.embeddings.embed_documents, titles)
+            n = svc.cache.invalidate(keys, title_vecs)
+            log(f"index changed: notices={len(keys)} → cache invalidated={n}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log(f"index poll failed: {type(e).__name__}: {e}")
+
+
+def create_app(service: Optional[ChatService] = None) -> FastAPI:
+    """service를 주입하면 그대로 사용, 없으면 startup에서 build_service()"""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.chat = service or await asyncio.to_thread(build_service)
+        poller = None
+        if app.state.chat.cache is not None and DB_CONFIG.get("host"):
+            poller = asyncio.create_task(poll_index_changes(app.state.chat))
+        yield
+        if poller:
+            poller.cancel()
+        app.state.chat.executor.shutdown(wait=False)
+
+    app = FastAPI(title="UoScholar Chat", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        """Prometheus 텍스트 포맷 (uvicorn 워커별 값)"""
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    @app.post("/chat", response_model=ChatResponse)
+    async def chat(body: ChatRequest, request: Request):
+        if not body.query.strip():
+            raise HTTPException(status_code=400, detail="query is empty")
+        try:
+            return await request.app.state.chat.chat(body.query, body.session_id)
+        except Exception as e:
+            log(f"ERROR: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail="chat failed")
+
+    @app.post("/chat/stream")
+    async def chat_stream(body: ChatRequest, request: Request):
+        """Server-Sent Events: event=notice|token|done|error"""
+        if not body.query.strip():
+            raise HTTPException(status_code=400, detail="query is empty")
+        svc: ChatService = request.app.state.chat
+
+        async def events():
+            try:
+                async for event, data in svc.run_turn(body.query, body.session_id):
+                    yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            except Exception as e:
+                log(f"ERROR(stream): {type(e).__name__}: {e}")
+                yield f"event: error\ndata: {json.dumps({'detail': 'chat failed'})}\n\n"
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,116 @@
+# src/uosai/chat/loadtest.py : 부하 테스트용 ChatService (LLM/Reranker는 지연만 흉내 내는 가짜, 검색은 로컬 인덱스)
+#
+# 외부 API(OpenAI/Cohere/Pinecone) 없이 실제 서버 코드 경로(세션/캐시/규칙 파서/임베딩/필터 검색)를 그대로 돌린다.
+#   uvicorn uosai.chat.loadtest:create_fake_app --factory --workers 2
+#   python scripts/load_chat.py --workers 1,2,4
+import os, json, asyncio, hashlib, pathlib
+from typing import Any, AsyncIterator, List, NamedTuple, Optional
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from uosai.common.local_index import LocalVectorStore
+from uosai.common.utils import row_to_doc, split_docs, get_embedding_instance
+from uosai.chat.cache import ANSWER_CACHE_ENABLED, SemanticCache
+from uosai.chat.chatbot import ChatService, create_app, log
+from uosai.chat.rerank import Reranker, get_reranker
+
+# ===== Env =====
+_ROOT = pathlib.Path(__file__).resolve().parents[3]
+LOADTEST_SNAPSHOT    = os.getenv("LOADTEST_SNAPSHOT", str(_ROOT / "data" / "bench" / "notices_snapshot.jsonl"))
+LOADTEST_EXTRACT_MS  = float(os.getenv("LOADTEST_EXTRACT_MS", "600"))    # 요구사항 추출 LLM 응답
+LOADTEST_FIRST_MS    = float(os.getenv("LOADTEST_FIRST_MS", "500"))      # 답변 LLM 첫 토큰까지
+LOADTEST_TOKEN_MS    = float(os.getenv("LOADTEST_TOKEN_MS", "15"))       # 토큰 간 간격
+LOADTEST_TOKENS      = int(os.getenv("LOADTEST_TOKENS", "120"))          # 답변 토큰 수
+LOADTEST_RERANK      = os.getenv("LOADTEST_RERANK", "fake")              # fake | local | none
+LOADTEST_RERANK_MS   = float(os.getenv("LOADTEST_RERANK_MS", "80"))
+LOADTEST_FAKE_EMBED  = os.getenv("LOADTEST_FAKE_EMBED", "false").strip().lower() in {"1", "true", "yes", "on"}
+
+_ANSWER_TOKENS = ("공지 ", "내용을 ", "정리하면 ", "신청 ", "기간은 ", "포털에서 ", "확인할 ", "수 ", "있어요. ")
+
+
+class _Message(NamedTuple):
+    content: str
+
+
+class FakeChatLLM:
+    """ChatOpenAI 대역: bind().ainvoke()는 고정 지연 후 JSON, astream()은 토큰 간격대로 스트리밍"""
+
+    def __init__(self, extract_ms: float = LOADTEST_EXTRACT_MS, first_ms: float = LOADTEST_FIRST_MS,
+                 token_ms: float = LOADTEST_TOKEN_MS, tokens: int = LOADTEST_TOKENS):
+        self.extract_ms, self.first_ms, self.token_ms, self.tokens = extract_ms, first_ms, token_ms, tokens
+
+    def bind(self, **kwargs) -> "FakeChatLLM":
+        return self
+
+    async def ainvoke(self, messages: List[Any]) -> _Message:
+        await asyncio.sleep(self.extract_ms / 1000)
+        query = messages[-1].content if messages else ""
+        # 비어 있는 필드는 ChatService가 규칙 파서 결과로 채운다
+        return _Message(json.dumps({"is_notice_related": True, "search_query": query}, ensure_ascii=False))
+
+    async def astream(self, messages: List[Any]) -> AsyncIterator[_Message]:
+        await asyncio.sleep(self.first_ms / 1000)
+        for i in range(self.tokens):
+            if i:
+                await asyncio.sleep(self.token_ms / 1000)
+            yield _Message(_ANSWER_TOKENS[i % len(_ANSWER_TOKENS)])
+
+
+class FakeReranker(Reranker):
+    """후보 순서를 그대로 두고 지연만 추가 (Cohere 같은 원격 API 흉내)"""
+    name = "fake"
+
+    def __init__(self, latency_ms: float = LOADTEST_RERANK_MS):
+        self.latency_ms = latency_ms
+
+    async def rerank(self, query: str, passages: List[str], top_n: int):
+        await asyncio.sleep(self.latency_ms / 1000)
+        return [(i, 1.0 - i * 0.01) for i in range(min(top_n, len(passages)))]
+
+
+class HashEmbeddings(Embeddings):
+    """모델 없이 텍스트 해시로 만든 결정적 벡터 (임베딩 비용을 빼고 서버 오버헤드만 볼 때)"""
+
+    def __init__(self, dim: int = 768):
+        self.dim = dim
+
+    def _vec(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vec(text)
+
+
+def _make_reranker(backend: str) -> Optional[Reranker]:
+    if backend == "fake":
+        return FakeReranker()
+    if backend == "none":
+        return None
+    reranker = get_reranker(backend)
+    if reranker:
+        reranker.warmup()
+    return reranker
+
+
+def build_fake_service(snapshot: str = LOADTEST_SNAPSHOT) -> ChatService:
+    """스냅샷 공지로 로컬 인덱스를 만들고 가짜 LLM/Reranker를 붙인 ChatService"""
+    with open(snapshot, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    embeddings = HashEmbeddings() if LOADTEST_FAKE_EMBED else get_embedding_instance()
+    embeddings.embed_query("워밍업")
+    store = LocalVectorStore.from_documents(split_docs([row_to_doc(r) for r in rows]), embeddings)
+    departments = sorted({r["department"] for r in rows if r.get("department")})
+    log(f"load-test service: pid={os.getpid()} notices={len(rows)} chunks={len(store)} "
+        f"embed={'hash' if LOADTEST_FAKE_EMBED else 'model'} rerank={LOADTEST_RERANK}")
+    return ChatService(FakeChatLLM(), embeddings, store, _make_reranker(LOADTEST_RERANK),
+                       cache=SemanticCache() if ANSWER_CACHE_ENABLED else None, departments=departments)
+
+
+def create_fake_app():
+    """uvicorn --factory 엔트리포인트 (워커 프로세스마다 호출)"""
+    return create_app(build_fake_service())
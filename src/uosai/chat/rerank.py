@@ -0,0 +1,90 @@
+# src/uosai/chat/rerank.py : 검색 결과 재정렬 (로컬 Cross-Encoder / Cohere / 없음)
+import os, asyncio
+from typing import List, Optional, Tuple
+
+# ===== Env =====
+# local: 로컬 한국어 Cross-Encoder (오프라인, 네트워크 왕복 없음) / cohere: Cohere Rerank API / none: 벡터 점수 그대로
+RERANK_BACKEND     = os.getenv("RERANK_BACKEND", "local")
+RERANK_LOCAL_MODEL = os.getenv("RERANK_LOCAL_MODEL", "bongsoo/albert-small-kor-cross-encoder-v1")
+RERANK_MAX_TOKENS  = int(os.getenv("RERANK_MAX_TOKENS", "256"))   # (질의, 본문) 쌍 토큰 예산
+RERANK_MODEL       = os.getenv("RERANK_MODEL", "rerank-multilingual-v3.0")  # Cohere 모델
+COHERE_API_KEY     = os.getenv("COHERE_API_KEY")
+
+# 토크나이저 전에 본문을 대략 잘라 토큰화 비용도 줄임 (한국어 ≈ 토큰당 1.5~2자)
+_CHARS_PER_TOKEN = 2
+
+
+class Reranker:
+    """(질의, 후보 본문들) → 상위 top_n 의 (후보 인덱스, 점수) 목록, 점수 내림차순"""
+    name = "base"
+
+    async def rerank(self, query: str, passages: List[str], top_n: int) -> List[Tuple[int, float]]:
+        raise NotImplementedError
+
+    def warmup(self) -> None:
+        """첫 요청 지연을 없애기 위한 사전 호출 (로컬 모델만 의미 있음)"""
+        pass
+
+
+class CrossEncoderReranker(Reranker):
+    """
+    로컬 Cross-Encoder (CPU).
+    모든 후보를 한 배치로 묶어 forward 한 번에 점수 계산, 쌍 길이는 RERANK_MAX_TOKENS로 제한.
+    - bongsoo/albert-small-kor-cross-encoder-v1 (기본, 가벼움)
+    - Dongjin-kr/ko-reranker (정확도↑, 무거움)
+    - cross-encoder/mmarco-mMiniLMv2-L12-H384-v1 (다국어)
+    """
+    name = "local"
+
+    def __init__(self, model_name: str = RERANK_LOCAL_MODEL, max_tokens: int = RERANK_MAX_TOKENS):
+        from sentence_transformers import CrossEncoder
+        from uosai.common.model_store import resolve_model
+        path = resolve_model(model_name)
+        print(f"[Rerank] Loading cross-encoder: {model_name}" + (f" ({path})" if path != model_name else ""))
+        self.model = CrossEncoder(path, max_length=max_tokens, device="cpu")
+        self.max_chars = max_tokens * _CHARS_PER_TOKEN
+
+    def warmup(self) -> None:
+        self.score("워밍업", ["워밍업"])
+
+    def score(self, query: str, passages: List[str]) -> List[float]:
+        pairs = [(query, p[:self.max_chars]) for p in passages]
+        scores = self.model.predict(pairs, batch_size=max(1, len(pairs)), show_progress_bar=False,
+                                    convert_to_numpy=True)
+        return [float(s) for s in scores]
+
+    async def rerank(self, query: str, passages: List[str], top_n: int) -> List[Tuple[int, float]]:
+        if not passages:
+            return []
+        scores = await asyncio.to_thread(self.score, query, passages)
+        order = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        return [(i, scores[i]) for i in order[:top_n]]
+
+
+class CohereReranker(Reranker):
+    """Cohere Rerank API (네트워크 왕복 1회)"""
+    name = "cohere"
+
+    def __init__(self, api_key: str = COHERE_API_KEY, model: str = RERANK_MODEL):
+        if not api_key:
+            raise RuntimeError("COHERE_API_KEY missing")
+        import cohere
+        self.client = cohere.AsyncClientV2(api_key=api_key)
+        self.model = model
+
+    async def rerank(self, query: str, passages: List[str], top_n: int) -> List[Tuple[int, float]]:
+        if not passages:
+            return []
+        resp = await self.client.rerank(model=self.model, query=query, documents=passages, top_n=top_n)
+        return [(r.index, float(r.relevance_score)) for r in resp.results]
+
+
+def get_reranker(backend: str = RERANK_BACKEND) -> Optional[Reranker]:
+    """backend=none 이면 None (호출 측에서 벡터 점수 순서를 그대로 사용)"""
+    if backend == "local":
+        return CrossEncoderReranker()
+    if backend == "cohere":
+        return CohereReranker()
+    if backend == "none":
+        return None
+    raise ValueError(f"unknown RERANK_BACKEND: {backend}")
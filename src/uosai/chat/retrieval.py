@@ -0,0 +1,110 @@
+# src/uosai/chat/retrieval.py : 요구사항(카테고리/부서/기간) → 벡터 DB 메타데이터 필터 검색
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain.schema import Document
+
+from uosai.common.categories import CATEGORIES
+from uosai.common.utils import to_epoch_days
+
+RECENT_DAYS        = int(os.getenv("RECENT_DAYS", "30"))     # "최근" 기본 기간
+MAX_DEPT_MATCHES   = int(os.getenv("MAX_DEPT_MATCHES", "20"))
+
+
+def _norm(s: str) -> str:
+    return "".join((s or "").split())
+
+
+def match_departments(name: Optional[str], departments: Iterable[str]) -> List[str]:
+    """
+    추출된 부서명과 부분 일치하는 실제 department 값들.
+    벡터 DB는 부분 문자열 필터가 없으므로 후보를 $in 목록으로 만든다.
+    """
+    key = _norm(name or "")
+    if len(key) < 2:
+        return []
+    out = [d for d in departments if key in _norm(d) or _norm(d) in key]
+    return out[:MAX_DEPT_MATCHES]
+
+
+def resolve_date_range(req: Dict[str, Any], today: Optional[date] = None) -> Tuple[Optional[int], Optional[int]]:
+    """
+    date_from/date_to(YYYY-MM-DD) → epoch days 범위.
+    recent=True 이고 명시 범위가 없으면 최근 RECENT_DAYS일.
+    """
+    today = today or date.today()
+    lo = to_epoch_days(req.get("date_from"))
+    hi = to_epoch_days(req.get("date_to"))
+    if lo is None and hi is None and req.get("recent"):
+        lo = to_epoch_days(today - timedelta(days=RECENT_DAYS))
+    if lo is not None and hi is not None and lo > hi:
+        lo, hi = hi, lo
+    return lo, hi
+
+
+def build_filter(req: Dict[str, Any],
+                 departments: Iterable[str] = (),
+                 use_category: bool = True,
+                 use_department: bool = True,
+                 use_date: bool = True,
+                 today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """요구사항 → Pinecone 메타데이터 필터 (필드 간 AND)"""
+    flt: Dict[str, Any] = {}
+
+    cat = req.get("category")
+    if use_category and cat in CATEGORIES:
+        # 중복 공지는 canonical 하나만 인덱싱되고 올라온 게시판들이 categories 목록에 들어 있다
+        flt["categories"] = {"$in": [cat]}
+
+    if use_department:
+        depts = match_departments(req.get("department"), departments)
+        if depts:
+            flt["department"] = {"$in": depts}
+
+    if use_date:
+        lo, hi = resolve_date_range(req, today)
+        rng: Dict[str, int] = {}
+        if lo is not None:
+            rng["$gte"] = lo
+        if hi is not None:
+            rng["$lte"] = hi
+        if rng:
+            flt["posted_date"] = rng
+
+    return flt or None
+
+
+def filter_cascade(req: Dict[str, Any], departments: Iterable[str] = (),
+                   today: Optional[date] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    결과가 없을 때 조건을 하나씩 풀어가며 재검색할 필터 순서.
+    전체 → 부서 제외 → 부서/기간 제외 → 필터 없음
+    """
+    departments = list(departments)
+    steps = [
+        build_filter(req, departments, today=today),
+        build_filter(req, departments, use_department=False, today=today),
+        build_filter(req, departments, use_department=False, use_date=False, today=today),
+        None,
+    ]
+    out: List[Optional[Dict[str, Any]]] = []
+    for f in steps:
+        if f not in out:
+            out.append(f)
+    return out
+
+
+def search_notices(vectorstore, vec: List[float], req: Dict[str, Any], k: int,
+                   departments: Iterable[str] = (),
+                   today: Optional[date] = None) -> List[Tuple[Document, float]]:
+    """
+    필터를 벡터 DB 쪽에서 적용해 해당 범위만 top-k 검색.
+    (전체 top-k를 가져와 파이썬에서 거르면 범위 밖 결과가 k를 다 차지할 수 있음)
+    """
+    hits: List[Tuple[Document, float]] = []
+    for flt in filter_cascade(req, departments, today):
+        hits = vectorstore.similarity_search_by_vector_with_score(vec, k=k, filter=flt)
+        if hits:
+            break
+    return hits
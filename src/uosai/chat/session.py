@@ -0,0 +1,254 @@
+# src/uosai/chat/session.py : 대화 히스토리 세션 저장소 (메모리 LRU+TTL / MySQL 공유)
+import os, sys, time, threading
+from collections import OrderedDict, deque
+from typing import Deque, List, NamedTuple, Optional
+
+from uosai.common.utils import get_conn, ensure_table
+
+# ===== Env =====
+SESSION_BACKEND      = os.getenv("SESSION_BACKEND", "memory")            # memory | mysql
+SESSION_TTL_SEC      = int(os.getenv("SESSION_TTL_SEC", "1800"))         # 마지막 접근 후 만료
+SESSION_MAX_TURNS    = int(os.getenv("SESSION_MAX_TURNS", "6"))          # 세션당 보관 턴 수
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+SESSION_MAX_BYTES    = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))  # 메모리 상한
+SESSION_MAX_CHARS    = int(os.getenv("SESSION_MAX_CHARS", "1500"))       # 턴당 텍스트 길이 상한
+
+_TURN_OVERHEAD = 120  # 튜플/deque 슬롯 등 문자열 외 대략적인 바이트
+
+
+class Turn(NamedTuple):
+    """한 턴 = (사용자 질문, 챗봇 답변)"""
+    query: str
+    answer: str
+
+
+def _clip(text: str) -> str:
+    return text if len(text) <= SESSION_MAX_CHARS else text[:SESSION_MAX_CHARS]
+
+
+class SessionStore:
+    """
+    세션 저장소 인터페이스.
+    blocking=True 인 구현(DB 등)은 호출 측에서 스레드로 넘겨 이벤트 루프를 막지 않는다.
+    """
+    blocking = False
+
+    def get(self, session_id: str) -> List[Turn]:
+        """최근 턴 목록 (오래된 것 → 최신 순)"""
+        raise NotImplementedError
+
+    def append(self, session_id: str, query: str, answer: str) -> int:
+        """턴 추가 후 누적 턴 번호 반환 (보관 개수와 무관하게 1부터 증가)"""
+        raise NotImplementedError
+
+    def reset(self, session_id: str) -> None:
+        raise NotImplementedError
+
+
+# ===== In-memory (LRU + TTL) =====
+class _Session:
+    __slots__ = ("turns", "total", "nbytes", "touched")
+
+    def __init__(self, max_turns: int):
+        self.turns: Deque[Turn] = deque(maxlen=max_turns)
+        self.total = 0
+        self.nbytes = 0
+        self.touched = time.monotonic()
+
+
+class MemorySessionStore(SessionStore):
+    """
+    프로세스 내 세션 저장소.
+    - 세션당 max_turns 턴만 보관 (deque maxlen)
+    - 마지막 접근 후 ttl_sec 지나면 만료
+    - 세션 수 / 전체 바이트가 상한을 넘으면 가장 오래 안 쓴 세션부터 제거
+    """
+
+    def __init__(self,
+                 ttl_sec: int = SESSION_TTL_SEC,
+                 max_turns: int = SESSION_MAX_TURNS,
+                 max_sessions: int = SESSION_MAX_SESSIONS,
+                 max_bytes: int = SESSION_MAX_BYTES):
+        self.ttl_sec = ttl_sec
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, _Session]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _turn_size(t: Turn) -> int:
+        return sys.getsizeof(t.query) + sys.getsizeof(t.answer) + _TURN_OVERHEAD
+
+    def _drop(self, session_id: str) -> None:
+        s = self._data.pop(session_id, None)
+        if s is not None:
+            self._nbytes -= s.nbytes
+
+    def _evict(self) -> None:
+        # OrderedDict 앞쪽이 가장 오래 접근하지 않은 세션
+        now = time.monotonic()
+        while self._data:
+            sid, s = next(iter(self._data.items()))
+            if (now - s.touched > self.ttl_sec
+                    or len(self._data) > self.max_sessions
+                    or self._nbytes > self.max_bytes):
+                self._drop(sid)
+            else:
+                break
+
+    def _lookup(self, session_id: str) -> Optional[_Session]:
+        s = self._data.get(session_id)
+        if s is None:
+            return None
+        if time.monotonic() - s.touched > self.ttl_sec:
+            self._drop(session_id)
+            return None
+        s.touched = time.monotonic()
+        self._data.move_to_end(session_id)
+        return s
+
+    def get(self, session_id: str) -> List[Turn]:
+        with self._lock:
+            s = self._lookup(session_id)
+            return list(s.turns) if s else []
+
+    def append(self, session_id: str, query: str, answer: str) -> int:
+        turn = Turn(_clip(query), _clip(answer))
+        size = self._turn_size(turn)
+        with self._lock:
+            s = self._lookup(session_id)
+            if s is None:
+                s = self._data[session_id] = _Session(self.max_turns)
+            if len(s.turns) == s.turns.maxlen:
+                old = self._turn_size(s.turns[0])
+                s.nbytes -= old
+                self._nbytes -= old
+            s.turns.append(turn)
+            s.total += 1
+            s.nbytes += size
+            self._nbytes += size
+            self._evict()
+            return s.total
+
+    def reset(self, session_id: str) -> None:
+        with self._lock:
+            self._drop(session_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"sessions": len(self._data), "bytes": self._nbytes}
+
+
+# ===== MySQL (여러 API 워커가 공유) =====
+SESSION_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS chat_session_turn (
+    session_id  VARCHAR(128) NOT NULL,
+    turn        INT          NOT NULL,
+    query       TEXT         NOT NULL,
+    answer      TEXT         NOT NULL,
+    created_at  TIMESTAMP    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (session_id, turn),
+    KEY idx_chat_session_turn_created (created_at)
+) DEFAULT CHARSET=utf8mb4
+"""
+
+class MySQLSessionStore(SessionStore):
+    """
+    get_pool() 커넥션 풀을 쓰는 공유 세션 저장소.
+    세션 만료는 마지막 턴 created_at 기준 TTL, 오래된 행은 append 시 주기적으로 정리.
+    만료 기준 시각은 SQL 의 NOW() 로 계산 (created_at 과 같은 DB 시계 → 앱 서버와 DB 의 시간대가 달라도 맞음).
+    """
+    blocking = True
+
+    GET_SQL = """
+    SELECT turn, query, answer FROM chat_session_turn
+    WHERE session_id = %s
+      AND turn > (SELECT COALESCE(MAX(t.turn), 0) - %s FROM chat_session_turn t WHERE t.session_id = %s)
+      AND NOW() - INTERVAL %s SECOND <= (SELECT MAX(t.created_at) FROM chat_session_turn t WHERE t.session_id = %s)
+    ORDER BY turn
+    """
+    LAST_SQL = """
+    SELECT COALESCE(MAX(turn), 0), MAX(created_at) < NOW() - INTERVAL %s SECOND
+    FROM chat_session_turn WHERE session_id = %s
+    """
+    APPEND_SQL = "INSERT INTO chat_session_turn (session_id, turn, query, answer) VALUES (%s, %s, %s, %s)"
+    RESET_SQL = "DELETE FROM chat_session_turn WHERE session_id = %s"
+    PURGE_SQL = "DELETE FROM chat_session_turn WHERE created_at < NOW() - INTERVAL %s SECOND LIMIT 1000"
+    APPEND_RETRIES = 3
+
+    def __init__(self, ttl_sec: int = SESSION_TTL_SEC, max_turns: int = SESSION_MAX_TURNS,
+                 purge_every: int = 200):
+        self._get_conn = get_conn
+        self.ttl_sec = ttl_sec
+        self.max_turns = max_turns
+        self.purge_every = purge_every
+        self._appends = 0
+        self.ensure_table()
+
+    def ensure_table(self) -> None:
+        ensure_table("chat_session_turn", SESSION_TABLE_DDL)
+
+    def get(self, session_id: str) -> List[Turn]:
+        conn = self._get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(self.GET_SQL, (session_id, self.max_turns, session_id, self.ttl_sec, session_id))
+            rows = cur.fetchall()
+            cur.close()
+            return [Turn(q, a) for _, q, a in rows]
+        finally:
+            conn.close()
+
+    def append(self, session_id: str, query: str, answer: str) -> int:
+        """
+        같은 커서로 마지막 턴을 읽고 다음 번호로 INSERT.
+        같은 세션에 동시 append 가 겹치면 (session_id, turn) PK 충돌(1062) → 롤백 후 번호를 다시 읽어 재시도.
+        """
+        from mysql.connector import errors
+        conn = self._get_conn()
+        try:
+            cur = conn.cursor()
+            for attempt in range(self.APPEND_RETRIES + 1):
+                cur.execute(self.LAST_SQL, (self.ttl_sec, session_id))
+                last, expired = cur.fetchone()
+                last = int(last)
+                # 만료된 세션이면 이어 쓰지 않고 새로 시작
+                if last and expired:
+                    cur.execute(self.RESET_SQL, (session_id,))
+                    last = 0
+                try:
+                    cur.execute(self.APPEND_SQL, (session_id, last + 1, _clip(query), _clip(answer)))
+                    break
+                except errors.IntegrityError as e:
+                    conn.rollback()
+                    if e.errno != 1062 or attempt == self.APPEND_RETRIES:
+                        raise
+
+            self._appends += 1
+            if self._appends % self.purge_every == 0:
+                cur.execute(self.PURGE_SQL, (self.ttl_sec,))
+            conn.commit()
+            cur.close()
+            return last + 1
+        finally:
+            conn.close()
+
+    def reset(self, session_id: str) -> None:
+        conn = self._get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(self.RESET_SQL, (session_id,))
+            conn.commit()
+            cur.close()
+        finally:
+            conn.close()
+
+
+def get_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    if backend == "mysql":
+        return MySQLSessionStore()
+    if backend == "memory":
+        return MemorySessionStore()
+    raise ValueError(f"unknown SESSION_BACKEND: {backend}")
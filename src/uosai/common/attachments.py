@@ -0,0 +1,325 @@
+# src/uosai/common/attachments.py : 공지 첨부파일(PDF/HWP/HWPX/DOCX/TXT) 텍스트 추출 + 캐시
+#
+# 일정표/지원 자격 같은 내용이 첨부파일에만 있는 공지가 많아, 크롤러가 첨부를 내려받아 로컬 파서로 텍스트를 뽑고
+# 요약 프롬프트와 인덱서 청크에 함께 넣는다.
+#
+# - 다운로드: 스레드 풀로 동시에, 파일당 ATTACH_MAX_BYTES 초과 시 중단 (Content-Length + 스트리밍 누적 모두 확인)
+# - 캐시: notice_attachment 테이블 ((URL 해시, 공지) 키, 다른 공지에 같은 URL 이 있으면 그 행을 복사해 연결).
+#         ETag 가 있으면 If-None-Match 조건부 요청(304 → 재사용),
+#         내려받은 내용의 SHA-1 이 같은 파일이 이미 있으면 파싱 생략
+# - 파서: PDF 는 pypdf, HWP(5.x) 는 olefile, DOCX/HWPX 는 zip 안의 XML (표준 라이브러리). 없는 패키지는 해당 형식만 건너뜀
+import os, re, io, zlib, struct, hashlib, zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.message import Message
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urlparse
+from xml.etree import ElementTree
+
+import requests
+
+# ===== Env =====
+ATTACH_ENABLED   = os.getenv("ATTACH_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+ATTACH_MAX_BYTES = int(os.getenv("ATTACH_MAX_BYTES", str(20 * 2**20)))
+ATTACH_MAX_FILES = int(os.getenv("ATTACH_MAX_FILES", "5"))        # 공지당 처리할 첨부 수
+ATTACH_WORKERS   = int(os.getenv("ATTACH_WORKERS", "4"))
+ATTACH_MAX_CHARS = int(os.getenv("ATTACH_MAX_CHARS", "8000"))     # 공지당 첨부 텍스트 합계 (프롬프트/청크)
+ATTACH_TIMEOUT   = (10, int(os.getenv("ATTACH_READ_TIMEOUT", "30")))
+
+ATTACH_EXTS = (".pdf", ".hwp", ".hwpx", ".docx", ".txt")
+_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+class Attachment(NamedTuple):
+    url: str
+    filename: str
+    text: str
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _ext(name: str) -> str:
+    return os.path.splitext((name or "").lower())[1]
+
+
+# ===== Parsers =====
+def extract_pdf(data: bytes) -> str:
+    from pypdf import PdfReader
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join((p.extract_text() or "") for p in reader.pages)
+
+
+def _xml_text(xml: bytes, para_tag: str, text_tag: str) -> str:
+    """para_tag 단위로 줄바꿈, text_tag 의 텍스트를 이어 붙임 (네임스페이스 무시)"""
+    out = []
+    for el in ElementTree.fromstring(xml).iter():
+        tag = el.tag.rsplit("}", 1)[-1]
+        if tag == para_tag:
+            out.append("\n")
+        elif tag == text_tag and el.text:
+            out.append(el.text)
+    return "".join(out)
+
+
+def extract_docx(data: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        return _xml_text(z.read("word/document.xml"), "p", "t")
+
+
+def extract_hwpx(data: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        sections = sorted(n for n in z.namelist() if re.match(r"Contents/section\d+\.xml$", n))
+        return "\n".join(_xml_text(z.read(n), "p", "t") for n in sections)
+
+
+_HWPTAG_PARA_TEXT = 67
+# 확장/인라인 컨트롤 문자: 본문 안에서 8 WCHAR(16바이트)를 차지
+_HWP_WIDE_CTRL = {1, 2, 3, 4, 5, 6, 7, 8, 9, 11, 12, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23}
+
+
+def _hwp_para_text(payload: bytes) -> str:
+    chars = struct.unpack(f"<{len(payload) // 2}H", payload[:len(payload) // 2 * 2])
+    out, i = [], 0
+    while i < len(chars):
+        c = chars[i]
+        if c in _HWP_WIDE_CTRL:
+            i += 8
+            continue
+        if c in (10, 13):
+            out.append("\n")
+        elif c >= 32:
+            out.append(chr(c))
+        i += 1
+    return "".join(out)
+
+
+def extract_hwp(data: bytes) -> str:
+    """HWP 5.x: OLE 컨테이너의 BodyText/SectionN 레코드 중 PARA_TEXT 만 읽음"""
+    import olefile
+    ole = olefile.OleFileIO(io.BytesIO(data))
+    try:
+        compressed = bool(ole.openstream("FileHeader").read()[36] & 1)
+        sections = sorted(
+            (e for e in ole.listdir() if len(e) == 2 and e[0] == "BodyText" and e[1].startswith("Section")),
+            key=lambda e: int(e[1][len("Section"):] or 0),
+        )
+        out = []
+        for entry in sections:
+            buf = ole.openstream(entry).read()
+            if compressed:
+                buf = zlib.decompress(buf, -15)
+            pos = 0
+            while pos + 4 <= len(buf):
+                header, = struct.unpack_from("<I", buf, pos)
+                tag, size = header & 0x3FF, (header >> 20) & 0xFFF
+                pos += 4
+                if size == 0xFFF:
+                    size, = struct.unpack_from("<I", buf, pos)
+                    pos += 4
+                if tag == _HWPTAG_PARA_TEXT:
+                    out.append(_hwp_para_text(buf[pos:pos + size]))
+                pos += size
+        return "\n".join(out)
+    finally:
+        ole.close()
+
+
+def extract_txt(data: bytes) -> str:
+    for enc in ("utf-8", "cp949"):
+        try:
+            return data.decode(enc)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("utf-8", errors="ignore")
+
+
+PARSERS = {
+    ".pdf": extract_pdf, ".hwp": extract_hwp, ".hwpx": extract_hwpx, ".docx": extract_docx, ".txt": extract_txt,
+}
+
+
+def extract_text(filename: str, data: bytes) -> Optional[str]:
+    """확장자별 파서로 텍스트 추출. 지원 안 하는 형식/파서 미설치/손상 파일은 None"""
+    parser = PARSERS.get(_ext(filename))
+    if parser is None:
+        return None
+    try:
+        text = parser(data)
+    except ImportError as e:
+        print(f"[attach] {_ext(filename)} parser unavailable: {e}")
+        return None
+    except Exception as e:
+        print(f"[attach] parse failed {filename}: {type(e).__name__}: {e}")
+        return None
+    text = re.sub(r"[ \t\u00a0]+", " ", text)
+    return re.sub(r"\n\s*\n+", "\n\n", text).strip()
+
+
+# ===== Download =====
+class Download(NamedTuple):
+    url: str
+    status: int                 # 200, 304(캐시 유효), 0(실패/용량 초과)
+    filename: str
+    etag: Optional[str]
+    data: bytes
+
+
+def _filename(resp: requests.Response, url: str, hint: str) -> str:
+    cd = resp.headers.get("Content-Disposition")
+    if cd:
+        msg = Message()
+        msg["content-disposition"] = cd
+        name = msg.get_filename()
+        if name:
+            # 국내 게시판은 RFC 5987 대신 UTF-8/EUC-KR 바이트를 latin-1 로 내려주는 경우가 많음
+            for enc in ("utf-8", "cp949"):
+                try:
+                    name = name.encode("latin-1").decode(enc)
+                    break
+                except (UnicodeEncodeError, UnicodeDecodeError):
+                    continue
+            return unquote(name).strip().strip('"')
+    if _ext(hint) in ATTACH_EXTS:
+        return hint
+    return unquote(os.path.basename(urlparse(url).path))
+
+
+def download(url: str, hint: str = "", etag: Optional[str] = None, max_bytes: int = ATTACH_MAX_BYTES) -> Download:
+    headers = dict(_HEADERS)
+    if etag:
+        headers["If-None-Match"] = etag
+    try:
+        with requests.get(url, headers=headers, stream=True, timeout=ATTACH_TIMEOUT) as r:
+            if r.status_code == 304:
+                return Download(url, 304, hint, etag, b"")
+            name = _filename(r, url, hint)
+            if r.status_code != 200 or int(r.headers.get("Content-Length") or 0) > max_bytes:
+                return Download(url, 0, name, None, b"")
+            buf = io.BytesIO()
+            for chunk in r.iter_content(64 * 1024):
+                buf.write(chunk)
+                if buf.tell() > max_bytes:
+                    print(f"[attach] too large (> {max_bytes} bytes): {name}")
+                    return Download(url, 0, name, None, b"")
+            return Download(url, 200, name, r.headers.get("ETag"), buf.getvalue())
+    except requests.RequestException as e:
+        print(f"[attach] download failed {url}: {e}")
+        return Download(url, 0, hint, None, b"")
+
+
+# ===== notice_attachment 캐시 =====
+# 같은 파일이 여러 공지에 걸릴 수 있으므로 키는 (url_hash, category, post_number): 공지마다 자기 행을 가진다
+UPSERT_ATTACHMENT_SQL = """
+INSERT INTO notice_attachment
+    (url_hash, category, post_number, url, filename, etag, content_hash, bytes, text, updated_at)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) AS new
+ON DUPLICATE KEY UPDATE
+    filename = new.filename, etag = new.etag, content_hash = new.content_hash, bytes = new.bytes,
+    text = new.text, updated_at = new.updated_at
+"""
+
+
+class _Cached(NamedTuple):
+    filename: str
+    etag: Optional[str]
+    content_hash: str
+    bytes: int
+    text: str
+    linked: bool                # 이 공지의 행이 이미 있는지 (없으면 다른 공지 행을 복사해 연결)
+
+
+def _cached(cur, key: Tuple[str, int], hashes: List[str]) -> Dict[str, _Cached]:
+    """url_hash → 가장 최근 캐시 행 (이 공지의 행이 있으면 그것을 우선)"""
+    if not hashes:
+        return {}
+    cur.execute(
+        "SELECT url_hash, category, post_number, filename, etag, content_hash, bytes, text FROM notice_attachment "
+        "WHERE url_hash IN (" + ",".join(["%s"] * len(hashes)) + ") ORDER BY updated_at", tuple(hashes)
+    )
+    out: Dict[str, _Cached] = {}
+    for h, cat, pno, name, etag, content_hash, size, text in cur.fetchall():
+        mine = (cat, int(pno)) == (key[0], int(key[1]))
+        if mine or not (h in out and out[h].linked):
+            out[h] = _Cached(name, etag, content_hash, int(size), text or "", mine)
+    return out
+
+
+def _text_by_content(cur, content_hash: str) -> Optional[str]:
+    cur.execute("SELECT text FROM notice_attachment WHERE content_hash = %s LIMIT 1", (content_hash,))
+    r = cur.fetchone()
+    return r[0] if r else None
+
+
+def collect(cur, key: Tuple[str, int], links: List[Tuple[str, str]],
+            workers: int = ATTACH_WORKERS) -> List[Attachment]:
+    """
+    (url, 표시 이름) 목록 → 첨부 텍스트. 다운로드만 스레드 풀에서 하고 DB/파싱 결과 반영은 호출 스레드에서.
+    ETag 없이 캐시된 URL 은 다시 받지 않는다 (첨부는 보통 URL 이 바뀌어야 내용이 바뀜).
+    """
+    links = links[:ATTACH_MAX_FILES]
+    cached = _cached(cur, key, [url_hash(u) for u, _ in links])
+    now = datetime.now().replace(microsecond=0)
+    out: Dict[str, Attachment] = {}
+
+    def reuse(url: str, hit: _Cached) -> None:
+        if not hit.linked:
+            cur.execute(UPSERT_ATTACHMENT_SQL, (
+                url_hash(url), key[0], key[1], url[:1000], hit.filename, hit.etag, hit.content_hash,
+                hit.bytes, hit.text, now,
+            ))
+        out[url] = Attachment(url, hit.filename, hit.text)
+
+    todo = []
+    for url, hint in links:
+        hit = cached.get(url_hash(url))
+        if hit and not hit.etag:
+            reuse(url, hit)
+        else:
+            todo.append((url, hint, hit.etag if hit else None))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo) or 1))) as ex:
+        results = list(ex.map(lambda t: download(*t), todo))
+
+    for d in results:
+        if d.status == 304:
+            reuse(d.url, cached[url_hash(d.url)])
+            continue
+        if d.status != 200 or _ext(d.filename) not in ATTACH_EXTS:
+            continue
+        content_hash = hashlib.sha1(d.data).hexdigest()
+        text = _text_by_content(cur, content_hash)
+        if text is None:
+            text = extract_text(d.filename, d.data)
+            if text is None:
+                continue
+        cur.execute(UPSERT_ATTACHMENT_SQL, (
+            url_hash(d.url), key[0], key[1], d.url[:1000], d.filename[:255], d.etag, content_hash,
+            len(d.data), text, now,
+        ))
+        out[d.url] = Attachment(d.url, d.filename, text)
+    # 원래 순서 유지
+    return [out[u] for u, _ in links if u in out and out[u].text]
+
+
+def format_attachments(items: List[Attachment], max_chars: int = ATTACH_MAX_CHARS) -> str:
+    """[첨부: 파일명] 블록으로 이어 붙이고 합계 max_chars 로 자름"""
+    parts = [f"[첨부: {a.filename}]\n{a.text}" for a in items if a.text]
+    text = "\n\n".join(parts)
+    if len(text) > max_chars:
+        text = text[:max_chars] + "\n\n[... 첨부 일부 생략 ...]"
+    return text
+
+
+# ===== 인덱서용 =====
+def fetch_attachment_texts(cur) -> Dict[Tuple[str, int], List[Attachment]]:
+    """(category, post_number) → 첨부 텍스트 목록"""
+    cur.execute(
+        "SELECT category, post_number, url, filename, text FROM notice_attachment "
+        "WHERE text <> '' ORDER BY category, post_number, url"
+    )
+    out: Dict[Tuple[str, int], List[Attachment]] = {}
+    for cat, pno, url, name, text in cur.fetchall():
+        out.setdefault((cat, int(pno)), []).append(Attachment(url, name, text))
+    return out
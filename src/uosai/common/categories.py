@@ -0,0 +1,30 @@
+# src/uosai/common/categories.py : 공지 카테고리 정의 (크롤러/인덱서/챗봇 공용, 외부 의존성 없음)
+from typing import Dict
+
+# 카테고리 ↔ list_id 매핑
+CATEGORIES: Dict[str, str] = {
+    "COLLEGE_ENGINEERING": "20013DA1",
+    "COLLEGE_HUMANITIES": "human01",
+    "COLLEGE_SOCIAL_SCIENCES": "econo01",
+    "COLLEGE_URBAN_SCIENCE": "urbansciences01",
+    "COLLEGE_ARTS_SPORTS": "artandsport01",
+    "COLLEGE_BUSINESS": "20008N2",
+    "COLLEGE_NATURAL_SCIENCES": "scien01",
+    "COLLEGE_LIBERAL_CONVERGENCE": "clacds01",
+    "GENERAL": "FA1",
+    "ACADEMIC": "FA2",
+}
+
+# 카테고리 ↔ 한국어 게시판 이름
+CATEGORY_LABELS: Dict[str, str] = {
+    "GENERAL": "일반공지",
+    "ACADEMIC": "학사공지",
+    "COLLEGE_ENGINEERING": "공과대학",
+    "COLLEGE_HUMANITIES": "인문대학",
+    "COLLEGE_SOCIAL_SCIENCES": "정경대학",
+    "COLLEGE_URBAN_SCIENCE": "도시과학대학",
+    "COLLEGE_ARTS_SPORTS": "예술체육대학",
+    "COLLEGE_BUSINESS": "경영대학",
+    "COLLEGE_NATURAL_SCIENCES": "자연과학대학",
+    "COLLEGE_LIBERAL_CONVERGENCE": "자유융합대학",
+}
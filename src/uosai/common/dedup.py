@@ -0,0 +1,242 @@
+# src/uosai/common/dedup.py : 게시판 간 중복 공지 탐지 (MinHash + LSH)
+#
+# 같은 공지가 GENERAL/ACADEMIC/단과대 게시판에 함께 올라오는 경우,
+# 정규화한 본문의 문자 shingle 집합으로 MinHash 서명을 만들고 LSH 밴드로 후보를 찾아
+# 추정 Jaccard ≥ DEDUP_THRESHOLD 이면 먼저 수집된 공지(canonical)의 중복으로 연결한다.
+#
+# - 크롤러: 요약(Playwright + LLM) 전에 조회 → 유사도 ≥ DEDUP_THRESHOLD 면 canonical 에 연결만 하고,
+#           거의 동일(≥ DEDUP_REUSE_THRESHOLD, 제목·날짜/숫자 토큰 일치)할 때만 canonical 요약을 재사용
+#           (1차/2차 공지처럼 템플릿이 같고 날짜만 다른 글은 0.7~0.8대가 나오므로 요약은 새로 만든다)
+# - 인덱서: 요약이 canonical 과 같은 중복 공지만 임베딩에서 빼고 canonical 메타데이터에 출처 링크/게시판을 합친다
+# 서명/연결은 notice_minhash 테이블에 보관 (DB 접근은 호출 측 커서를 받음 → 크롤러/인덱서 공용)
+import os, re, hashlib, unicodedata
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+# ===== Env =====
+DEDUP_ENABLED     = os.getenv("DEDUP_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+DEDUP_NUM_PERM    = int(os.getenv("DEDUP_NUM_PERM", "128"))
+DEDUP_BANDS       = int(os.getenv("DEDUP_BANDS", "16"))         # 16밴드×8행 → 유사도 ~0.7부터 후보
+DEDUP_SHINGLE     = int(os.getenv("DEDUP_SHINGLE", "5"))        # 문자 n-gram 길이
+DEDUP_THRESHOLD   = float(os.getenv("DEDUP_THRESHOLD", "0.8"))  # 추정 Jaccard 이상이면 중복으로 연결
+DEDUP_REUSE_THRESHOLD = float(os.getenv("DEDUP_REUSE_THRESHOLD", "0.95"))  # 이상이면(+제목/숫자 일치) 요약 재사용
+DEDUP_WINDOW_DAYS = int(os.getenv("DEDUP_WINDOW_DAYS", "120"))  # 이 기간 안에 게시된 공지끼리만 비교
+DEDUP_MIN_CHARS   = int(os.getenv("DEDUP_MIN_CHARS", "80"))     # 본문이 이보다 짧으면 판단 안 함
+
+NoticeKey = Tuple[str, int]
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# 게시판마다 다른 머리말/꼬리말 (본문 비교에서 제외)
+_BOILERPLATE = re.compile(r"(첨부\s*파일|첨부|조회수?|작성자|등록일|목록|이전글|다음글)[^\n]*")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC + 소문자 + 게시판 공통 문구 제거 + 공백/문장부호 제거 (숫자/날짜는 유지)"""
+    t = unicodedata.normalize("NFKC", text or "").lower()
+    t = _BOILERPLATE.sub(" ", t)
+    return re.sub(r"[\W_]+", "", t)
+
+
+def number_digest(text: str) -> str:
+    """본문의 날짜/숫자 토큰 순서열 해시 (1차/2차, 마감일만 다른 공지 구분용)"""
+    t = _BOILERPLATE.sub(" ", unicodedata.normalize("NFKC", text or ""))
+    return hashlib.sha1(" ".join(re.findall(r"\d+", t)).encode("utf-8")).hexdigest()
+
+
+def normalize_title(title: str) -> str:
+    return re.sub(r"[\W_]+", "", unicodedata.normalize("NFKC", title or "").lower())
+
+
+def shingles(text: str, k: int = DEDUP_SHINGLE) -> Set[str]:
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+class MinHasher:
+    """h_i(x) = (a_i·x + b_i) mod (2^61-1) mod 2^32 의 최솟값 (고정 시드 → 실행/프로세스 간 서명 호환)"""
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)   # a·x + b < 2^64 (오버플로 없음)
+        self.b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        sh = shingles(normalize_text(text))
+        sig = np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        if not sh:
+            return sig.astype(np.uint32)
+        hv = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in sh),
+            dtype=np.uint64, count=len(sh),
+        )
+        # (num_perm, 1) × (1, n) 한 번에 계산 후 열 방향 최솟값
+        ph = ((self.a[:, None] * hv[None, :] + self.b[:, None]) % _MERSENNE) & _MAX_HASH
+        return ph.min(axis=1).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """서명 일치 비율 = Jaccard 추정치"""
+    return float(np.mean(a == b))
+
+
+class LSHIndex:
+    """서명을 bands 개 밴드로 나눠 밴드별 해시 버킷에 등록, 한 밴드라도 같으면 후보"""
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, bands: int = DEDUP_BANDS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm({num_perm}) must be divisible by bands({bands})")
+        self.rows = num_perm // bands
+        self.buckets: List[Dict[bytes, List[NoticeKey]]] = [{} for _ in range(bands)]
+        self.signatures: Dict[NoticeKey, np.ndarray] = {}
+
+    def _band_keys(self, sig: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for i in range(len(self.buckets)):
+            yield i, sig[i * self.rows:(i + 1) * self.rows].tobytes()
+
+    def add(self, key: NoticeKey, sig: np.ndarray) -> None:
+        if key in self.signatures:
+            self.remove(key)
+        self.signatures[key] = sig
+        for i, h in self._band_keys(sig):
+            self.buckets[i].setdefault(h, []).append(key)
+
+    def remove(self, key: NoticeKey) -> None:
+        sig = self.signatures.pop(key, None)
+        if sig is None:
+            return
+        for i, h in self._band_keys(sig):
+            keys = self.buckets[i].get(h, [])
+            if key in keys:
+                keys.remove(key)
+
+    def candidates(self, sig: np.ndarray) -> Set[NoticeKey]:
+        out: Set[NoticeKey] = set()
+        for i, h in self._band_keys(sig):
+            out.update(self.buckets[i].get(h, ()))
+        return out
+
+    def best_match(self, sig: np.ndarray, exclude: Optional[NoticeKey] = None) -> Optional[Tuple[NoticeKey, float]]:
+        best = None
+        for key in self.candidates(sig):
+            if key == exclude:
+                continue
+            s = similarity(sig, self.signatures[key])
+            if best is None or s > best[1]:
+                best = (key, s)
+        return best
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+
+class Fingerprint(NamedTuple):
+    signature: np.ndarray
+    numbers: str            # number_digest
+
+
+class DuplicateMatch(NamedTuple):
+    canonical: NoticeKey
+    similarity: float
+    same_numbers: bool      # 날짜/숫자 토큰까지 canonical 과 같은지
+
+    def reusable(self, title: str, canonical_title: str) -> bool:
+        """canonical 요약을 그대로 써도 되는 거의 동일한 공지인지"""
+        return (self.similarity >= DEDUP_REUSE_THRESHOLD and self.same_numbers
+                and normalize_title(title) == normalize_title(canonical_title))
+
+
+# ===== notice_minhash 저장소 =====
+UPSERT_MINHASH_SQL = """
+INSERT INTO notice_minhash
+    (category, post_number, num_perm, signature, number_hash, canonical_category, canonical_post_number,
+     similarity, posted_date, updated_at)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) AS new
+ON DUPLICATE KEY UPDATE
+    num_perm = new.num_perm, signature = new.signature, number_hash = new.number_hash,
+    canonical_category = new.canonical_category, canonical_post_number = new.canonical_post_number,
+    similarity = new.similarity, posted_date = new.posted_date, updated_at = new.updated_at
+"""
+
+
+class NoticeDeduper:
+    """
+    최근 DEDUP_WINDOW_DAYS 일치 서명을 메모리 LSH 로 올려 두고 크롤링하면서 갱신.
+    canonical 은 먼저 수집된 공지, 중복의 중복은 원래 canonical 로 연결한다.
+    """
+
+    def __init__(self, hasher: Optional[MinHasher] = None, threshold: float = DEDUP_THRESHOLD):
+        self.hasher = hasher or MinHasher()
+        self.threshold = threshold
+        self.index = LSHIndex(self.hasher.num_perm)
+        self.canonical: Dict[NoticeKey, NoticeKey] = {}   # 중복 → canonical
+        self.numbers: Dict[NoticeKey, str] = {}           # 공지 → number_digest
+
+    def load(self, cur, window_days: int = DEDUP_WINDOW_DAYS) -> int:
+        since = date.today() - timedelta(days=window_days)
+        cur.execute(
+            "SELECT category, post_number, num_perm, signature, number_hash, canonical_category, canonical_post_number "
+            "FROM notice_minhash WHERE posted_date IS NULL OR posted_date >= %s", (since,)
+        )
+        for cat, pno, num_perm, blob, nums, ccat, cpno in cur.fetchall():
+            if int(num_perm) != self.hasher.num_perm:
+                continue   # 설정이 바뀐 옛 서명은 다시 수집될 때 갱신
+            key = (cat, int(pno))
+            if nums:
+                self.numbers[key] = nums
+            if ccat is not None:
+                self.canonical[key] = (ccat, int(cpno))
+            else:
+                self.index.add(key, np.frombuffer(blob, dtype="<u4"))
+        return len(self.index) + len(self.canonical)
+
+    def check(self, key: NoticeKey, text: str) -> Tuple[Fingerprint, Optional[DuplicateMatch]]:
+        """(지문, 중복이면 canonical 매치). LSH 에는 canonical 공지만 들어 있다."""
+        fp = Fingerprint(self.hasher.signature(text), number_digest(text))
+        if len(normalize_text(text)) < DEDUP_MIN_CHARS:
+            return fp, None
+        hit = self.index.best_match(fp.signature, exclude=key)
+        if hit is None or hit[1] < self.threshold:
+            return fp, None
+        canonical = self.canonical.get(hit[0], hit[0])
+        return fp, DuplicateMatch(canonical, hit[1], self.numbers.get(canonical) == fp.numbers)
+
+    def record(self, cur, key: NoticeKey, fp: Fingerprint, posted_date=None,
+               match: Optional[DuplicateMatch] = None) -> None:
+        sig = fp.signature
+        self.numbers[key] = fp.numbers
+        if match is None:
+            self.canonical.pop(key, None)
+            self.index.add(key, sig)
+        else:
+            self.index.remove(key)
+            self.canonical[key] = match.canonical
+        cur.execute(UPSERT_MINHASH_SQL, (
+            key[0], key[1], self.hasher.num_perm, sig.astype("<u4").tobytes(), fp.numbers,
+            match.canonical[0] if match else None, match.canonical[1] if match else None,
+            round(match.similarity, 4) if match else None, posted_date,
+            datetime.now().replace(microsecond=0),
+        ))
+
+
+# ===== 인덱서용 =====
+FETCH_DUPLICATES_SQL = """
+SELECT m.category, m.post_number, m.canonical_category, m.canonical_post_number, n.link
+FROM notice_minhash m
+JOIN notice n ON n.category = m.category AND n.post_number = m.post_number
+WHERE m.canonical_category IS NOT NULL
+"""
+
+
+def fetch_duplicate_groups(cur) -> Dict[NoticeKey, List[Dict[str, object]]]:
+    """canonical 키 → 중복 공지들 [{category, post_number, link}]"""
+    cur.execute(FETCH_DUPLICATES_SQL)
+    out: Dict[NoticeKey, List[Dict[str, object]]] = {}
+    for cat, pno, ccat, cpno, link in cur.fetchall():
+        out.setdefault((ccat, int(cpno)), []).append({"category": cat, "post_number": int(pno), "link": link})
+    return out
@@ -0,0 +1,209 @@
+# src/uosai/common/embed_service.py : 임베딩 전용 서버 (모델 1벌 + 동적 마이크로 배칭) + LangChain Embeddings 클라이언트
+#
+# API 워커/인덱서가 각자 SentenceTransformer 를 올리면 프로세스마다 수백 MB 를 쓰고, 단건 질의는 하나씩 인코딩된다.
+# 서버 하나가 모델을 들고, EMBED_BATCH_WINDOW_MS 안에 들어온 요청들을 한 배치(최대 EMBED_MAX_BATCH 문장)로 묶어 인코딩한다.
+#
+#   python scripts/run_embed_server.py                          # 기본: unix:/tmp/uosai-embed.sock
+#   EMBED_SERVICE_URL=unix:/tmp/uosai-embed.sock python scripts/run_chat_api.py   # 워커는 모델을 로드하지 않음
+#   EMBED_SERVICE_URL=http://127.0.0.1:9300 python scripts/run_indexer.py
+#
+# 응답 본문은 little-endian float32 원시 바이트 (X-Embedding-Dim 헤더) → JSON 숫자 직렬화 비용 없음
+# 클라이언트는 httpx + numpy 만 사용 (torch/sentence_transformers 를 import 하지 않음)
+import os, time, asyncio, itertools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from uosai.common.metrics import count, stage
+
+# ===== Env =====
+EMBED_SERVICE_URL      = os.getenv("EMBED_SERVICE_URL", "").strip()           # 비어 있으면 프로세스 내 모델 사용
+EMBED_SERVICE_TIMEOUT  = float(os.getenv("EMBED_SERVICE_TIMEOUT", "120"))
+EMBED_BATCH_WINDOW_MS  = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))       # 첫 요청 후 추가 요청을 기다리는 시간
+EMBED_MAX_BATCH        = int(os.getenv("EMBED_MAX_BATCH", "64"))              # 한 배치로 묶을 최대 문장 수
+DEFAULT_SOCKET         = "unix:/tmp/uosai-embed.sock"
+
+DIM_HEADER = "X-Embedding-Dim"
+
+
+def split_url(url: str) -> Tuple[Optional[str], str]:
+    """unix:/path.sock → (소켓 경로, 가상 base_url), http://... → (None, url)"""
+    if url.startswith("unix:"):
+        return url[len("unix:"):], "http://embed"
+    return None, url.rstrip("/")
+
+
+# ===== Client =====
+class EmbeddingServiceClient(Embeddings):
+    """임베딩 서버 클라이언트 (get_embedding_instance 가 EMBED_SERVICE_URL 이 있으면 반환)"""
+
+    def __init__(self, url: str = EMBED_SERVICE_URL or DEFAULT_SOCKET, expected_model: Optional[str] = None,
+                 timeout: float = EMBED_SERVICE_TIMEOUT):
+        import httpx
+        uds, base_url = split_url(url)
+        transport = httpx.HTTPTransport(uds=uds, retries=2) if uds else httpx.HTTPTransport(retries=2)
+        self.url = url
+        self._client = httpx.Client(transport=transport, base_url=base_url, timeout=timeout)
+        info = self._client.get("/health").json()
+        self.model_name = info["model"]
+        self.dimension = int(info["dim"])
+        if expected_model and expected_model != self.model_name:
+            # notice_chunk/Pinecone 벡터와 다른 모델이면 검색 결과가 무의미해짐
+            raise RuntimeError(f"embedding server model {self.model_name!r} != EMBED_MODEL {expected_model!r}")
+        print(f"[Embedding Service] {url} model={self.model_name} dim={self.dimension}")
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        r = self._client.post("/embed", json={"texts": texts})
+        r.raise_for_status()
+        return np.frombuffer(r.content, dtype="<f4").reshape(-1, int(r.headers[DIM_HEADER]))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._embed(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        if not text:
+            return []
+        return self._embed([text])[0].tolist()
+
+
+# ===== Server =====
+class MicroBatcher:
+    """
+    요청(문장 목록)을 큐에 넣고, 첫 요청부터 window 동안(또는 max_batch 문장이 찰 때까지) 모아 한 번에 인코딩.
+    인코딩은 단일 스레드 실행기에서 → 인코딩 중에 들어온 요청은 다음 배치로 모인다.
+    max_batch 보다 큰 요청은 max_batch 조각으로 나눠 낮은 우선순위로 넣는다
+    → 인덱서의 대량 요청 조각 사이사이에 짧은 질의가 먼저 끼어든다.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray],
+                 window_ms: float = EMBED_BATCH_WINDOW_MS, max_batch: int = EMBED_MAX_BATCH):
+        self.encode = encode
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        # (우선순위, 순번, 문장, future) — 0: max_batch 이하 요청, 1: 큰 요청의 조각. 같은 우선순위는 도착 순
+        self.queue: "asyncio.PriorityQueue[Tuple[int, int, List[str], asyncio.Future]]" = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self.batches = 0
+        self.texts = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+        self.executor.shutdown(wait=False)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        prio = 0 if len(texts) <= self.max_batch else 1
+        futs = []
+        for i in range(0, len(texts), self.max_batch):
+            fut = loop.create_future()
+            await self.queue.put((prio, next(self._seq), texts[i:i + self.max_batch], fut))
+            futs.append(fut)
+        if len(futs) == 1:
+            return await futs[0]
+        return np.concatenate(await asyncio.gather(*futs))
+
+    async def _collect(self) -> List[Tuple[List[str], asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        _, _, texts, fut = await self.queue.get()
+        items = [(texts, fut)]
+        n = len(texts)
+        deadline = loop.time() + self.window
+        while n < self.max_batch:
+            timeout = deadline - loop.time()
+            try:
+                item = self.queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self.queue.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if n + len(item[2]) > self.max_batch:
+                self.queue.put_nowait(item)     # 순번이 그대로라 다음 배치의 맨 앞
+                break
+            items.append((item[2], item[3]))
+            n += len(item[2])
+        return items
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [(t, f) for t, f in await self._collect() if not f.cancelled()]
+            if not items:
+                continue
+            texts = [t for ts, _ in items for t in ts]
+            try:
+                with stage("embed_server.encode"):
+                    vecs = await loop.run_in_executor(self.executor, self.encode, texts)
+            except Exception as e:
+                for _, fut in items:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            self.batches += 1
+            self.texts += len(texts)
+            count("embed_server.batches")
+            count("embed_server.texts", len(texts))
+            pos = 0
+            for ts, fut in items:
+                if not fut.done():
+                    fut.set_result(vecs[pos:pos + len(ts)])
+                pos += len(ts)
+
+
+def create_app(model_name: Optional[str] = None):
+    """uvicorn 으로 띄울 FastAPI 앱 (모델은 lifespan 에서 1회 로드)"""
+    from fastapi import FastAPI, HTTPException
+    from fastapi.responses import PlainTextResponse, Response
+    from pydantic import BaseModel
+    from uosai.common.metrics import render_prometheus
+    from uosai.common.utils import EMBED_MODEL, KoreanSentenceTransformerEmbeddings
+
+    model_name = model_name or EMBED_MODEL
+
+    class EmbedRequest(BaseModel):
+        texts: List[str]
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        t0 = time.perf_counter()
+        model = await asyncio.to_thread(KoreanSentenceTransformerEmbeddings, model_name)
+        encode = lambda texts: np.asarray(model.embed_documents(texts), dtype="<f4")
+        await asyncio.to_thread(encode, ["워밍업"])
+        app.state.dim = model.dimension
+        app.state.batcher = MicroBatcher(encode)
+        app.state.batcher.start()
+        print(f"[embed-server] ready in {time.perf_counter() - t0:.1f}s (window={EMBED_BATCH_WINDOW_MS}ms, "
+              f"max_batch={EMBED_MAX_BATCH})")
+        yield
+        await app.state.batcher.stop()
+
+    app = FastAPI(title="UoScholar Embedding", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health():
+        b = app.state.batcher
+        return {"status": "ok", "model": model_name, "dim": app.state.dim, "batches": b.batches,
+                "texts": b.texts, "avg_batch": round(b.texts / b.batches, 2) if b.batches else 0.0,
+                "queued": b.queue.qsize()}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    @app.post("/embed")
+    async def embed(body: EmbedRequest):
+        if not body.texts:
+            raise HTTPException(status_code=400, detail="texts is empty")
+        vecs = await app.state.batcher.embed(body.texts)
+        return Response(vecs.astype("<f4").tobytes(), media_type="application/octet-stream",
+                        headers={DIM_HEADER: str(app.state.dim)})
+
+    return app
@@ -0,0 +1,109 @@
+# src/uosai/common/image_cache.py : 본문 이미지(포스터/배너) 바이트 해시 → 추출 텍스트 캐시 (+ pHash 유사 이미지 집계)
+#
+# 여러 공지에 같은 포스터/배너가 반복해서 붙는 경우, 매번 스크린샷 슬라이스에 섞여 GPT-4o 로 다시 전송된다.
+# 본문 <img> 를 내려받아 이미지 바이트의 SHA-256 이 같은 항목이 있을 때만 저장된 텍스트를 재사용한다.
+# pHash(64비트 DCT 저주파 해시)는 같은 템플릿에 글자만 다른 포스터도 거리 0 으로 묶으므로 재사용 근거로 쓰지 않고,
+# 해밍 거리 ≤ IMAGE_HASH_MAX_DIST 인 "비슷한 이미지" 후보 집계(재인코딩된 같은 포스터가 얼마나 되는지)에만 쓴다.
+#
+# - 크롤러: 캐시 적중 이미지는 캡처에서 숨기고 텍스트만 프롬프트에 넣음, 새 이미지는 한 번만 텍스트 추출 후 저장
+# 저장소는 notice_image_text 테이블 (DB 접근은 호출 측 커서를 받음, dedup.py 와 같은 방식)
+import os, hashlib
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+from PIL import Image
+
+# ===== Env =====
+IMAGE_CACHE_ENABLED  = os.getenv("IMAGE_CACHE_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+IMAGE_HASH_MAX_DIST  = int(os.getenv("IMAGE_HASH_MAX_DIST", "6"))        # 비슷한 이미지 후보 (집계용, 재사용 안 함)
+IMAGE_MIN_SIDE       = int(os.getenv("IMAGE_MIN_SIDE", "200"))           # 이보다 작은 아이콘/버튼은 제외
+IMAGE_MAX_BYTES      = int(os.getenv("IMAGE_MAX_BYTES", str(8 * 2**20)))
+IMAGE_MAX_PER_NOTICE = int(os.getenv("IMAGE_MAX_PER_NOTICE", "8"))
+
+_HASH_SIZE = 8
+_DCT_SIZE = 32
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """DCT-II 직교 행렬 (scipy 없이 D @ X @ D.T 로 2차원 DCT)"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    d = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    d[0] /= np.sqrt(2.0)
+    return d
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def phash(img: Image.Image) -> int:
+    """32×32 흑백 → 2D DCT → 저주파 8×8 (DC 제외 중앙값 기준) → 64비트 정수"""
+    g = np.asarray(img.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT @ g @ _DCT.T)[:_HASH_SIZE, :_HASH_SIZE].flatten()
+    bits = low > np.median(low[1:])
+    return int(sum(1 << i for i, b in enumerate(bits) if b))
+
+
+def content_hash(data: bytes) -> str:
+    """재사용 키: 이미지 바이트 SHA-256"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _popcount64(x: np.ndarray) -> np.ndarray:
+    return np.unpackbits(x.astype("<u8").view(np.uint8)).reshape(-1, 64).sum(axis=1)
+
+
+# ===== notice_image_text 저장소 =====
+UPSERT_IMAGE_TEXT_SQL = """
+INSERT INTO notice_image_text (content_hash, phash, text, width, height, source_url, hits, created_at, updated_at)
+VALUES (%s, %s, %s, %s, %s, %s, 0, %s, %s) AS new
+ON DUPLICATE KEY UPDATE
+    phash = new.phash, text = new.text, width = new.width, height = new.height, source_url = new.source_url,
+    updated_at = new.updated_at
+"""
+
+TOUCH_IMAGE_TEXT_SQL = "UPDATE notice_image_text SET hits = hits + 1, updated_at = %s WHERE content_hash = %s"
+
+
+class ImageTextCache:
+    """바이트 해시 → 텍스트 (정확 일치만 재사용) + pHash 배열 (비슷한 이미지 후보 집계용, 전수 비교)"""
+
+    def __init__(self, max_dist: int = IMAGE_HASH_MAX_DIST):
+        self.max_dist = max_dist
+        self.texts: Dict[str, str] = {}
+        self.hashes = np.zeros(0, dtype=np.uint64)
+
+    def load(self, cur) -> int:
+        cur.execute("SELECT content_hash, phash, text FROM notice_image_text")
+        rows = cur.fetchall()
+        self.texts = {c: t or "" for c, _, t in rows}
+        self.hashes = np.asarray([int(h) for _, h, _ in rows], dtype=np.uint64)
+        return len(self.texts)
+
+    def lookup(self, digest: str) -> Optional[str]:
+        """같은 바이트의 이미지를 이미 처리했으면 그 텍스트"""
+        return self.texts.get(digest)
+
+    def near(self, h: int) -> Optional[int]:
+        """pHash 최근접 거리 (≤ max_dist 일 때만). 재사용 판단에는 쓰지 않는다."""
+        if not len(self.hashes):
+            return None
+        d = int(_popcount64(self.hashes ^ np.uint64(h)).min())
+        return d if d <= self.max_dist else None
+
+    def touch(self, cur, digest: str) -> None:
+        cur.execute(TOUCH_IMAGE_TEXT_SQL, (datetime.now().replace(microsecond=0), digest))
+
+    def record(self, cur, digest: str, h: int, text: str, size=None, source_url: Optional[str] = None) -> None:
+        now = datetime.now().replace(microsecond=0)
+        w, hgt = size or (None, None)
+        cur.execute(UPSERT_IMAGE_TEXT_SQL, (digest, h, text, w, hgt, (source_url or "")[:1000], now, now))
+        self.texts[digest] = text
+        self.hashes = np.append(self.hashes, np.uint64(h))
+
+    def __len__(self) -> int:
+        return len(self.texts)
@@ -0,0 +1,152 @@
+# src/uosai/common/job_queue.py : MySQL 기반 크롤 작업 큐 (crawl_job 테이블, 마이그레이션 009)
+#
+# 상태: pending → leased → done | (재시도) pending | (횟수 초과) failed
+# - claim: SELECT ... FOR UPDATE SKIP LOCKED 로 다른 워커가 잡고 있는 행은 건너뛰고 가져감 → 여러 프로세스가 동시에 소비
+# - lease: 잡은 작업의 run_after 를 임대 만료 시각으로 옮겨 두므로, 워커가 죽으면 만료 후 같은 조건으로 다시 잡힌다
+#          (pending → leased 순으로 상태마다 "run_after ≤ 지금" 조회 → idx_crawl_job_claim 인덱스 범위 스캔)
+# - retry: 실패 시 JOB_RETRY_BASE_SEC × 2^(시도-1) (최대 JOB_RETRY_MAX_SEC, ±20% 지터) 뒤로 미룸
+# DB 접근은 호출 측 커서를 받음 (claim 은 호출 측이 바로 커밋해야 잠금이 풀린다)
+import os, random
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# ===== Env =====
+JOB_LEASE_SEC      = int(os.getenv("JOB_LEASE_SEC", "600"))        # 한 건 처리 최대 예상 시간
+JOB_MAX_ATTEMPTS   = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SEC = int(os.getenv("JOB_RETRY_BASE_SEC", "60"))
+JOB_RETRY_MAX_SEC  = int(os.getenv("JOB_RETRY_MAX_SEC", str(6 * 3600)))
+
+STATES = ("pending", "leased", "done", "failed")
+
+
+class Job(NamedTuple):
+    id: int
+    source: str             # portal | cheme | lifesci
+    category: str
+    list_id: Optional[str]
+    item_id: int            # seq / wr_id / bbsidx
+    attempts: int           # 이번 시도를 포함한 횟수
+
+
+def _now() -> datetime:
+    return datetime.now().replace(microsecond=0)
+
+
+# 이미 있는 작업: done 은 다시 pending 으로 (게시물 수정 감지용 재방문, 처리 함수가 날짜 비교로 빠르게 넘어감),
+# pending/leased 는 그대로, failed 는 retry_failed 일 때만 되살림
+# (MySQL 은 SET 절을 왼쪽부터 평가하므로 state 를 마지막에 바꾼다)
+ENQUEUE_SQL = """
+INSERT INTO crawl_job (source, category, list_id, item_id, state, attempts, run_after, created_at, updated_at)
+VALUES (%s, %s, %s, %s, 'pending', 0, %s, %s, %s) AS new
+ON DUPLICATE KEY UPDATE
+    attempts   = IF(crawl_job.state = 'done' OR (%s AND crawl_job.state = 'failed'), 0, crawl_job.attempts),
+    run_after  = IF(crawl_job.state = 'done' OR (%s AND crawl_job.state = 'failed'), new.run_after, crawl_job.run_after),
+    updated_at = new.updated_at,
+    state      = IF(crawl_job.state = 'done' OR (%s AND crawl_job.state = 'failed'), 'pending', crawl_job.state)
+"""
+
+# 상태별로 따로 조회 → (state, run_after) 인덱스 순서 그대로 읽으므로 filesort 없이 LIMIT 건만 잠금
+# (state IN (...) 로 묶으면 두 범위를 합쳐 정렬해야 해서 조건에 맞는 행을 모두 읽고 잠근다)
+CLAIM_SQL = """
+SELECT id, source, category, list_id, item_id, attempts FROM crawl_job
+WHERE state = %s AND run_after <= %s
+ORDER BY run_after
+LIMIT %s
+FOR UPDATE SKIP LOCKED
+"""
+
+CLAIM_STATES = ("pending", "leased")     # 새 작업 먼저, 그다음 임대 만료 작업
+
+# 잠그지 않는 일반 SELECT (SKIP LOCKED 로 못 가져온 행이 있는지 확인용)
+DUE_COUNT_SQL = "SELECT COUNT(*) FROM crawl_job WHERE state = %s AND run_after <= %s"
+
+
+def enqueue(cur, jobs: List[Tuple[str, str, Optional[str], int]], retry_failed: bool = False) -> int:
+    """(source, category, list_id, item_id) 목록 등록. 반환: 영향받은 행 수 (MySQL: 신규 1, 갱신 2)"""
+    now = _now()
+    flag = 1 if retry_failed else 0
+    n = 0
+    for source, category, list_id, item_id in jobs:
+        cur.execute(ENQUEUE_SQL, (source, category, list_id, int(item_id), now, now, now, flag, flag, flag))
+        n += cur.rowcount
+    return n
+
+
+def claim(cur, owner: str, limit: int = 1, lease_sec: int = JOB_LEASE_SEC,
+          max_attempts: int = JOB_MAX_ATTEMPTS) -> List[Job]:
+    """
+    실행 가능한 작업을 최대 limit 건 임대.
+    임대가 만료된 작업 중 이미 max_attempts 번 시도한 것은 failed 로 닫는다
+    (워커 프로세스째 죽이는 작업은 fail() 에 도달하지 못하므로 여기서 횟수를 강제).
+    """
+    now = _now()
+    jobs: List[Job] = []
+    for state in CLAIM_STATES:
+        while len(jobs) < limit:
+            cur.execute(CLAIM_SQL, (state, now, limit - len(jobs)))
+            rows = cur.fetchall()
+            dead = [int(r[0]) for r in rows if state == "leased" and int(r[5]) >= max_attempts]
+            if dead:
+                cur.execute(
+                    "UPDATE crawl_job SET state = 'failed', last_result = 'lease_expired', lease_owner = NULL, "
+                    "updated_at = %s WHERE id IN (" + ",".join(["%s"] * len(dead)) + ")",
+                    (now, *dead),
+                )
+            live = [r for r in rows if int(r[0]) not in dead]
+            if live:
+                # 바로 임대 → run_after 가 미래로 옮겨져 같은 트랜잭션의 다음 조회에 다시 잡히지 않음
+                cur.execute(
+                    "UPDATE crawl_job SET state = 'leased', lease_owner = %s, run_after = %s, "
+                    "attempts = attempts + 1, updated_at = %s WHERE id IN (" + ",".join(["%s"] * len(live)) + ")",
+                    (owner, now + timedelta(seconds=lease_sec), now, *[int(r[0]) for r in live]),
+                )
+                jobs += [Job(int(i), s, c, l, int(item), int(a) + 1) for i, s, c, l, item, a in live]
+            if not dead:        # 버린 행이 없으면 더 조회해도 남은 행이 없음
+                break
+    return jobs
+
+
+def due_count(cur) -> int:
+    """지금 실행 가능한 작업 수 (다른 워커가 잡는 중이라 SKIP LOCKED 로 건너뛴 행 포함)"""
+    now = _now()
+    n = 0
+    for state in CLAIM_STATES:
+        cur.execute(DUE_COUNT_SQL, (state, now))
+        n += int(cur.fetchone()[0])
+    return n
+
+
+def complete(cur, job: Job, owner: str, result: str) -> bool:
+    """완료 기록. 임대가 만료돼 다른 워커가 가져갔으면 False"""
+    cur.execute(
+        "UPDATE crawl_job SET state = 'done', last_result = %s, last_error = NULL, lease_owner = NULL, "
+        "updated_at = %s WHERE id = %s AND state = 'leased' AND lease_owner = %s",
+        (result, _now(), job.id, owner),
+    )
+    return cur.rowcount == 1
+
+
+def retry_delay(attempts: int) -> int:
+    base = min(JOB_RETRY_MAX_SEC, JOB_RETRY_BASE_SEC * 2 ** max(0, attempts - 1))
+    return int(base * random.uniform(0.8, 1.2))
+
+
+def fail(cur, job: Job, owner: str, result: str, error: str = "",
+         max_attempts: int = JOB_MAX_ATTEMPTS) -> Optional[str]:
+    """실패 기록 → 새 상태 (pending: 지수 백오프 후 재시도, failed: 횟수 초과). 임대를 잃었으면 None"""
+    now = _now()
+    state = "failed" if job.attempts >= max_attempts else "pending"
+    run_after = now if state == "failed" else now + timedelta(seconds=retry_delay(job.attempts))
+    cur.execute(
+        "UPDATE crawl_job SET state = %s, run_after = %s, last_result = %s, last_error = %s, lease_owner = NULL, "
+        "updated_at = %s WHERE id = %s AND state = 'leased' AND lease_owner = %s",
+        (state, run_after, result, (error or "")[:1000], now, job.id, owner),
+    )
+    return state if cur.rowcount == 1 else None
+
+
+def status_counts(cur) -> Dict[str, int]:
+    cur.execute("SELECT state, COUNT(*) FROM crawl_job GROUP BY state")
+    out = {s: 0 for s in STATES}
+    out.update({s: int(n) for s, n in cur.fetchall()})
+    return out
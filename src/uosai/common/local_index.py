@@ -0,0 +1,85 @@
+# src/uosai/common/local_index.py : 메모리 내 NumPy 벡터 인덱스 (Pinecone 대체, 오프라인 벤치/부하 테스트용)
+#
+# PineconeVectorStore 에서 챗봇이 쓰는 similarity_search_by_vector_with_score(vec, k, filter) 만 구현.
+# 메타데이터 필터는 retrieval.build_filter 가 만드는 Pinecone 문법($eq/$in/$gte/$lte/$and)을 그대로 해석한다.
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain.schema import Document
+
+
+def match_filter(meta: Dict[str, Any], flt: Optional[Dict[str, Any]]) -> bool:
+    if not flt:
+        return True
+    for field, cond in flt.items():
+        if field == "$and":
+            if not all(match_filter(meta, c) for c in cond):
+                return False
+            continue
+        if field == "$or":
+            if not any(match_filter(meta, c) for c in cond):
+                return False
+            continue
+        if not isinstance(cond, dict):
+            cond = {"$eq": cond}
+        if field not in meta:
+            return False
+        v = meta[field]
+        # 리스트 메타데이터는 원소 중 하나라도 맞으면 일치 (Pinecone 과 동일)
+        vs = v if isinstance(v, list) else [v]
+        for op, arg in cond.items():
+            ok = {
+                "$eq": lambda: arg in vs, "$ne": lambda: arg not in vs,
+                "$in": lambda: any(x in arg for x in vs), "$nin": lambda: not any(x in arg for x in vs),
+                "$gt": lambda: v > arg, "$gte": lambda: v >= arg,
+                "$lt": lambda: v < arg, "$lte": lambda: v <= arg,
+            }[op]()
+            if not ok:
+                return False
+    return True
+
+
+class LocalVectorStore:
+    """정규화된 (N, dim) float32 행렬 + 문서 목록. 점수는 Pinecone cosine 과 같은 내적값"""
+
+    def __init__(self, docs: List[Document], vectors: np.ndarray):
+        vecs = np.asarray(vectors, dtype=np.float32)
+        self.docs = list(docs)
+        self.matrix = vecs / (np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-12)
+        self._mask_cache: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_documents(cls, docs: List[Document], embeddings) -> "LocalVectorStore":
+        vecs = embeddings.embed_documents([d.page_content for d in docs])
+        return cls(docs, np.asarray(vecs, dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _mask(self, flt: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not flt:
+            return None
+        key = repr(sorted(flt.items()))
+        m = self._mask_cache.get(key)
+        if m is None:
+            m = np.fromiter((match_filter(d.metadata or {}, flt) for d in self.docs), dtype=bool, count=len(self.docs))
+            if len(self._mask_cache) > 256:
+                self._mask_cache.clear()
+            self._mask_cache[key] = m
+        return m
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4,
+                                               filter: Optional[Dict[str, Any]] = None,
+                                               **kwargs) -> List[Tuple[Document, float]]:
+        if not self.docs:
+            return []
+        q = np.asarray(embedding, dtype=np.float32)
+        q = q / (np.linalg.norm(q) + 1e-12)
+        scores = self.matrix @ q
+        mask = self._mask(filter)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        k = min(k, len(self.docs))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.docs[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
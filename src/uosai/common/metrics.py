@@ -0,0 +1,185 @@
+# src/uosai/common/metrics.py : 단계별 소요 시간/이벤트 계측 (외부 의존성 없음)
+#
+# - 히스토그램 uosai_stage_seconds{stage=...}, 카운터 uosai_events_total{event=...}
+# - API: GET /metrics 로 Prometheus 텍스트 포맷 노출 (워커 프로세스별 값)
+# - 배치(크롤러/인덱서): 종료 시 reports/<job>_<시각>.json 실행 리포트
+#
+#   @timed("crawler.fetch_notice_html")
+#   def fetch_notice_html(...): ...
+#
+#   with stage("chat.retrieve"):
+#       hits = await ...
+import os, json, time, threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+RUN_REPORT_DIR     = os.getenv("RUN_REPORT_DIR", "reports")
+METRICS_SAMPLE_MAX = int(os.getenv("METRICS_SAMPLE_MAX", "4096"))   # 리포트 분위수용 최근 샘플 수
+
+# 초 단위 버킷: 임베딩/DB(ms) ~ Playwright/LLM 요약(수십 초)까지
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelKey = Tuple[str, ...]
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labelnames: Tuple[str, ...] = ()):
+        self.name, self.doc, self.labelnames = name, doc, labelnames
+        self.values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, n: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(k, "")) for k in self.labelnames)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + n
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, v in sorted(self.values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {v:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.doc, self.labelnames = name, doc, labelnames
+        self.buckets = tuple(sorted(buckets))
+        # key → [버킷별 누적 전 개수..., sum, count], 최근 샘플
+        self.series: Dict[LabelKey, List[float]] = {}
+        self.samples: Dict[LabelKey, deque] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(k, "")) for k in self.labelnames)
+        with self._lock:
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = [0.0] * (len(self.buckets) + 2)
+                self.samples[key] = deque(maxlen=METRICS_SAMPLE_MAX)
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    s[i] += 1
+                    break
+            s[-2] += value
+            s[-1] += 1
+            self.samples[key].append(value)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, s in sorted(self.series.items()):
+                cum = 0.0
+                for b, n in zip(self.buckets, s):
+                    cum += n
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), key + (f'{b:g}',))} {cum:g}")
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), key + ('+Inf',))} {s[-1]:g}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {s[-2]:.6f}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {s[-1]:g}")
+        return lines
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """라벨 값 → count/total/mean/p50/p95/max (분위수는 최근 METRICS_SAMPLE_MAX개 기준)"""
+        out = {}
+        with self._lock:
+            for key, s in self.series.items():
+                xs = sorted(self.samples[key])
+                pct = lambda q: xs[min(len(xs) - 1, int(q * len(xs)))] if xs else 0.0
+                out["/".join(key) or self.name] = {
+                    "count": int(s[-1]), "total_sec": round(s[-2], 3),
+                    "mean_sec": round(s[-2] / s[-1], 4) if s[-1] else 0.0,
+                    "p50_sec": round(pct(0.5), 4), "p95_sec": round(pct(0.95), 4),
+                    "max_sec": round(xs[-1], 4) if xs else 0.0,
+                }
+        return out
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{n}="{esc(v)}"' for n, v in zip(names, values)) + "}"
+
+
+# ===== 전역 레지스트리 =====
+STAGE_SECONDS = Histogram("uosai_stage_seconds", "Time spent per pipeline stage", ("stage",))
+EVENTS = Counter("uosai_events_total", "Pipeline events and outcomes", ("event",))
+_STARTED = time.time()
+
+
+def stage(name: str):
+    """with stage("indexer.split_docs"): ... — 예외가 나도 시간은 기록"""
+    return STAGE_SECONDS.time(stage=name)
+
+def count(event: str, n: float = 1) -> None:
+    EVENTS.inc(n, event=event)
+
+def timed(name: str) -> Callable:
+    """함수 소요 시간을 stage 로 기록하고, 예외는 '<name>.error' 이벤트로 센다"""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                count(f"{name}.error")
+                raise
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - t0, stage=name)
+        return wrapper
+    return deco
+
+
+def render_prometheus() -> str:
+    return "\n".join(STAGE_SECONDS.expose() + EVENTS.expose()) + "\n"
+
+
+def run_report(job: str) -> Dict[str, Any]:
+    stages = STAGE_SECONDS.summary()
+    return {
+        "job": job,
+        "started_at": datetime.fromtimestamp(_STARTED).isoformat(timespec="seconds"),
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "wall_sec": round(time.time() - _STARTED, 1),
+        # 총 소요 시간 순 → 어디에 시간이 쓰였는지 바로 보이게
+        "stages": dict(sorted(stages.items(), key=lambda kv: kv[1]["total_sec"], reverse=True)),
+        "events": {"/".join(k): v for k, v in sorted(EVENTS.values.items())},
+    }
+
+
+def report_path(job: str, suffix: str = ".json", stamp: Optional[str] = None) -> str:
+    stamp = stamp or datetime.fromtimestamp(_STARTED).strftime("%Y%m%d_%H%M%S")
+    return os.path.join(RUN_REPORT_DIR, f"{job}_{stamp}{suffix}")
+
+
+def write_run_report(job: str, path: Optional[str] = None) -> str:
+    path = path or report_path(job)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(run_report(job), f, ensure_ascii=False, indent=2)
+    print(f"[metrics] run report → {path}")
+    return path
+
+
+def run_job(job: str, fn: Callable[[], Any]) -> Any:
+    """배치 엔트리포인트 실행 + (성공/실패와 무관하게) 실행 리포트 기록"""
+    try:
+        return fn()
+    except Exception:
+        count(f"{job}.failed")
+        raise
+    finally:
+        write_run_report(job)
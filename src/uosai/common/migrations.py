@@ -0,0 +1,287 @@
+# src/uosai/common/migrations.py : notice 스키마 버전 관리 + 핫 쿼리 EXPLAIN 점검
+#
+#   python scripts/run_migrations.py            # 미적용 마이그레이션 실행 후 점검
+#   python scripts/run_migrations.py --check    # 점검만 (인덱스를 안 타면 종료 코드 1)
+#
+# 적용 이력은 schema_migrations 테이블에 남는다.
+# 각 단계는 information_schema 로 현재 상태를 먼저 확인하므로, 손으로 만든 기존 테이블에도 안전하게 적용된다.
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from uosai.common.schema import (
+    NOTICE_TABLE, NOTICE_DDL, NOTICE_CHUNK_DDL, NOTICE_MINHASH_DDL, NOTICE_IMAGE_TEXT_DDL,
+    NOTICE_ATTACHMENT_DDL, CRAWL_JOB_DDL, NOTICE_INDEX_STATE_DDL,
+    EXISTS_SQL, FETCH_SUMMARY_SQL, FETCH_ROWS_SINCE_SQL, FETCH_ALL_ROWS_SQL, FETCH_ROWS_UPDATED_SQL,
+)
+from uosai.common.utils import DB_CONFIG, get_conn
+from uosai.common.job_queue import CLAIM_SQL
+
+MIGRATIONS_DDL = """
+CREATE TABLE schema_migrations (
+    version     INT          NOT NULL,
+    name        VARCHAR(200) NOT NULL,
+    applied_at  DATETIME     NOT NULL,
+    PRIMARY KEY (version)
+) DEFAULT CHARSET=utf8mb4
+"""
+
+def log(msg: str) -> None:
+    print(f"[migrate {datetime.now():%Y-%m-%d %H:%M:%S}] {msg}")
+
+
+# ===== information_schema =====
+def _table_exists(cur, table: str) -> bool:
+    cur.execute("SHOW TABLES LIKE %s", (table,))
+    return cur.fetchone() is not None
+
+def _has_column(cur, table: str, column: str) -> bool:
+    cur.execute("""
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    """, (table, column))
+    return cur.fetchone() is not None
+
+def _index_columns(cur, table: str) -> Dict[str, Tuple[bool, Tuple[str, ...]]]:
+    """인덱스명 → (unique 여부, 컬럼 순서)"""
+    cur.execute("""
+    SELECT index_name, non_unique, column_name
+    FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = %s
+    ORDER BY index_name, seq_in_index
+    """, (table,))
+    out: Dict[str, Tuple[bool, Tuple[str, ...]]] = {}
+    for name, non_unique, col in cur.fetchall():
+        uniq, cols = out.get(name, (not int(non_unique), ()))
+        out[name] = (uniq, cols + (col,))
+    return out
+
+def _has_index_on(cur, table: str, columns: Tuple[str, ...], unique: bool = False) -> bool:
+    """columns 로 시작하는 (unique 요청 시 정확히 그 컬럼들의 유니크) 인덱스가 있는지"""
+    for uniq, cols in _index_columns(cur, table).values():
+        if unique and uniq and cols == columns:
+            return True
+        if not unique and cols[:len(columns)] == columns:
+            return True
+    return False
+
+
+# ===== Migrations =====
+def m001_create_notice(cur) -> None:
+    if not _table_exists(cur, NOTICE_TABLE):
+        cur.execute(NOTICE_DDL)
+
+def m002_unique_category_post(cur) -> None:
+    # 크롤러 UPSERT(ON DUPLICATE KEY)와 EXISTS_SQL 의 근거. 중복 행이 있으면 여기서 실패하므로 먼저 정리해야 한다.
+    if not _has_index_on(cur, NOTICE_TABLE, ("category", "post_number"), unique=True):
+        cur.execute("""
+        SELECT category, post_number, COUNT(*) FROM notice
+        GROUP BY category, post_number HAVING COUNT(*) > 1 LIMIT 5
+        """)
+        dups = cur.fetchall()
+        if dups:
+            raise RuntimeError(f"duplicate (category, post_number) rows, clean up first: {dups}")
+        cur.execute("ALTER TABLE notice ADD UNIQUE KEY uq_notice_category_post (category, post_number)")
+
+def m003_posted_date_index(cur) -> None:
+    if not _has_index_on(cur, NOTICE_TABLE, ("posted_date",)):
+        cur.execute("ALTER TABLE notice ADD KEY idx_notice_posted_date (posted_date)")
+
+def m004_change_tracking(cur) -> None:
+    # 증분 소비자용: 수정 시각(행 값이 실제로 바뀔 때만 갱신) + 내용 해시(생성 열)
+    if not _has_column(cur, NOTICE_TABLE, "created_at"):
+        cur.execute("ALTER TABLE notice ADD COLUMN created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP")
+    if not _has_column(cur, NOTICE_TABLE, "updated_at"):
+        cur.execute("ALTER TABLE notice ADD COLUMN updated_at DATETIME NOT NULL "
+                    "DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
+    if not _has_column(cur, NOTICE_TABLE, "content_hash"):
+        cur.execute("""
+        ALTER TABLE notice ADD COLUMN content_hash CHAR(40) AS (SHA1(CONCAT_WS(CHAR(31),
+            COALESCE(title, ''), COALESCE(summary, ''), COALESCE(posted_date, ''),
+            COALESCE(department, ''), COALESCE(link, '')))) STORED
+        """)
+    if not _has_index_on(cur, NOTICE_TABLE, ("updated_at",)):
+        cur.execute("ALTER TABLE notice ADD KEY idx_notice_updated_at (updated_at)")
+
+def m005_notice_chunk(cur) -> None:
+    if not _table_exists(cur, "notice_chunk"):
+        cur.execute(NOTICE_CHUNK_DDL)
+
+def m006_notice_minhash(cur) -> None:
+    if not _table_exists(cur, "notice_minhash"):
+        cur.execute(NOTICE_MINHASH_DDL)
+
+def m007_notice_image_text(cur) -> None:
+    if not _table_exists(cur, "notice_image_text"):
+        cur.execute(NOTICE_IMAGE_TEXT_DDL)
+
+def m008_notice_attachment(cur) -> None:
+    if not _table_exists(cur, "notice_attachment"):
+        cur.execute(NOTICE_ATTACHMENT_DDL)
+
+def m009_crawl_job(cur) -> None:
+    if not _table_exists(cur, "crawl_job"):
+        cur.execute(CRAWL_JOB_DDL)
+
+def m010_attachment_per_notice_key(cur) -> None:
+    # 같은 첨부 URL 이 여러 공지에 걸리면 url_hash 단독 키로는 마지막 공지가 행을 가로챔 → 공지별 행
+    if _index_columns(cur, "notice_attachment").get("PRIMARY", (True, ()))[1] == ("url_hash",):
+        cur.execute("ALTER TABLE notice_attachment DROP PRIMARY KEY, "
+                    "ADD PRIMARY KEY (url_hash, category, post_number)")
+
+
+def m011_image_hash_and_number_hash(cur) -> None:
+    # 007 의 notice_image_text 는 phash 키였다 → 바이트 SHA-256 키로. 캐시라 옛 행은 버리고 다시 만든다
+    # (pHash 만으로는 원본 바이트 해시를 복원할 수 없음)
+    if _table_exists(cur, "notice_image_text") and not _has_column(cur, "notice_image_text", "content_hash"):
+        cur.execute("DROP TABLE notice_image_text")
+        cur.execute(NOTICE_IMAGE_TEXT_DDL)
+    # 006 의 notice_minhash 에 날짜/숫자 토큰 요약 (요약 재사용 판정용)
+    if _table_exists(cur, "notice_minhash") and not _has_column(cur, "notice_minhash", "number_hash"):
+        cur.execute("ALTER TABLE notice_minhash ADD COLUMN number_hash CHAR(40) NULL AFTER signature")
+
+def m012_notice_index_state(cur) -> None:
+    if not _table_exists(cur, "notice_index_state"):
+        cur.execute(NOTICE_INDEX_STATE_DDL)
+
+
+# (버전, 이름, 함수) — 버전은 늘리기만 하고, 적용된 단계는 고치지 않는다
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "create notice table", m001_create_notice),
+    (2, "unique (category, post_number)", m002_unique_category_post),
+    (3, "index posted_date", m003_posted_date_index),
+    (4, "updated_at / content_hash change tracking", m004_change_tracking),
+    (5, "notice_chunk embedding store", m005_notice_chunk),
+    (6, "notice_minhash near-duplicate index", m006_notice_minhash),
+    (7, "notice_image_text poster text cache", m007_notice_image_text),
+    (8, "notice_attachment text cache", m008_notice_attachment),
+    (9, "crawl_job queue", m009_crawl_job),
+    (10, "notice_attachment key (url_hash, category, post_number)", m010_attachment_per_notice_key),
+    (11, "notice_image_text content_hash key, notice_minhash.number_hash", m011_image_hash_and_number_hash),
+    (12, "notice_index_state change log", m012_notice_index_state),
+]
+
+
+def applied_versions() -> List[int]:
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        if not _table_exists(cur, "schema_migrations"):
+            cur.execute(MIGRATIONS_DDL)
+            conn.commit()
+        cur.execute("SELECT version FROM schema_migrations ORDER BY version")
+        out = [int(r[0]) for r in cur.fetchall()]
+        cur.close()
+        return out
+    finally:
+        conn.close()
+
+
+def migrate(target: Optional[int] = None) -> List[int]:
+    """미적용 마이그레이션을 순서대로 실행 (DDL은 MySQL에서 자동 커밋되므로 단계별로 기록)"""
+    done = set(applied_versions())
+    ran = []
+    for version, name, fn in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            log(f"apply {version:03d} {name}")
+            fn(cur)
+            cur.execute("INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+                        (version, name, datetime.now().replace(microsecond=0)))
+            conn.commit()
+            cur.close()
+        finally:
+            conn.close()
+        ran.append(version)
+    if not ran:
+        log("schema up to date")
+    return ran
+
+
+# ===== EXPLAIN 점검 =====
+# (이름, SQL, 파라미터, 기대 인덱스) — 기대 인덱스가 None 이면 전체 스캔이 정상
+# 파라미터가 문자열이면 실제 데이터에서 값을 뽑는 샘플 쿼리 (없는 키/빈 범위로 EXPLAIN 하면
+# "no matching row in const table" 처럼 key=NULL 인 계획이 나와 인덱스 사용 여부를 알 수 없다)
+HOT_QUERIES: List[Tuple[str, str, Any, Optional[str]]] = [
+    ("crawler.exists", EXISTS_SQL,
+     f"SELECT category, post_number FROM {NOTICE_TABLE} LIMIT 1", "uq_notice_category_post"),
+    ("crawler.canonical_summary", FETCH_SUMMARY_SQL,
+     f"SELECT category, post_number FROM {NOTICE_TABLE} LIMIT 1", "uq_notice_category_post"),
+    ("indexer.fetch_rows_since", FETCH_ROWS_SINCE_SQL,
+     f"SELECT MAX(posted_date) FROM {NOTICE_TABLE}", "idx_notice_posted_date"),
+    ("consumer.fetch_rows_updated", FETCH_ROWS_UPDATED_SQL,
+     f"SELECT MAX(updated_at) - INTERVAL 1 SECOND FROM {NOTICE_TABLE}", "idx_notice_updated_at"),
+    ("crawler.claim_job", CLAIM_SQL, ("pending", "2000-01-01", 1), "idx_crawl_job_claim"),
+    ("indexer.fetch_all_rows", FETCH_ALL_ROWS_SQL, (), None),
+]
+
+# 유니크 키로 const 테이블을 읽은 뒤에만 나오는 계획 (키 조회 자체는 인덱스를 탄 것)
+CONST_PLAN_NOTES = ("no matching row in const table", "Impossible WHERE noticed after reading const tables")
+
+
+def _probe_params(cur, params) -> Optional[tuple]:
+    """샘플 쿼리면 실행해서 첫 행을 파라미터로, 데이터가 없으면 None"""
+    if not isinstance(params, str):
+        return tuple(params)
+    cur.execute(params)
+    row = cur.fetchone()
+    values = tuple(row.values()) if row else ()
+    return values if values and all(v is not None for v in values) else None
+
+
+def explain_hot_queries() -> List[Dict[str, Any]]:
+    """
+    각 쿼리의 EXPLAIN 결과와 통과 여부 (실제 선택된 key 가 기대 인덱스여야 통과).
+    EXPLAIN 은 Note 1003(재작성된 쿼리)을 경고로 남기므로, 풀 커넥션(raise_on_warnings=True) 대신
+    경고를 예외로 올리지 않는 별도 커넥션을 쓴다. 샘플할 데이터가 없는 쿼리는 건너뛴다(통과).
+    """
+    import mysql.connector
+    conn = mysql.connector.connect(**{**DB_CONFIG, "raise_on_warnings": False})
+    report = []
+    try:
+        cur = conn.cursor(dictionary=True)
+        for name, sql, params, expected in HOT_QUERIES:
+            probe = _probe_params(cur, params)
+            if probe is None:
+                report.append({"query": name, "type": None, "key": None, "possible_keys": None, "rows": 0,
+                               "expected": expected or "(scan)", "ok": True, "skipped": "no data"})
+                continue
+            cur.execute("EXPLAIN " + sql, probe)
+            plan = cur.fetchall()
+            row = next((r for r in plan if r.get("table") == NOTICE_TABLE), plan[0] if plan else {})
+            key = row.get("key")
+            const_plan = any(n in (row.get("Extra") or "") for n in CONST_PLAN_NOTES)
+            ok = expected is None or key == expected or const_plan
+            report.append({
+                "query": name, "type": row.get("type"), "key": key, "possible_keys": row.get("possible_keys"),
+                "rows": row.get("rows"), "expected": expected or "(scan)", "ok": ok,
+            })
+        cur.close()
+    finally:
+        conn.close()
+    return report
+
+
+def check() -> bool:
+    ok = True
+    for r in explain_hot_queries():
+        mark = "OK  " if r["ok"] else "FAIL"
+        if r.get("skipped"):
+            log(f"SKIP {r['query']:<28} ({r['skipped']})")
+            continue
+        log(f"{mark} {r['query']:<28} type={r['type']} key={r['key']} rows={r['rows']} expected={r['expected']}")
+        ok &= r["ok"]
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(description="notice schema migrations")
+    ap.add_argument("--check", action="store_true", help="EXPLAIN 점검만")
+    ap.add_argument("--target", type=int, help="이 버전까지만 적용")
+    args = ap.parse_args(argv)
+    if not args.check:
+        migrate(args.target)
+    return 0 if check() else 1
@@ -0,0 +1,53 @@
+# src/uosai/common/model_store.py : 로컬에 구워 둔(baked) 모델 가중치 경로 (표준 라이브러리만 import)
+#
+# 컨테이너 빌드 때 Hub 모델을 MODEL_DIR 아래 safetensors 로 저장해 두면
+# 시작 시 다운로드/Hub 확인 없이 로컬 디렉터리에서 바로 읽는다 (safetensors 는 mmap 으로 로드).
+#
+#   python src/uosai/common/model_store.py --embed jhgan/ko-sroberta-multitask \
+#       --cross-encoder bongsoo/albert-small-kor-cross-encoder-v1
+#
+# uosai 패키지를 import 하지 않으므로 Dockerfile 에서 이 파일만 복사해 실행할 수 있다 (레이어 캐시 유지).
+import os, sys, time, argparse
+from typing import List, Optional
+
+MODEL_DIR = os.getenv("MODEL_DIR", "/opt/models")
+
+
+def local_model_dir(name: str, model_dir: str = MODEL_DIR) -> str:
+    """Hub 이름 → MODEL_DIR 하위 디렉터리 (jhgan/ko-sroberta-multitask → jhgan__ko-sroberta-multitask)"""
+    return os.path.join(model_dir, name.replace("/", "__"))
+
+
+def resolve_model(name: str, model_dir: str = MODEL_DIR) -> str:
+    """구워 둔 가중치가 있으면 그 경로, 없으면 Hub 이름 그대로 (기존 다운로드 동작)"""
+    if os.path.isdir(name):
+        return name
+    path = local_model_dir(name, model_dir)
+    return path if os.path.isfile(os.path.join(path, "config.json")) else name
+
+
+def bake(embed: List[str], cross_encoder: List[str], model_dir: str = MODEL_DIR) -> None:
+    for name in embed:
+        t0 = time.perf_counter()
+        from sentence_transformers import SentenceTransformer
+        SentenceTransformer(name, device="cpu").save(local_model_dir(name, model_dir), safe_serialization=True)
+        print(f"[bake] embed {name} → {local_model_dir(name, model_dir)} ({time.perf_counter() - t0:.1f}s)")
+    for name in cross_encoder:
+        t0 = time.perf_counter()
+        from sentence_transformers import CrossEncoder
+        CrossEncoder(name, device="cpu").save(local_model_dir(name, model_dir), safe_serialization=True)
+        print(f"[bake] cross-encoder {name} → {local_model_dir(name, model_dir)} ({time.perf_counter() - t0:.1f}s)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Download models and save them as local safetensors")
+    ap.add_argument("--embed", action="append", default=[], help="SentenceTransformer 모델 (여러 번 지정 가능)")
+    ap.add_argument("--cross-encoder", action="append", default=[], help="CrossEncoder 모델")
+    ap.add_argument("--model-dir", default=MODEL_DIR)
+    args = ap.parse_args(argv)
+    bake([m for m in args.embed if m], [m for m in args.cross_encoder if m], args.model_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
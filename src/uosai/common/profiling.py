@@ -0,0 +1,144 @@
+# src/uosai/common/profiling.py : 배치 실행 프로파일링 (opt-in, 외부 의존성 없음)
+#
+#   python scripts/run_indexer.py --profile cprofile --trace-memory
+#   PROFILE=sample PROFILE_MEMORY=1 python scripts/run_crawler.py
+#
+# 산출물은 실행 리포트(reports/<job>_<시각>.json) 옆에 같은 이름으로:
+#   *.prof          cProfile 통계 (python -m pstats / snakeviz)
+#   *_stacks.txt    샘플링 프로파일러 collapsed stack (flamegraph.pl / speedscope 입력)
+#   *_memory.json   tracemalloc 체크포인트별 현재/최대 메모리 + 상위 할당 위치
+import os, sys, json, time, threading, argparse, tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from uosai.common.metrics import report_path
+
+PROFILE          = os.getenv("PROFILE", "").strip().lower()            # "" | cprofile | sample
+PROFILE_MEMORY   = os.getenv("PROFILE_MEMORY", "").strip().lower() in {"1", "true", "yes", "on"}
+PROFILE_SAMPLE_MS = float(os.getenv("PROFILE_SAMPLE_MS", "5"))
+PROFILE_TOP_N    = int(os.getenv("PROFILE_TOP_N", "15"))
+
+_checkpoints: List[Dict[str, Any]] = []
+_t0 = time.perf_counter()
+
+
+def log(msg: str) -> None:
+    print(f"[profile] {msg}", flush=True)
+
+
+# ===== tracemalloc 체크포인트 =====
+def checkpoint(label: str) -> None:
+    """단계 경계에서 호출. tracemalloc 이 꺼져 있으면 아무것도 하지 않음"""
+    if not tracemalloc.is_tracing():
+        return
+    current, peak = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    )).statistics("lineno")[:PROFILE_TOP_N]
+    _checkpoints.append({
+        "label": label,
+        "elapsed_sec": round(time.perf_counter() - _t0, 2),
+        "current_mb": round(current / 2**20, 1),
+        "peak_mb": round(peak / 2**20, 1),          # 직전 체크포인트 이후 최대치
+        "top": [{"where": f"{s.traceback[0].filename}:{s.traceback[0].lineno}",
+                 "size_mb": round(s.size / 2**20, 2), "count": s.count} for s in top],
+    })
+    tracemalloc.reset_peak()
+    log(f"{label}: current={current / 2**20:.1f}MB peak={peak / 2**20:.1f}MB")
+
+
+# ===== 샘플링 프로파일러 =====
+class SamplingProfiler(threading.Thread):
+    """
+    interval 마다 메인 스레드 스택을 읽어 collapsed stack 으로 집계.
+    cProfile 과 달리 함수 호출마다 비용이 들지 않아 수 시간짜리 크롤링에도 켜 둘 수 있다.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_SAMPLE_MS):
+        super().__init__(daemon=True, name="sampling-profiler")
+        self.interval = interval_ms / 1000
+        self.main_ident = threading.main_thread().ident
+        self.stacks: Counter = Counter()
+        self._halt = threading.Event()
+
+    def run(self) -> None:
+        while not self._halt.wait(self.interval):
+            frame = sys._current_frames().get(self.main_ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._halt.set()
+        self.join()
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+# ===== 실행 래퍼 =====
+def profiled(job: str, fn: Callable[[], Any], mode: str = PROFILE, memory: bool = PROFILE_MEMORY) -> Any:
+    """fn 을 mode(cprofile|sample) 프로파일러와 tracemalloc 아래에서 실행하고 산출물 저장"""
+    if not mode and not memory:
+        return fn()
+    if mode not in ("", "cprofile", "sample"):
+        raise ValueError(f"unknown PROFILE mode: {mode}")
+
+    os.makedirs(os.path.dirname(report_path(job)) or ".", exist_ok=True)
+    if memory:
+        tracemalloc.start(int(os.getenv("PROFILE_MEMORY_FRAMES", "1")))
+        checkpoint("start")
+
+    prof = sampler = None
+    if mode == "cprofile":
+        import cProfile
+        prof = cProfile.Profile()
+        prof.enable()
+    elif mode == "sample":
+        sampler = SamplingProfiler()
+        sampler.start()
+
+    try:
+        return fn()
+    finally:
+        if prof is not None:
+            prof.disable()
+            path = report_path(job, ".prof")
+            prof.dump_stats(path)
+            _print_top(prof)
+            log(f"cProfile → {path}")
+        if sampler is not None:
+            sampler.stop()
+            path = report_path(job, "_stacks.txt")
+            sampler.dump(path)
+            log(f"samples={sum(sampler.stacks.values())} → {path}")
+        if memory:
+            checkpoint("end")
+            path = report_path(job, "_memory.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(_checkpoints, f, ensure_ascii=False, indent=2)
+            tracemalloc.stop()
+            log(f"tracemalloc → {path}")
+
+
+def _print_top(prof) -> None:
+    import io, pstats
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+    print(buf.getvalue())
+
+
+def profile_args(argv: Optional[List[str]] = None) -> Tuple[str, bool]:
+    """스크립트 공용 --profile/--trace-memory 옵션 (없으면 PROFILE/PROFILE_MEMORY 환경변수)"""
+    ap = argparse.ArgumentParser(add_help=False)
+    ap.add_argument("--profile", choices=["cprofile", "sample"], default=PROFILE or None)
+    ap.add_argument("--trace-memory", action="store_true", default=PROFILE_MEMORY)
+    args, _ = ap.parse_known_args(argv)
+    return args.profile or "", args.trace_memory
@@ -0,0 +1,252 @@
+# src/uosai/common/quantize.py : 벡터 압축 (PCA 차원 축소 + int8 스칼라 양자화) 과 float 재점수
+#
+# - PCAReducer: 코퍼스(notice_chunk 전체)로 학습, 768 → VECTOR_PCA_DIM. Pinecone 인덱스 차원/비용도 같이 줄어든다.
+# - Int8Quantizer: 차원별 대칭 스케일로 float32 → int8 (4배 절약). 로컬 검색용 (Pinecone dense 는 float 만 지원)
+# - 압축 공간에서 후보를 넉넉히(k × VECTOR_RESCORE_FACTOR) 뽑고, 원래 float 벡터로 다시 점수 매겨 상위 k
+#
+#   python scripts/run_compress.py --pca 256 --int8     # 학습/저장 + 메모리 절감 대비 recall 리포트
+import os, json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+VECTOR_PCA_DIM        = int(os.getenv("VECTOR_PCA_DIM", "0"))          # 0 = 차원 축소 안 함
+VECTOR_PCA_PATH       = os.getenv("VECTOR_PCA_PATH", "models/pca_{dim}.npz")
+VECTOR_INT8_CLIP      = float(os.getenv("VECTOR_INT8_CLIP", "99.9"))   # 스케일 기준 분위수 (이상치 1개가 해상도를 먹지 않게)
+VECTOR_RESCORE_FACTOR = int(os.getenv("VECTOR_RESCORE_FACTOR", "4"))   # float 재점수 후보 배수 (0 = 재점수 안 함)
+
+
+def _unit(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    return x / (np.linalg.norm(x, axis=-1, keepdims=True) + 1e-12)
+
+
+class PCAReducer:
+    """평균 중심화 후 상위 dim 개 주성분으로 사영 (결과는 다시 L2 정규화 → cosine 그대로 사용)"""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray, explained: float = 0.0, embed_model: str = ""):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)   # (dim_in, dim_out)
+        self.explained = float(explained)
+        self.embed_model = embed_model
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[1]
+
+    @classmethod
+    def fit(cls, X: np.ndarray, dim: int, embed_model: str = "") -> "PCAReducer":
+        X = _unit(X)
+        mean = X.mean(axis=0)
+        # (d, d) 공분산 고유분해: N ≫ d 라 SVD 보다 싸다
+        cov = np.cov(X - mean, rowvar=False).astype(np.float64)
+        vals, vecs = np.linalg.eigh(cov)
+        order = np.argsort(vals)[::-1][:dim]
+        explained = float(vals[order].sum() / max(vals.sum(), 1e-12))
+        return cls(mean, vecs[:, order], explained, embed_model)
+
+    def transform(self, X) -> np.ndarray:
+        return _unit((_unit(X) - self.mean) @ self.components)
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, mean=self.mean, components=self.components,
+                 explained=np.float32(self.explained), embed_model=np.str_(self.embed_model))
+
+    @classmethod
+    def load(cls, path: str) -> "PCAReducer":
+        z = np.load(path, allow_pickle=False)
+        return cls(z["mean"], z["components"], float(z["explained"]), str(z["embed_model"]))
+
+
+class Int8Quantizer:
+    """x ≈ q · scale (차원별 scale, q ∈ [-127, 127])"""
+
+    def __init__(self, scale: np.ndarray):
+        self.scale = np.asarray(scale, dtype=np.float32)
+
+    @classmethod
+    def fit(cls, X: np.ndarray, clip_pct: float = VECTOR_INT8_CLIP) -> "Int8Quantizer":
+        bound = np.percentile(np.abs(np.asarray(X, dtype=np.float32)), clip_pct, axis=0)
+        return cls(np.maximum(bound, 1e-6) / 127.0)
+
+    def encode(self, X) -> np.ndarray:
+        return np.clip(np.rint(np.asarray(X, dtype=np.float32) / self.scale), -127, 127).astype(np.int8)
+
+    def decode(self, Q: np.ndarray) -> np.ndarray:
+        return Q.astype(np.float32) * self.scale
+
+
+def load_reducer(dim: int = VECTOR_PCA_DIM, path: str = VECTOR_PCA_PATH,
+                 embed_model: str = "") -> Optional[PCAReducer]:
+    """VECTOR_PCA_DIM > 0 이면 학습된 PCA (없거나 다른 임베딩 모델용이면 오류 → 차원이 어긋난 채 인덱싱되지 않게)"""
+    if dim <= 0:
+        return None
+    path = path.format(dim=dim)
+    if not os.path.exists(path):
+        raise RuntimeError(f"VECTOR_PCA_DIM={dim} but {path} missing (run scripts/run_compress.py --pca {dim})")
+    r = PCAReducer.load(path)
+    if r.dim != dim or (embed_model and r.embed_model and r.embed_model != embed_model):
+        raise RuntimeError(f"{path}: dim={r.dim} model={r.embed_model}, expected dim={dim} model={embed_model}")
+    return r
+
+
+def rescore(query: np.ndarray, candidates: List[int], full: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """후보 인덱스들을 원래 float 벡터(full 의 행, memmap 가능)로 다시 점수 매겨 상위 k"""
+    if not candidates:
+        return []
+    idx = np.asarray(candidates)
+    scores = _unit(full[idx]) @ _unit(query)
+    order = np.argsort(-scores)[:k]
+    return [(int(idx[i]), float(scores[i])) for i in order]
+
+
+# ===== 로컬 압축 인덱스 =====
+class QuantizedVectorStore:
+    """
+    LocalVectorStore 와 같은 인터페이스. 메모리에는 int8 코드(+PCA)만 두고,
+    full(원래 벡터, float16 memmap 가능)이 있으면 상위 후보만 float 로 재점수한다.
+    """
+
+    def __init__(self, docs: List[Any], vectors: np.ndarray, reducer: Optional[PCAReducer] = None,
+                 quantizer: Optional[Int8Quantizer] = None, full: Optional[np.ndarray] = None,
+                 rescore_factor: int = VECTOR_RESCORE_FACTOR):
+        from uosai.common.local_index import match_filter
+        self._match = match_filter
+        self.docs = list(docs)
+        self.reducer = reducer
+        X = reducer.transform(vectors) if reducer else _unit(vectors)
+        self.quantizer = quantizer or Int8Quantizer.fit(X)
+        self.codes = self.quantizer.encode(X)
+        self.full = full
+        self.rescore_factor = rescore_factor
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.quantizer.scale.nbytes +
+                   (self.reducer.components.nbytes + self.reducer.mean.nbytes if self.reducer else 0))
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def search(self, embedding, k: int, mask: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        q = np.asarray(embedding, dtype=np.float32)
+        qr = self.reducer.transform(q) if self.reducer else _unit(q)
+        # int8 코드와 (q ⊙ scale) 의 내적 = 복원 벡터와의 내적 (복원 행렬을 만들지 않음)
+        scores = self.codes @ (qr * self.quantizer.scale)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        n = min(len(self.docs), k * max(1, self.rescore_factor) if self.full is not None else k)
+        if n <= 0:
+            return []
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = [int(i) for i in top[np.argsort(-scores[top])] if np.isfinite(scores[i])]
+        if self.full is not None and self.rescore_factor > 0:
+            return rescore(q, top, self.full, k)
+        return [(i, float(scores[i])) for i in top[:k]]
+
+    def similarity_search_by_vector_with_score(self, embedding, k: int = 4,
+                                               filter: Optional[Dict[str, Any]] = None, **kwargs):
+        mask = None
+        if filter:
+            mask = np.fromiter((self._match(d.metadata or {}, filter) for d in self.docs), dtype=bool,
+                               count=len(self.docs))
+        return [(self.docs[i], s) for i, s in self.search(embedding, k, mask)]
+
+
+# ===== 벡터 DB 앞단 (PCA 공간 인덱스 + float 재점수) =====
+class ProjectedVectorStore:
+    """
+    PCA 차원으로 만든 벡터 DB 를 감싸 질의 벡터를 사영해서 검색하고,
+    notice_chunk 에 저장된 원래 벡터로 상위 후보를 재점수한다 (fetch_full=None 이면 생략).
+    재점수할 때는 원래 벡터가 있는 후보만 남긴다 (하나도 없으면 PCA 공간 점수 그대로).
+    """
+
+    def __init__(self, store, reducer: PCAReducer, fetch_full=None,
+                 rescore_factor: int = VECTOR_RESCORE_FACTOR):
+        self.store = store
+        self.reducer = reducer
+        self.fetch_full = fetch_full     # [chunk key] → {chunk key: float32 벡터}
+        self.rescore_factor = rescore_factor
+
+    def similarity_search_by_vector_with_score(self, embedding, k: int = 4,
+                                               filter: Optional[Dict[str, Any]] = None, **kwargs):
+        q = np.asarray(embedding, dtype=np.float32)
+        n = k * self.rescore_factor if self.fetch_full and self.rescore_factor > 0 else k
+        hits = self.store.similarity_search_by_vector_with_score(
+            self.reducer.transform(q).tolist(), k=n, filter=filter, **kwargs)
+        if not hits or n == k:
+            return hits
+        keys = [_doc_key(d) for d, _ in hits]
+        qn = _unit(q)
+        try:
+            full = self.fetch_full([key for key in keys if key])
+            # 원래 벡터가 없는(또는 차원이 다른) 후보는 재점수한 코사인과 비교할 수 없으므로 제외
+            rescored = [(d, float(_unit(full[key]) @ qn)) for (d, _), key in zip(hits, keys)
+                        if key in full and full[key].shape == qn.shape]
+        except Exception as e:
+            print(f"[quantize] rescore skipped: {type(e).__name__}: {e}")
+            return hits[:k]
+        if not rescored:
+            return hits[:k]
+        return sorted(rescored, key=lambda x: x[1], reverse=True)[:k]
+
+
+def _doc_key(doc) -> Optional[Tuple[str, int, int]]:
+    m = doc.metadata or {}
+    if m.get("post_number") is None:
+        return None
+    return str(m.get("category")), int(m["post_number"]), int(m.get("chunk_index", 0))
+
+
+# ===== 압축 리포트 =====
+def evaluate(X: np.ndarray, queries: np.ndarray, k: int = 10, pca_dims: List[int] = (),
+             rescore_factor: int = VECTOR_RESCORE_FACTOR) -> List[Dict[str, Any]]:
+    """
+    float32 정확 검색 top-k 대비 recall@k 와 메모리 (벡터 저장분) 비교.
+    X: (N, d) 코퍼스, queries: (Q, d) 질의 벡터.
+    """
+    Xn, Qn = _unit(X), _unit(queries)
+    exact = np.argsort(-(Qn @ Xn.T), axis=1)[:, :k]
+    n, d = Xn.shape
+
+    def recall(store: QuantizedVectorStore, use_full: bool) -> float:
+        store.full = Xn if use_full else None
+        hits = 0
+        for q, truth in zip(Qn, exact):
+            got = {i for i, _ in store.search(q, k)}
+            hits += len(got & set(truth.tolist()))
+        return hits / (len(Qn) * k)
+
+    rows = [{"config": "float32", "dim": d, "bytes": n * d * 4, "recall": 1.0, "recall_rescored": None}]
+    rows.append({"config": "float16", "dim": d, "bytes": n * d * 2,
+                 "recall": _float_recall(Xn.astype(np.float16).astype(np.float32), Qn, exact, k),
+                 "recall_rescored": None})
+    docs = [None] * n
+    for dim in [0, *pca_dims]:
+        reducer = PCAReducer.fit(Xn, dim) if dim else None
+        store = QuantizedVectorStore(docs, Xn, reducer=reducer, rescore_factor=rescore_factor)
+        label = "int8" + (f"+pca{dim}" if dim else "")
+        rows.append({"config": label, "dim": dim or d, "bytes": store.nbytes,
+                     "recall": round(recall(store, False), 4),
+                     "recall_rescored": round(recall(store, True), 4),
+                     "explained_variance": round(reducer.explained, 4) if reducer else None})
+        if reducer:
+            Y = reducer.transform(Xn)
+            rows.append({"config": f"float32+pca{dim}", "dim": dim, "bytes": n * dim * 4 + reducer.components.nbytes,
+                         "recall": _float_recall(Y, reducer.transform(Qn), exact, k), "recall_rescored": None,
+                         "explained_variance": round(reducer.explained, 4)})
+    for r in rows:
+        r["saved_pct"] = round(100 * (1 - r["bytes"] / rows[0]["bytes"]), 1)
+    return rows
+
+
+def _float_recall(Y: np.ndarray, Qy: np.ndarray, exact: np.ndarray, k: int) -> float:
+    got = np.argsort(-(Qy @ Y.T), axis=1)[:, :k]
+    return round(float(np.mean([len(set(a) & set(b)) / k for a, b in zip(got.tolist(), exact.tolist())])), 4)
+
+
+def write_report(rows: List[Dict[str, Any]], path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,165 @@
+# src/uosai/common/schema.py : notice 테이블 DDL과 자주 쓰는 쿼리 (크롤러/인덱서/마이그레이션 공용, 외부 의존성 없음)
+
+NOTICE_TABLE = "notice"
+
+# 최신 스키마 (새 DB). 기존 DB는 uosai.common.migrations 가 버전별로 맞춰준다.
+# content_hash 는 uosai.common.utils.notice_content_hash 와 같은 규칙의 생성 열
+NOTICE_DDL = """
+CREATE TABLE notice (
+    id                BIGINT        NOT NULL AUTO_INCREMENT,
+    category          VARCHAR(64)   NOT NULL,
+    post_number       BIGINT        NOT NULL,
+    title             VARCHAR(500)  NOT NULL,
+    link              VARCHAR(1000) NOT NULL,
+    summary           MEDIUMTEXT    NULL,
+    embedding_vector  LONGTEXT      NULL,
+    posted_date       DATE          NULL,
+    department        VARCHAR(255)  NULL,
+    created_at        DATETIME      NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at        DATETIME      NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    content_hash      CHAR(40) AS (SHA1(CONCAT_WS(CHAR(31),
+                          COALESCE(title, ''), COALESCE(summary, ''), COALESCE(posted_date, ''),
+                          COALESCE(department, ''), COALESCE(link, '')))) STORED,
+    PRIMARY KEY (id),
+    UNIQUE KEY uq_notice_category_post (category, post_number),
+    KEY idx_notice_posted_date (posted_date),
+    KEY idx_notice_updated_at (updated_at)
+) DEFAULT CHARSET=utf8mb4
+"""
+
+# 청크 임베딩 저장소: 재구축/벡터 DB 이전/로컬 검색 시 모델을 다시 돌리지 않고 한 번에 읽어온다.
+# vector = dim 개의 float16('f2') 또는 float32('f4') 리틀엔디언 바이트
+NOTICE_CHUNK_DDL = """
+CREATE TABLE notice_chunk (
+    category      VARCHAR(64)   NOT NULL,
+    post_number   BIGINT        NOT NULL,
+    chunk_index   INT           NOT NULL,
+    text_hash     CHAR(40)      NOT NULL,
+    embed_model   VARCHAR(200)  NOT NULL,
+    dim           SMALLINT      NOT NULL,
+    dtype         CHAR(2)       NOT NULL,
+    vector        MEDIUMBLOB    NOT NULL,
+    updated_at    DATETIME      NOT NULL,
+    PRIMARY KEY (category, post_number, chunk_index),
+    KEY idx_notice_chunk_model (embed_model)
+) DEFAULT CHARSET=utf8mb4
+"""
+
+# 게시판 간 중복 공지 (uosai.common.dedup): 본문 MinHash 서명과 canonical 공지 연결
+# canonical_* 가 NULL 이면 그 공지 자신이 canonical
+NOTICE_MINHASH_DDL = """
+CREATE TABLE notice_minhash (
+    category               VARCHAR(64)   NOT NULL,
+    post_number            BIGINT        NOT NULL,
+    num_perm               SMALLINT      NOT NULL,
+    signature              VARBINARY(2048) NOT NULL,
+    number_hash            CHAR(40)      NULL,
+    canonical_category     VARCHAR(64)   NULL,
+    canonical_post_number  BIGINT        NULL,
+    similarity             FLOAT         NULL,
+    posted_date            DATE          NULL,
+    updated_at             DATETIME      NOT NULL,
+    PRIMARY KEY (category, post_number),
+    KEY idx_notice_minhash_canonical (canonical_category, canonical_post_number),
+    KEY idx_notice_minhash_posted_date (posted_date)
+) DEFAULT CHARSET=utf8mb4
+"""
+
+NOTICE_IMAGE_TEXT_DDL = """
+CREATE TABLE notice_image_text (
+    content_hash  CHAR(64)        NOT NULL,
+    phash         BIGINT UNSIGNED NOT NULL,
+    text          MEDIUMTEXT      NOT NULL,
+    width         INT             NULL,
+    height        INT             NULL,
+    source_url    VARCHAR(1000)   NOT NULL DEFAULT '',
+    hits          INT             NOT NULL DEFAULT 0,
+    created_at    DATETIME        NOT NULL,
+    updated_at    DATETIME        NOT NULL,
+    PRIMARY KEY (content_hash)
+) DEFAULT CHARSET=utf8mb4
+"""
+
+NOTICE_ATTACHMENT_DDL = """
+CREATE TABLE notice_attachment (
+    url_hash      CHAR(40)       NOT NULL,
+    category      VARCHAR(64)    NOT NULL,
+    post_number   BIGINT         NOT NULL,
+    url           VARCHAR(1000)  NOT NULL,
+    filename      VARCHAR(255)   NOT NULL,
+    etag          VARCHAR(255)   NULL,
+    content_hash  CHAR(40)       NOT NULL,
+    bytes         INT            NOT NULL,
+    text          MEDIUMTEXT     NOT NULL,
+    updated_at    DATETIME       NOT NULL,
+    PRIMARY KEY (url_hash, category, post_number),
+    KEY idx_notice_attachment_notice (category, post_number),
+    KEY idx_notice_attachment_content (content_hash)
+) DEFAULT CHARSET=utf8mb4
+"""
+
+CRAWL_JOB_DDL = """
+CREATE TABLE crawl_job (
+    id           BIGINT        NOT NULL AUTO_INCREMENT,
+    source       VARCHAR(16)   NOT NULL,
+    category     VARCHAR(64)   NOT NULL,
+    list_id      VARCHAR(64)   NULL,
+    item_id      BIGINT        NOT NULL,
+    state        ENUM('pending', 'leased', 'done', 'failed') NOT NULL DEFAULT 'pending',
+    attempts     INT           NOT NULL DEFAULT 0,
+    run_after    DATETIME      NOT NULL,
+    lease_owner  VARCHAR(128)  NULL,
+    last_result  VARCHAR(32)   NULL,
+    last_error   VARCHAR(1000) NULL,
+    created_at   DATETIME      NOT NULL,
+    updated_at   DATETIME      NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE KEY uq_crawl_job_item (source, category, item_id),
+    KEY idx_crawl_job_claim (state, run_after)
+) DEFAULT CHARSET=utf8mb4
+"""
+
+# 인덱싱 상태 (변경 감지 → 챗봇 답변 캐시 무효화). 삭제/중복으로 합쳐진 공지는 content_hash = DELETED_HASH
+NOTICE_INDEX_STATE_DDL = """
+CREATE TABLE notice_index_state (
+    category      VARCHAR(64)  NOT NULL,
+    post_number   BIGINT       NOT NULL,
+    content_hash  CHAR(40)     NOT NULL,
+    indexed_at    DATETIME     NOT NULL,
+    PRIMARY KEY (category, post_number),
+    KEY idx_notice_index_state_indexed (indexed_at)
+) DEFAULT CHARSET=utf8mb4
+"""
+
+# ===== Hot queries =====
+# 크롤러: 이미 수집한 글인지 (유니크 키 조회)
+EXISTS_SQL = "SELECT posted_date FROM notice WHERE category=%s AND post_number=%s LIMIT 1"
+
+# 크롤러: 중복 공지의 canonical 요약 재사용
+FETCH_SUMMARY_SQL = "SELECT summary, title FROM notice WHERE category=%s AND post_number=%s LIMIT 1"
+
+# 인덱서: 게시일 기준 증분
+FETCH_ROWS_SINCE_SQL = """
+SELECT category, post_number, title, link, summary, posted_date, department
+FROM notice
+WHERE title IS NOT NULL AND title <> ''
+  AND summary IS NOT NULL AND summary <> ''
+  AND posted_date >= %s
+"""
+
+# 인덱서: 전체 재구축 (전체 스캔이 정상)
+FETCH_ALL_ROWS_SQL = """
+SELECT category, post_number, title, link, summary, posted_date, department
+FROM notice
+WHERE title IS NOT NULL AND title <> '' AND summary IS NOT NULL AND summary <> ''
+"""
+
+# 증분 소비자: 수정 시각 기준 (수정된 옛 공지도 잡힘)
+FETCH_ROWS_UPDATED_SQL = """
+SELECT category, post_number, title, link, summary, posted_date, department, updated_at, content_hash
+FROM notice
+WHERE updated_at > %s
+  AND title IS NOT NULL AND title <> ''
+  AND summary IS NOT NULL AND summary <> ''
+ORDER BY updated_at
+"""
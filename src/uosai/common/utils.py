@@ -1,16 +1,24 @@
 # common.py : 공용 유틸 함수 정의 (lazy DB pool)
-import os
-from typing import List, Dict, Any
+import os, hashlib
+from datetime import date, datetime
+from typing import List, Dict, Any, Tuple
 from dotenv import load_dotenv; load_dotenv()
 
-from mysql.connector import pooling, Error as MySQLError
 from langchain.schema import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
 from langchain.embeddings.base import Embeddings
-from pinecone import Pinecone, ServerlessSpec
-from langchain_pinecone import PineconeVectorStore
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+# 무거운 백엔드(sentence_transformers/torch, langchain_openai, pinecone, mysql.connector)는
+# 실제로 쓰는 함수 안에서 import → EMBED_TYPE/백엔드 선택에 따라 필요한 것만 로드
+from uosai.common.metrics import timed
+from uosai.common.model_store import resolve_model
+from uosai.common.dedup import fetch_duplicate_groups
+from uosai.common.attachments import fetch_attachment_texts, format_attachments
+from uosai.common.quantize import VECTOR_PCA_DIM, ProjectedVectorStore, load_reducer
+from uosai.common.schema import (
+    FETCH_ROWS_SINCE_SQL, FETCH_ALL_ROWS_SQL, FETCH_ROWS_UPDATED_SQL, NOTICE_CHUNK_DDL, NOTICE_INDEX_STATE_DDL,
+)
 
 # ===== Helpers =====
 def _env_bool(val: str | None, default: bool) -> bool:
@@ -18,7 +26,30 @@ def _env_bool(val: str | None, default: bool) -> bool:
         return default
     return val.strip().lower() in {"1", "true", "t", "yes", "y", "on"}
 
+# ===== 날짜 ↔ epoch days (메타데이터 범위 필터용 정수) =====
+_EPOCH = date(1970, 1, 1)
+
+def to_epoch_days(value: Any) -> int | None:
+    """date/datetime/'YYYY-MM-DD...' → 1970-01-01 기준 일수 (파싱 실패 시 None)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    if not isinstance(value, date):
+        try:
+            value = date.fromisoformat(str(value).strip()[:10])
+        except ValueError:
+            return None
+    return (value - _EPOCH).days
+
+def from_epoch_days(days: int | float) -> str:
+    return date.fromordinal(_EPOCH.toordinal() + int(days)).isoformat()
+
 # ===== Korean Embedding Model =====
+# 길이 버킷 인코딩: 버킷 폭(토큰)과 배치당 토큰 예산
+EMBED_BUCKET_WIDTH = int(os.getenv("EMBED_BUCKET_WIDTH", "32"))
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "4096"))
+
 class KoreanSentenceTransformerEmbeddings(Embeddings):
     """한국어 특화 SentenceTransformer 임베딩 클래스"""
 
@@ -30,17 +61,62 @@ class KoreanSentenceTransformerEmbeddings(Embeddings):
                       - snunlp/KR-SBERT-V40K-klueNLI-augSTS
                       - BM-K/KoSimCSE-roberta-multitask
         """
-        print(f"[Korean Embedding] Loading model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        from sentence_transformers import SentenceTransformer
+        path = resolve_model(model_name)
+        print(f"[Korean Embedding] Loading model: {model_name}" + (f" ({path})" if path != model_name else ""))
+        self.model = SentenceTransformer(path)
         self.dimension = self.model.get_sentence_embedding_dimension()
         print(f"[Korean Embedding] Model loaded, dimension: {self.dimension}")
 
+    def _token_lengths(self, texts: List[str]) -> List[int]:
+        """토크나이저 기준 입력 길이 (max_seq_length에서 잘림)"""
+        max_len = self.model.max_seq_length
+        enc = self.model.tokenizer(
+            texts,
+            add_special_tokens=True,
+            truncation=True,
+            max_length=max_len,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )
+        return [len(ids) for ids in enc["input_ids"]]
+
+    @timed("embed_documents")
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """문서들을 임베딩"""
+        """
+        문서들을 임베딩.
+        토큰 길이로 정렬 → EMBED_BUCKET_WIDTH 단위 버킷으로 묶어 버킷별로 인코딩하고,
+        버킷의 최대 길이에 맞춰 배치 크기를 키워(EMBED_BATCH_TOKENS 예산) 패딩 낭비를 줄인다.
+        결과는 원래 입력 순서로 복원.
+        """
         if not texts:
             return []
-        embeddings = self.model.encode(texts, convert_to_tensor=False, show_progress_bar=True)
-        return embeddings.tolist()
+
+        lengths = self._token_lengths(texts)
+        order = sorted(range(len(texts)), key=lambda i: lengths[i])
+
+        # 정렬된 인덱스를 길이 구간별 버킷으로 분할
+        buckets: List[List[int]] = []
+        cur_key = None
+        for i in order:
+            key = lengths[i] // EMBED_BUCKET_WIDTH
+            if key != cur_key:
+                buckets.append([])
+                cur_key = key
+            buckets[-1].append(i)
+
+        out = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for bucket in buckets:
+            bucket_max = max(lengths[i] for i in bucket)
+            batch_size = max(1, EMBED_BATCH_TOKENS // max(bucket_max, 1))
+            vecs = self.model.encode(
+                [texts[i] for i in bucket],
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+            out[bucket] = vecs
+        return out.tolist()
 
     def embed_query(self, text: str) -> List[float]:
         """쿼리를 임베딩"""
@@ -84,6 +160,9 @@ if EMBED_TYPE == "korean":
 else:
     EMBED_DIM = EMBED_DIM_MAP.get(EMBED_MODEL, 1536)  # OpenAI 모델 기본 1536차원
 
+# 벡터 DB 인덱스 차원: VECTOR_PCA_DIM 을 켜면 PCA 로 줄인 차원 (notice_chunk 에는 원래 EMBED_DIM 벡터 저장)
+INDEX_DIM = VECTOR_PCA_DIM if 0 < VECTOR_PCA_DIM < EMBED_DIM else EMBED_DIM
+
 # ===== DB (lazy pool) =====
 DB_CONFIG = {
     "host": os.getenv("DB_HOST"),
@@ -98,12 +177,13 @@ DB_CONFIG = {
     "connection_timeout": 10,
 }
 
-_POOL: pooling.MySQLConnectionPool | None = None
+_POOL = None
 
-def get_pool() -> pooling.MySQLConnectionPool:
-    """지연 초기화로 커넥션 풀 생성"""
+def get_pool():
+    """지연 초기화로 커넥션 풀 생성 (mysql.connector 도 이때 import)"""
     global _POOL
     if _POOL is None:
+        from mysql.connector import pooling, Error as MySQLError
         try:
             _POOL = pooling.MySQLConnectionPool(
                 pool_name="ragpool",
@@ -121,48 +201,195 @@ def get_pool() -> pooling.MySQLConnectionPool:
 def get_conn():
     return get_pool().get_connection()
 
+def ensure_table(name: str, ddl: str) -> None:
+    """테이블이 없으면 생성 (raise_on_warnings=True 라 IF NOT EXISTS 경고도 예외 → 먼저 존재 확인)"""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("SHOW TABLES LIKE %s", (name,))
+        if cur.fetchone() is None:
+            cur.execute(ddl)
+            conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+
 # ===== DB Queries =====
+# SQL은 uosai.common.schema 에 모아 두고 migrations 의 EXPLAIN 점검 대상으로 삼는다
 def fetch_rows_since(since: str) -> List[Dict[str, Any]]:
-    sql = """
-    SELECT category, post_number, title, link, summary, posted_date, department
-    FROM notice
-    WHERE title IS NOT NULL AND title <> ''
-      AND summary IS NOT NULL AND summary <> ''
-      AND posted_date >= %s
-    """
     conn = get_conn()
     try:
         cur = conn.cursor(dictionary=True)
-        cur.execute(sql, (since,))
+        cur.execute(FETCH_ROWS_SINCE_SQL, (since,))
         rows = cur.fetchall()
         cur.close()
         return rows
     finally:
         conn.close()
 
+@timed("indexer.fetch_all_rows")
 def fetch_all_rows() -> List[Dict[str, Any]]:
+    conn = get_conn()
+    try:
+        cur = conn.cursor(dictionary=True)
+        cur.execute(FETCH_ALL_ROWS_SQL)
+        rows = cur.fetchall()
+        cur.close()
+        return rows
+    finally:
+        conn.close()
+
+def fetch_rows_updated_since(since: datetime) -> List[Dict[str, Any]]:
+    """since 이후 추가/수정된 공지 (updated_at 인덱스, 마이그레이션 004 이후)"""
+    conn = get_conn()
+    try:
+        cur = conn.cursor(dictionary=True)
+        cur.execute(FETCH_ROWS_UPDATED_SQL, (since,))
+        rows = cur.fetchall()
+        cur.close()
+        return rows
+    finally:
+        conn.close()
+
+def fetch_departments() -> List[str]:
+    """공지에 등장하는 부서/학과명 목록 (챗봇 department 필터 매칭용)"""
+    sql = "SELECT DISTINCT department FROM notice WHERE department IS NOT NULL AND department <> ''"
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(sql)
+        rows = [r[0] for r in cur.fetchall()]
+        cur.close()
+        return rows
+    finally:
+        conn.close()
+
+# ===== 인덱싱 상태 (변경 감지 → 챗봇 답변 캐시 무효화) =====
+DELETED_HASH = "0" * 40    # 더 이상 인덱싱되지 않는 공지 (MySQL 에서 삭제 또는 중복으로 합쳐짐)
+
+def notice_content_hash(row: Dict[str, Any]) -> str:
+    src = "\x1f".join(str(row.get(k) or "") for k in ("title", "summary", "posted_date", "department", "link"))
+    return hashlib.sha1(src.encode("utf-8")).hexdigest()
+
+def mark_notices_indexed(rows: List[Dict[str, Any]]) -> List[Tuple[str, int]]:
+    """
+    인덱싱한 공지들의 content_hash를 기록하고, 새로 생겼거나 내용이 바뀐 공지 키만 반환.
+    바뀐 공지만 indexed_at이 갱신되므로 소비자(챗봇 캐시)는 indexed_at으로 변경분을 폴링한다.
+    rows 는 실제로 임베딩한 행 (collapse_duplicates 이후) — 여기 없는 기존 공지는 삭제로 기록해 같이 반환.
+    """
+    ensure_table("notice_index_state", NOTICE_INDEX_STATE_DDL)
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT category, post_number, content_hash FROM notice_index_state")
+        prev = {(c, int(p)): h for c, p, h in cur.fetchall()}
+
+        now = datetime.now().replace(microsecond=0)
+        changed, params, current = [], [], set()
+        for r in rows:
+            key = (r["category"], int(r["post_number"]))
+            current.add(key)
+            h = notice_content_hash(r)
+            if prev.get(key) != h:
+                changed.append(key)
+                params.append((key[0], key[1], h, now))
+        for key, h in prev.items():
+            if key not in current and h != DELETED_HASH:
+                changed.append(key)
+                params.append((key[0], key[1], DELETED_HASH, now))
+        if params:
+            cur.executemany("""
+            INSERT INTO notice_index_state (category, post_number, content_hash, indexed_at)
+            VALUES (%s, %s, %s, %s) AS new
+            ON DUPLICATE KEY UPDATE content_hash = new.content_hash, indexed_at = new.indexed_at
+            """, params)
+            conn.commit()
+        cur.close()
+        return changed
+    finally:
+        conn.close()
+
+def fetch_indexed_since(since: datetime) -> List[Dict[str, Any]]:
+    """since 이후 (재)인덱싱된 공지 키와 제목"""
     sql = """
-    SELECT category, post_number, title, link, summary, posted_date, department
-    FROM notice
-    WHERE title IS NOT NULL AND title <> '' AND summary IS NOT NULL AND summary <> ''
+    SELECT s.category, s.post_number, s.indexed_at, n.title
+    FROM notice_index_state s
+    LEFT JOIN notice n ON n.category = s.category AND n.post_number = s.post_number
+    WHERE s.indexed_at > %s
+    ORDER BY s.indexed_at
     """
     conn = get_conn()
     try:
         cur = conn.cursor(dictionary=True)
-        cur.execute(sql)
+        cur.execute(sql, (since,))
         rows = cur.fetchall()
         cur.close()
         return rows
     finally:
         conn.close()
 
+# ===== 중복 공지 합치기 (크롤러가 notice_minhash 에 기록한 연결) =====
+def collapse_duplicates(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    다른 게시판에 같은 내용으로 올라온 중복 공지는 빼고, canonical 행의 sources 에 (category, link)를 모은다.
+    요약이 canonical 과 다른 중복(날짜/차수만 다른 유사 공지 — 크롤러가 새로 요약)은 따로 임베딩한다.
+    canonical 이 rows 에 없으면 중복 공지를 그대로 둔다. notice_minhash 가 없으면 rows 그대로.
+    """
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("SHOW TABLES LIKE %s", ("notice_minhash",))
+        groups = fetch_duplicate_groups(cur) if cur.fetchone() else {}
+        cur.close()
+    finally:
+        conn.close()
+    if not groups:
+        return rows
+
+    by_key = {(r["category"], int(r["post_number"])): r for r in rows}
+    drop = set()
+    for canonical, dups in groups.items():
+        row = by_key.get(canonical)
+        if row is None:
+            continue
+        present = [d for d in dups if (d["category"], d["post_number"]) in by_key
+                   and (by_key[(d["category"], d["post_number"])].get("summary") or "").strip()
+                   == (row.get("summary") or "").strip()]
+        if not present:
+            continue
+        row = by_key[canonical] = {**row, "sources": [{"category": d["category"], "link": d["link"]} for d in present]}
+        drop.update((d["category"], d["post_number"]) for d in present)
+    out = [r for k, r in by_key.items() if k not in drop]
+    print(f"[dedup] notices={len(rows)} → {len(out)} (merged duplicates={len(drop)})")
+    return out
+
+# ===== 첨부파일 텍스트 (크롤러가 notice_attachment 에 저장) =====
+def merge_attachments(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """행마다 attachments(첨부 텍스트 목록)를 붙인다. notice_attachment 가 없으면 rows 그대로."""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("SHOW TABLES LIKE %s", ("notice_attachment",))
+        texts = fetch_attachment_texts(cur) if cur.fetchone() else {}
+        cur.close()
+    finally:
+        conn.close()
+    if not texts:
+        return rows
+    out = [
+        {**r, "attachments": texts[k]} if (k := (r["category"], int(r["post_number"]))) in texts else r
+        for r in rows
+    ]
+    print(f"[attach] notices with attachment text={sum(1 for r in out if 'attachments' in r)}")
+    return out
+
 # ===== Doc / Chunk =====
 def row_to_doc(row: Dict[str, Any]) -> Document:
     """DB row → LangChain Document (summary = 본문, 나머지 = 메타데이터)"""
     title = (row.get("title") or "").strip()
     link  = row.get("link", "")
-    dept  = row.get("department", "")
-    date  = str(row.get("posted_date", ""))
+    dept  = row.get("department") or ""
+    days  = to_epoch_days(row.get("posted_date"))
     cat   = row.get("category", "")
     pno   = row.get("post_number")
 
@@ -170,25 +397,44 @@ def row_to_doc(row: Dict[str, Any]) -> Document:
     full = (row.get("summary") or "").strip()
     if len(full) > MAX_DOC_LEN:
         full = full[:MAX_DOC_LEN] + "\n\n[... 본문 일부 생략 ...]"
-
-    return Document(
-        page_content=full,
-        metadata={
-            "title": title,
-            "link": link,
-            "department": dept,
-            "posted_date": date,
-            "category": cat,
-            "post_number": pno,
-        }
-    )
-
+    # 첨부 원문은 요약 뒤에 붙여 청크로 나눔 (요약에 다 담기지 않는 일정표/자격 요건 검색용)
+    if row.get("attachments"):
+        full = (full + "\n\n" + format_attachments(row["attachments"])).strip()
+
+    metadata = {
+        "title": title,
+        "link": link,
+        "department": dept,
+        "category": cat,
+        "post_number": pno,
+    }
+    # 여러 게시판에 올라온 공지: 카테고리 필터는 categories($in), 출처 링크는 links 로 모두 보존
+    sources = row.get("sources") or []
+    metadata["categories"] = sorted({cat, *(s["category"] for s in sources)} - {""})
+    if sources:
+        metadata["links"] = [link, *(s["link"] for s in sources if s.get("link"))]
+    # posted_date: 범위 필터가 가능하도록 epoch days 정수, posted_ymd: 표시용 문자열
+    # (Pinecone 메타데이터는 null 불가 → 날짜 없으면 키 생략)
+    if days is not None:
+        metadata["posted_date"] = days
+        metadata["posted_ymd"] = from_epoch_days(days)
+
+    return Document(page_content=full, metadata=metadata)
+
+@timed("indexer.split_docs")
 def split_docs(docs: List[Document]) -> List[Document]:
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP,
         separators=["\n\n", "\n", " ", ""]
     )
-    return splitter.split_documents(docs)
+    chunks = splitter.split_documents(docs)
+    # 공지 안에서의 청크 순번 (notice_chunk 키)
+    counter: Dict[Tuple[Any, Any], int] = {}
+    for c in chunks:
+        key = (c.metadata.get("category"), c.metadata.get("post_number"))
+        c.metadata["chunk_index"] = counter.get(key, 0)
+        counter[key] = c.metadata["chunk_index"] + 1
+    return chunks
 
 # ===== 전역 임베딩 인스턴스 캐싱 =====
 _EMBEDDING_INSTANCE = None
@@ -197,16 +443,208 @@ def get_embedding_instance():
     """임베딩 인스턴스를 재사용하기 위한 캐싱"""
     global _EMBEDDING_INSTANCE
     if _EMBEDDING_INSTANCE is None:
-        if EMBED_TYPE == "korean":
+        if EMBED_TYPE == "korean" and os.getenv("EMBED_SERVICE_URL", "").strip():
+            # 임베딩 서버(scripts/run_embed_server.py)가 모델을 들고 있음 → 이 프로세스는 모델을 로드하지 않음
+            from uosai.common.embed_service import EmbeddingServiceClient
+            _EMBEDDING_INSTANCE = EmbeddingServiceClient(expected_model=EMBED_MODEL)
+        elif EMBED_TYPE == "korean":
             _EMBEDDING_INSTANCE = KoreanSentenceTransformerEmbeddings(model_name=EMBED_MODEL)
             print(f"[Vectorstore] Using Korean embedding model: {EMBED_MODEL} (dim: {_EMBEDDING_INSTANCE.dimension})")
         else:
+            from langchain_openai import OpenAIEmbeddings
             _EMBEDDING_INSTANCE = OpenAIEmbeddings(model=EMBED_MODEL)
             print(f"[Vectorstore] Using OpenAI embedding model: {EMBED_MODEL}")
     return _EMBEDDING_INSTANCE
 
+# ===== 청크 임베딩 저장 (MySQL notice_chunk) =====
+CHUNK_VECTOR_DTYPE = os.getenv("CHUNK_VECTOR_DTYPE", "float16")   # float16(절반 용량) | float32
+_DTYPE_CODE = {"float16": "f2", "float32": "f4"}
+
+def _chunk_key(doc: Document) -> Tuple[str, int, int]:
+    m = doc.metadata or {}
+    return str(m.get("category")), int(m.get("post_number")), int(m.get("chunk_index", 0))
+
+def chunk_id(doc: Document) -> str:
+    """
+    내용 주소 기반 안정 ID: {category}_{post_number}_{본문+메타데이터 해시 16자}.
+    같은 청크는 실행/배치가 달라도 같은 ID, 내용이나 메타데이터가 바뀌면 새 ID (옛 ID는 reconcile 이 정리).
+    chunk_index 도 해시에 넣는다: 앞 청크가 늘거나 줄어 위치만 바뀐 청크를 옛 ID 로 남겨 두면
+    Pinecone 메타데이터의 chunk_index 가 낡아 재점수 때 다른 청크의 벡터를 읽게 된다.
+    """
+    m = doc.metadata or {}
+    meta = "\x1f".join(f"{k}={m[k]}" for k in sorted(m))
+    h = hashlib.sha1(f"{meta}\x1e{doc.page_content}".encode("utf-8")).hexdigest()[:16]
+    return f"{m.get('category', 'none')}_{m.get('post_number', 'none')}_{h}"
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(f"{EMBED_MODEL}\x1f{text}".encode("utf-8")).hexdigest()
+
+def fetch_chunk_hashes(keys: List[Tuple[str, int]]) -> Dict[Tuple[str, int, int], str]:
+    """공지 키들의 저장된 청크 text_hash (현재 EMBED_MODEL 것만)"""
+    if not keys:
+        return {}
+    ensure_table("notice_chunk", NOTICE_CHUNK_DDL)
+    out: Dict[Tuple[str, int, int], str] = {}
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            cond = ", ".join(["(%s, %s)"] * len(part))
+            cur.execute(
+                f"SELECT category, post_number, chunk_index, text_hash FROM notice_chunk "
+                f"WHERE embed_model=%s AND (category, post_number) IN ({cond})",
+                [EMBED_MODEL] + [v for k in part for v in k],
+            )
+            for c, p, ci, h in cur.fetchall():
+                out[(c, int(p), int(ci))] = h
+        cur.close()
+        return out
+    finally:
+        conn.close()
+
+def fetch_chunk_vectors(keys: List[Tuple[str, int, int]]) -> Dict[Tuple[str, int, int], np.ndarray]:
+    """청크 키 → float32 벡터 (현재 EMBED_MODEL·EMBED_DIM 으로 저장된 것만, 다른 모델의 남은 행은 무시)"""
+    out: Dict[Tuple[str, int, int], np.ndarray] = {}
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            cond = ", ".join(["(%s, %s, %s)"] * len(part))
+            cur.execute(f"SELECT category, post_number, chunk_index, dtype, vector FROM notice_chunk "
+                        f"WHERE embed_model=%s AND dim=%s AND (category, post_number, chunk_index) IN ({cond})",
+                        [EMBED_MODEL, EMBED_DIM] + [v for k in part for v in k])
+            for c, p, ci, dt, blob in cur.fetchall():
+                out[(c, int(p), int(ci))] = np.frombuffer(blob, dtype="<" + dt).astype(np.float32)
+        cur.close()
+        return out
+    finally:
+        conn.close()
+
+@timed("indexer.save_chunk_vectors")
+def save_chunk_vectors(docs: List[Document], vecs: np.ndarray) -> int:
+    """청크 벡터 저장 (뒤쪽 청크 정리는 trim_chunk_vectors 에서 공지 전체 청크 수 기준으로)"""
+    ensure_table("notice_chunk", NOTICE_CHUNK_DDL)
+    dt = _DTYPE_CODE[CHUNK_VECTOR_DTYPE]
+    packed = np.ascontiguousarray(vecs, dtype="<" + dt)
+    now = datetime.now().replace(microsecond=0)
+    params = []
+    for d, v in zip(docs, packed):
+        cat, pno, ci = _chunk_key(d)
+        params.append((cat, pno, ci, _text_hash(d.page_content), EMBED_MODEL, packed.shape[1], dt, v.tobytes(), now))
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        for i in range(0, len(params), 200):
+            cur.executemany("""
+            INSERT INTO notice_chunk
+                (category, post_number, chunk_index, text_hash, embed_model, dim, dtype, vector, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) AS new
+            ON DUPLICATE KEY UPDATE text_hash = new.text_hash, embed_model = new.embed_model, dim = new.dim,
+                dtype = new.dtype, vector = new.vector, updated_at = new.updated_at
+            """, params[i:i + 200])
+        conn.commit()
+        cur.close()
+        return len(params)
+    finally:
+        conn.close()
+
+@timed("indexer.trim_chunk_vectors")
+def trim_chunk_vectors(docs: List[Document]) -> int:
+    """
+    공지가 짧아져 남은 뒤쪽 청크와, 더 이상 인덱싱되지 않는 공지(삭제/중복으로 합쳐짐)의 청크 삭제.
+    docs 는 split_docs 의 전체 출력이어야 한다 (배치/캐시 미스 일부만 넘기면 아직 유효한 청크까지 지워짐).
+    """
+    total: Dict[Tuple[str, int], int] = {}
+    for d in docs:
+        cat, pno, ci = _chunk_key(d)
+        total[(cat, pno)] = max(total.get((cat, pno), 0), ci + 1)
+    if not total:
+        return 0
+    ensure_table("notice_chunk", NOTICE_CHUNK_DDL)
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        n = 0
+        for (cat, pno), cnt in total.items():
+            cur.execute("DELETE FROM notice_chunk WHERE category=%s AND post_number=%s AND chunk_index >= %s",
+                        (cat, pno, cnt))
+            n += cur.rowcount
+        cur.execute("SELECT DISTINCT category, post_number FROM notice_chunk")
+        gone = [(c, int(p)) for c, p in cur.fetchall() if (c, int(p)) not in total]
+        for i in range(0, len(gone), 500):
+            part = gone[i:i + 500]
+            cond = ", ".join(["(%s, %s)"] * len(part))
+            cur.execute(f"DELETE FROM notice_chunk WHERE (category, post_number) IN ({cond})",
+                        [v for k in part for v in k])
+            n += cur.rowcount
+        conn.commit()
+        cur.close()
+        return n
+    finally:
+        conn.close()
+
+def embed_chunks(docs: List[Document]) -> np.ndarray:
+    """
+    청크 임베딩 (N, dim) float32.
+    notice_chunk 에 같은 모델·같은 본문의 벡터가 있으면 재사용하고, 새로 계산한 것만 저장한다.
+    """
+    keys = [_chunk_key(d) for d in docs]
+    hashes = [_text_hash(d.page_content) for d in docs]
+    stored = fetch_chunk_hashes(sorted({k[:2] for k in keys}))
+    hit = [i for i, (k, h) in enumerate(zip(keys, hashes)) if stored.get(k) == h]
+    miss = [i for i in range(len(docs)) if stored.get(keys[i]) != hashes[i]]
+
+    out = np.empty((len(docs), EMBED_DIM), dtype=np.float32)
+    if hit:
+        cached = fetch_chunk_vectors([keys[i] for i in hit])
+        for i in hit:
+            out[i] = cached[keys[i]]
+    if miss:
+        vecs = np.asarray(get_embedding_instance().embed_documents([docs[i].page_content for i in miss]),
+                          dtype=np.float32)
+        out[miss] = vecs
+        save_chunk_vectors([docs[i] for i in miss], vecs)
+    print(f"[chunks] reused={len(hit)} embedded={len(miss)}")
+    return out
+
+def load_chunk_matrix(embed_model: str = EMBED_MODEL) -> Tuple[List[Tuple[str, int, int]], np.ndarray]:
+    """
+    저장된 청크 벡터 전체를 한 번의 조회로 (키 목록, (N, dim) float32 행렬) 로 읽는다.
+    BLOB 을 이어 붙여 np.frombuffer 한 번으로 디코딩 (행마다 파이썬 float 리스트를 만들지 않음).
+    """
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT category, post_number, chunk_index, dim, dtype, vector FROM notice_chunk "
+            "WHERE embed_model=%s ORDER BY category, post_number, chunk_index", (embed_model,)
+        )
+        rows = cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
+    if not rows:
+        return [], np.empty((0, EMBED_DIM), dtype=np.float32)
+
+    dim, dt = int(rows[0][3]), rows[0][4]
+    keys = [(r[0], int(r[1]), int(r[2])) for r in rows]
+    mat = np.frombuffer(b"".join(r[5] for r in rows), dtype="<" + dt).reshape(len(rows), dim)
+    return keys, mat.astype(np.float32)
+
+_REDUCER = None
+
+def get_reducer():
+    """VECTOR_PCA_DIM 이 켜져 있으면 학습된 PCAReducer (uosai.common.quantize), 아니면 None"""
+    global _REDUCER
+    if _REDUCER is None and INDEX_DIM != EMBED_DIM:
+        _REDUCER = load_reducer(INDEX_DIM, embed_model=EMBED_MODEL)
+    return _REDUCER
+
 # ===== Pinecone =====
-def ensure_pinecone_index(pc: Pinecone, index_name: str, dim: int):
+def ensure_pinecone_index(pc, index_name: str, dim: int):
+    from pinecone import ServerlessSpec
     names = [idx.name for idx in pc.list_indexes()]
     if index_name not in names:
         if not PINECONE_CLOUD or not PINECONE_REGION:
@@ -217,50 +655,62 @@ def ensure_pinecone_index(pc: Pinecone, index_name: str, dim: int):
             metric="cosine",
             spec=ServerlessSpec(cloud=PINECONE_CLOUD, region=PINECONE_REGION),
         )
+    elif int(pc.describe_index(index_name).dimension) != dim:
+        # VECTOR_PCA_DIM 을 바꾼 경우: 다른 PINECONE_INDEX 이름으로 새 인덱스를 만든다
+        raise RuntimeError(f"Pinecone index {index_name} dimension != {dim} (check VECTOR_PCA_DIM/PINECONE_INDEX)")
 
-def get_vectorstore() -> PineconeVectorStore:
+def get_vectorstore():
     if not PINECONE_API_KEY:
         raise RuntimeError("PINECONE_API_KEY missing")
+    from pinecone import Pinecone
+    from langchain_pinecone import PineconeVectorStore
     pc = Pinecone(api_key=PINECONE_API_KEY)
-    ensure_pinecone_index(pc, PINECONE_INDEX, EMBED_DIM)
+    ensure_pinecone_index(pc, PINECONE_INDEX, INDEX_DIM)
 
     # 캐싱된 임베딩 인스턴스 사용
     embeddings = get_embedding_instance()
 
     # PINECONE_NS 가 None이면 기본 네임스페이스(__default__) 사용
-    return PineconeVectorStore(index_name=PINECONE_INDEX, embedding=embeddings, namespace=PINECONE_NS)
+    store = PineconeVectorStore(index_name=PINECONE_INDEX, embedding=embeddings, namespace=PINECONE_NS)
+    reducer = get_reducer()
+    if reducer is not None:
+        # 질의 벡터를 PCA 공간으로 사영해 검색, 상위 후보는 notice_chunk 의 원래 벡터로 재점수
+        return ProjectedVectorStore(store, reducer, fetch_full=fetch_chunk_vectors)
+    return store
 
 
-def upsert_docs(docs: List[Document], rebuild: bool = False) -> int:
+@timed("indexer.upsert_docs")
+def upsert_docs(docs: List[Document], rebuild: bool = False, namespace: str | None = PINECONE_NS) -> int:
     if not PINECONE_API_KEY:
         raise RuntimeError("PINECONE_API_KEY missing")
+    from pinecone import Pinecone
 
     pc = Pinecone(api_key=PINECONE_API_KEY)
-    ensure_pinecone_index(pc, PINECONE_INDEX, EMBED_DIM)
-    vs = get_vectorstore()
+    ensure_pinecone_index(pc, PINECONE_INDEX, INDEX_DIM)
 
     # 첫 배치에서만 전체 삭제할 때 사용
     if rebuild:
         idx = pc.Index(PINECONE_INDEX)
-        ns_repr = "__default__" if PINECONE_NS is None else PINECONE_NS
+        ns_repr = "__default__" if namespace is None else namespace
         print(f"[pinecone] delete_all namespace={ns_repr}")
         try:
-            if PINECONE_NS is None:
+            if namespace is None:
                 idx.delete(delete_all=True)  # 기본 네임스페이스
             else:
-                idx.delete(delete_all=True, namespace=PINECONE_NS)
+                idx.delete(delete_all=True, namespace=namespace)
         except Exception as e:
             # 존재하지 않는 네임스페이스면 지울 게 없어서 404가 날 수 있음 — 경고만 출력
             print(f"[pinecone] delete_all warning: {e}")
 
-    # 업서트
-    ids = []
-    for i, d in enumerate(docs):
-        m = d.metadata or {}
-        pno = str(m.get("post_number", "none"))
-        cat = str(m.get("category", "none"))
-        ids.append(f"{cat}_{pno}_{i}")
-
-    vs.add_documents(docs, ids=ids)
+    # 업서트: 벡터는 notice_chunk 재사용/저장을 거쳐 직접 계산해 넘김 (PineconeVectorStore 와 같은 text 키)
+    vecs = embed_chunks(docs)
+    reducer = get_reducer()
+    if reducer is not None:
+        vecs = reducer.transform(vecs)
+    vectors = [
+        {"id": chunk_id(d), "values": v.tolist(), "metadata": {**(d.metadata or {}), "text": d.page_content}}
+        for v, d in zip(vecs, docs)
+    ]
+    pc.Index(PINECONE_INDEX).upsert(vectors=vectors, namespace=namespace, batch_size=100)
     return len(docs)
 
@@ -9,7 +9,7 @@ from typing import Optional, Dict, List
 import base64
 from io import BytesIO
 from collections import OrderedDict
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlparse, urljoin, unquote
 
 import requests
 from bs4 import BeautifulSoup
@@ -19,7 +19,7 @@ from mysql.connector import Error as MySQLError
 from openai import OpenAI
 from PIL import Image  # 이미지 처리
 from datetime import date, datetime
-import sys, traceback
+import sys, socket, traceback
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -31,6 +31,18 @@ try:
 except Exception:
     _PLAYWRIGHT_AVAILABLE = False
 
+# 공용 모듈 (모듈 상수가 환경변수를 읽으므로 load_dotenv 다음에)
+from uosai.common import attachments, job_queue
+from uosai.common.attachments import ATTACH_ENABLED, ATTACH_EXTS
+from uosai.common.categories import CATEGORIES
+from uosai.common.dedup import DEDUP_ENABLED, DuplicateMatch, NoticeDeduper
+from uosai.common.image_cache import (
+    IMAGE_CACHE_ENABLED, IMAGE_MIN_SIDE, IMAGE_MAX_BYTES, IMAGE_MAX_PER_NOTICE, ImageTextCache, content_hash, phash,
+)
+from uosai.common.metrics import timed, count, stage
+from uosai.common.profiling import checkpoint
+from uosai.common.schema import EXISTS_SQL, FETCH_SUMMARY_SQL
+
 # =========================
 # 0) 환경설정
 # =========================
@@ -57,19 +69,7 @@ client = OpenAI(api_key=OPENAI_API_KEY)
 SUMMARIZE_MODEL = "gpt-4o"
 
 #################################################################################
-# 카테고리 ↔ list_id 매핑
-CATEGORIES: Dict[str, str] = {
-    "COLLEGE_ENGINEERING": "20013DA1",
-    "COLLEGE_HUMANITIES": "human01",
-    "COLLEGE_SOCIAL_SCIENCES": "econo01",
-    "COLLEGE_URBAN_SCIENCE": "urbansciences01",
-    "COLLEGE_ARTS_SPORTS": "artandsport01",
-    "COLLEGE_BUSINESS": "20008N2",
-    "COLLEGE_NATURAL_SCIENCES": "scien01",
-    "COLLEGE_LIBERAL_CONVERGENCE": "clacds01",
-    "GENERAL": "FA1",     
-    "ACADEMIC": "FA2",    
-}
+# 카테고리 ↔ list_id 매핑 (uosai.common.categories 공용 정의)
 #################################################################################
 
 CRAWL_VIEW_URL = "https://www.uos.ac.kr/korNotice/view.do?identified=anonymous&"
@@ -87,6 +87,17 @@ REQUEST_SLEEP = 1.0
 PLAYWRIGHT_TIMEOUT_MS = 90000
 RECENT_WINDOW = 50
 
+# 캡처 프로필: fast = 불필요한 리소스/외부 호스트 차단 + 이벤트 기반 대기, legacy = 고정 스크롤/슬립 (기존 동작)
+CAPTURE_PROFILE          = os.getenv("CAPTURE_PROFILE", "fast").strip().lower()
+CAPTURE_ALLOWED_HOSTS    = tuple(h.strip() for h in os.getenv("CAPTURE_ALLOWED_HOSTS", "uos.ac.kr").split(",") if h.strip())
+CAPTURE_CONTENT_TIMEOUT_MS = int(os.getenv("CAPTURE_CONTENT_TIMEOUT_MS", "10000"))  # 본문 컨테이너 대기
+CAPTURE_IMAGE_TIMEOUT_MS   = int(os.getenv("CAPTURE_IMAGE_TIMEOUT_MS", "8000"))     # 이미지 로드 완료 대기
+CAPTURE_IDLE_TIMEOUT_MS    = int(os.getenv("CAPTURE_IDLE_TIMEOUT_MS", "3000"))      # 네트워크 유휴 대기
+# 스크린샷 렌더링에 필요 없는 리소스 타입 (document/stylesheet/image/script 는 허용)
+CAPTURE_BLOCK_TYPES = {"font", "media", "websocket", "eventsource", "manifest", "texttrack", "beacon", "ping"}
+# 본문 컨테이너 (포털 / 학과 사이트)
+CAPTURE_CONTENT_SELECTOR = "div.vw-tibx, div.vw-cnt, div.vw-con, div.board-view, #bo_v, article, main"
+
 # =========================
 # 1) 유틸
 # =========================
@@ -113,6 +124,19 @@ def parse_date_yyyy_mm_dd(text: str) -> Optional[str]:
     return m.group(1) if m else None
 
 
+# 본문 후보 셀렉터 (사이트 맞게 필요시 추가)
+MAIN_CONTENT_SELECTORS = [
+    "div.vw-cnt", "div.vw-con", "div.vw-bd", "div.board-view",
+    "article", "div#content", "div#contents", "main"
+]
+
+def _select_main(soup: BeautifulSoup):
+    for sel in MAIN_CONTENT_SELECTORS:
+        node = soup.select_one(sel)
+        if node and node.get_text(strip=True):
+            return node
+    return soup.body or soup
+
 def extract_main_text_from_html(html: str, max_chars: int = 12000) -> str:
     """
     공지의 '본문' 컨테이너에서 텍스트만 추출.
@@ -120,20 +144,7 @@ def extract_main_text_from_html(html: str, max_chars: int = 12000) -> str:
     길이가 너무 길면 max_chars로 잘라 모델 입력을 안정화.
     """
     soup = BeautifulSoup(html, "html.parser")
-
-    # 본문 후보 셀렉터 (사이트 맞게 필요시 추가)
-    candidates = [
-        "div.vw-cnt", "div.vw-con", "div.vw-bd", "div.board-view",
-        "article", "div#content", "div#contents", "main"
-    ]
-    main = None
-    for sel in candidates:
-        node = soup.select_one(sel)
-        if node and node.get_text(strip=True):
-            main = node
-            break
-    if main is None:
-        main = soup.body or soup
+    main = _select_main(soup)
 
     # 불필요 영역 제거
     kill_selectors = [
@@ -169,6 +180,59 @@ def extract_main_text_from_html(html: str, max_chars: int = 12000) -> str:
 # =========================
 # 2) Playwright로 HTML → 이미지 캡처
 # =========================
+def _is_first_party(url: str) -> bool:
+    host = urlparse(url).hostname or ""
+    return any(host == h or host.endswith("." + h) for h in CAPTURE_ALLOWED_HOSTS)
+
+def _install_capture_routes(page) -> List[int]:
+    """
+    폰트/미디어/비콘 등과 외부 호스트(트래커, 위젯 스크립트)를 요청 단계에서 차단.
+    외부 호스트라도 본문 이미지(포스터 CDN 등)는 캡처에 필요하므로 허용. 반환값: [차단 수] (라우트 콜백이 갱신)
+    """
+    blocked = [0]
+
+    def handle(route):
+        req = route.request
+        rtype = req.resource_type
+        if rtype in CAPTURE_BLOCK_TYPES or (
+            rtype not in ("document", "image") and not _is_first_party(req.url)
+        ):
+            blocked[0] += 1
+            return route.abort()
+        return route.continue_()
+
+    page.route("**/*", handle)
+    return blocked
+
+def _wait_for_content(page) -> None:
+    """고정 슬립 대신: 본문 컨테이너 → lazy 이미지 강제 로드 → 이미지 완료 → 네트워크 유휴"""
+    try:
+        page.wait_for_selector(CAPTURE_CONTENT_SELECTOR, timeout=CAPTURE_CONTENT_TIMEOUT_MS)
+    except Exception:
+        pass
+    # loading="lazy" / data-src 이미지를 스크롤 없이 바로 로드
+    page.evaluate("""() => {
+        for (const img of document.images) {
+            img.loading = "eager";
+            const lazy = img.dataset.src || img.dataset.original || img.dataset.lazySrc;
+            if (lazy && img.src !== lazy) img.src = lazy;
+        }
+        window.scrollTo(0, document.body.scrollHeight);
+        window.scrollTo(0, 0);
+    }""")
+    try:
+        page.wait_for_function(
+            "() => Array.from(document.images).every(i => i.complete)",
+            timeout=CAPTURE_IMAGE_TIMEOUT_MS,
+        )
+    except Exception:
+        print("⚠️ 일부 이미지 로드 대기 시간 초과 → 현재 상태로 캡처")
+    try:
+        page.wait_for_load_state("networkidle", timeout=CAPTURE_IDLE_TIMEOUT_MS)
+    except Exception:
+        pass
+
+@timed("crawler.html_to_images_playwright")
 def html_to_images_playwright(
     url: str,
     viewport_width: int = 1200,
@@ -176,6 +240,8 @@ def html_to_images_playwright(
     timeout_ms: int = PLAYWRIGHT_TIMEOUT_MS,
     debug_full_image_path: Optional[str] = None,  # 전체 페이지 1장 저장 경로
     full_image_format: str = "png",               # "png"|"jpeg"
+    profile: str = CAPTURE_PROFILE,               # "fast"|"legacy"
+    hide_srcs: Optional[List[str]] = None,        # 텍스트로 대체한 본문 이미지 (캡처에서 제외)
 ) -> List[Image.Image]:
     """
     페이지 전체를 full_page 스크린샷으로 찍은 뒤,
@@ -198,19 +264,41 @@ def html_to_images_playwright(
                 viewport={"width": viewport_width, "height": slice_height},
                 device_scale_factor=2.0,
             )
-            page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
-
-            try:
-                page.wait_for_selector("div.vw-tibx", timeout=timeout_ms)
-            except Exception:
-                pass
-
-            for _ in range(6):
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_timeout(700)
-
-            page.wait_for_load_state("domcontentloaded")
-            page.wait_for_timeout(500)
+            if profile == "fast":
+                blocked = _install_capture_routes(page)
+                page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+                _wait_for_content(page)
+                count("crawler.capture_blocked", blocked[0])
+            else:
+                page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+
+                try:
+                    page.wait_for_selector("div.vw-tibx", timeout=timeout_ms)
+                except Exception:
+                    pass
+
+                for _ in range(6):
+                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    page.wait_for_timeout(700)
+
+                page.wait_for_load_state("domcontentloaded")
+                page.wait_for_timeout(500)
+
+            if hide_srcs:
+                # 양쪽 모두 절대 URL → 퍼센트 디코딩 형태로 맞춰 비교 (normalize_image_url 과 같은 규칙)
+                page.evaluate("""(srcs) => {
+                    const norm = (u) => {
+                        if (!u) return "";
+                        try { u = new URL(u, document.baseURI).href; } catch (e) { return u; }
+                        try { return decodeURIComponent(u); } catch (e) { return u; }
+                    };
+                    const hide = new Set(srcs);
+                    for (const img of document.images) {
+                        const cands = [img.currentSrc, img.src, img.getAttribute("src"),
+                                       img.getAttribute("data-src"), img.getAttribute("data-original")];
+                        if (cands.some(c => hide.has(norm(c)))) img.style.display = "none";
+                    }
+                }""", [normalize_image_url(u) for u in hide_srcs])
 
             # 전체 페이지 스크린샷
             if full_image_format.lower() == "png":
@@ -253,10 +341,15 @@ def pil_to_data_url(pil_image: Image.Image, fmt="JPEG", quality=80) -> str:
 
     return f"data:image/{fmt.lower()};base64,{b64}"
 
-def summarize_with_text_and_images(html_text: str, images: List[Image.Image]) -> str:
+@timed("crawler.summarize_with_text_and_images")
+def summarize_with_text_and_images(html_text: str, images: List[Image.Image],
+                                   image_texts: Optional[List[str]] = None,
+                                   attachment_text: str = "") -> str:
     """
     HTML 본문 텍스트를 우선 근거로 삼고,
     이미지(포스터/표 등)에만 있는 누락 정보를 보강하도록 지시.
+    image_texts: 캡처에서 제외한 본문 이미지의 추출 텍스트 (이미지 대신 텍스트로 전달)
+    attachment_text: 첨부파일(PDF/HWP 등)에서 추출한 텍스트
     """
     merge_prompt = f"""
 아래는 대학 공지사항의 'HTML 본문 텍스트'입니다. 이 텍스트를 **우선 근거**로 삼고,
@@ -273,6 +366,11 @@ def summarize_with_text_and_images(html_text: str, images: List[Image.Image]) ->
 {html_text}
 [HTML 본문 텍스트 끝]
 """.strip()
+    if image_texts:
+        merge_prompt += "\n\n[본문 이미지에서 추출한 텍스트 시작]\n" + "\n---\n".join(image_texts) \
+                        + "\n[본문 이미지에서 추출한 텍스트 끝]"
+    if attachment_text:
+        merge_prompt += "\n\n[첨부파일 텍스트 시작]\n" + attachment_text + "\n[첨부파일 텍스트 끝]"
 
     contents = [{"type": "input_text", "text": merge_prompt}]
     for img in images:
@@ -292,12 +390,199 @@ def summarize_with_text_and_images(html_text: str, images: List[Image.Image]) ->
         traceback.print_exc(limit=2, file=sys.stdout)
         return ""
 
+# =========================
+# 3-1) 본문 이미지(포스터/배너) 텍스트 캐시 — pHash, notice_image_text 테이블 (마이그레이션 007)
+# =========================
+
+IMAGE_TEXT_PROMPT = """
+대학 공지사항 본문에 첨부된 이미지입니다. 이미지 안의 글자/표/일정을 빠짐없이 원문 그대로 옮겨 적으세요.
+- 표는 행 단위로, 날짜/시간/수치/연락처는 원문 표기 그대로
+- 설명이나 추측, 머리말은 쓰지 말 것
+- 읽을 글자가 없는 장식용 이미지면 빈 응답
+""".strip()
+
+_IMAGE_CACHE = None   # None: 아직 로드 안 함, False: 사용 불가
+
+def get_image_cache() -> Optional[ImageTextCache]:
+    global _IMAGE_CACHE
+    if _IMAGE_CACHE is None:
+        _IMAGE_CACHE = False
+        if IMAGE_CACHE_ENABLED:
+            c = ImageTextCache()
+            try:
+                with mysql_conn() as conn:
+                    cur = conn.cursor()
+                    n = c.load(cur)
+                    cur.close()
+                print(f"[image-cache] loaded {n} hashes")
+                _IMAGE_CACHE = c
+            except MySQLError as e:
+                print(f"[image-cache] disabled (run scripts/run_migrations.py): {e}")
+    return _IMAGE_CACHE or None
+
+def extract_content_image_srcs(html: str, page_url: str) -> List[str]:
+    """본문 컨테이너의 <img> 절대 URL (lazy 속성 포함, 순서 유지·중복 제거)"""
+    main = _select_main(BeautifulSoup(html, "html.parser"))
+    out: List[str] = []
+    for img in main.select("img"):
+        src = img.get("data-src") or img.get("data-original") or img.get("src") or ""
+        if not src or src.startswith("data:"):
+            continue
+        url = urljoin(page_url, src.strip())
+        if url not in out:
+            out.append(url)
+    return out
+
+def normalize_image_url(url: str) -> str:
+    """캡처 시 숨김 대상 비교용: 절대 URL, 스킴/호스트 소문자, 퍼센트 인코딩 해제"""
+    p = urlparse(url)
+    return unquote(p._replace(scheme=p.scheme.lower(), netloc=p.netloc.lower()).geturl())
+
+def download_image(url: str) -> Optional[tuple]:
+    """(원본 바이트, RGB 이미지)"""
+    try:
+        with requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, stream=True,
+                          timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as r:
+            if r.status_code != 200 or int(r.headers.get("Content-Length") or 0) > IMAGE_MAX_BYTES:
+                return None
+            buf = BytesIO()
+            for chunk in r.iter_content(64 * 1024):
+                buf.write(chunk)
+                if buf.tell() > IMAGE_MAX_BYTES:
+                    return None
+        data = buf.getvalue()
+        img = Image.open(BytesIO(data))
+        img.load()
+        return data, img.convert("RGB")
+    except Exception as e:
+        print(f"⚠️ 본문 이미지 다운로드 실패 {url}: {e}")
+        return None
+
+@timed("crawler.extract_image_text")
+def extract_image_text(img: Image.Image) -> Optional[str]:
+    """이미지 한 장의 텍스트 (실패 시 None, 글자가 없으면 빈 문자열)"""
+    img = img.copy()
+    img.thumbnail((2048, 2048))
+    try:
+        resp = client.responses.create(
+            model=SUMMARIZE_MODEL,
+            input=[{"role": "user", "content": [
+                {"type": "input_text", "text": IMAGE_TEXT_PROMPT},
+                {"type": "input_image", "image_url": pil_to_data_url(img, fmt="JPEG", quality=80)},
+            ]}],
+            temperature=0.0,
+        )
+        return (resp.output_text or "").strip()
+    except Exception as e:
+        print(f"❌ 이미지 텍스트 추출 실패: {type(e).__name__}: {e}")
+        return None
+
+def describe_content_images(html: str, page_url: str):
+    """
+    (이미지 텍스트 목록, 캡처에서 숨길 src 목록).
+    캐시에 있는 이미지는 저장된 텍스트를 쓰고, 새 이미지는 한 장씩 텍스트를 뽑아 캐시에 저장.
+    작은 이미지나 다운로드/추출 실패 이미지는 그대로 스크린샷에 남긴다.
+    """
+    cache = get_image_cache()
+    if cache is None:
+        return [], []
+    texts: List[str] = []
+    hide: List[str] = []
+    for url in extract_content_image_srcs(html, page_url)[:IMAGE_MAX_PER_NOTICE]:
+        got = download_image(url)
+        if got is None or min(got[1].size) < IMAGE_MIN_SIDE:
+            continue
+        data, img = got
+        digest = content_hash(data)
+        text = cache.lookup(digest)
+        try:
+            with mysql_conn() as conn:
+                cur = conn.cursor()
+                if text is not None:
+                    cache.touch(cur, digest)
+                    count("crawler.image_cache_hit")
+                    print(f"↳ 이미지 캐시 적중: {url}")
+                else:
+                    # 같은 템플릿에 글자만 다른 포스터도 pHash 가 가까우므로 재사용하지 않고 새로 추출 (집계만)
+                    h = phash(img)
+                    if cache.near(h) is not None:
+                        count("crawler.image_cache_near")
+                    text = extract_image_text(img)
+                    if text is None:
+                        cur.close()
+                        continue
+                    cache.record(cur, digest, h, text, img.size, url)
+                    count("crawler.image_cache_miss")
+                cur.close()
+        except MySQLError as e:
+            print(f"[image-cache] save failed: {e}")
+            continue
+        hide.append(url)
+        if text:
+            texts.append(text)
+    return texts, hide
+
+# =========================
+# 3-2) 첨부파일 텍스트 — notice_attachment 테이블 (마이그레이션 008)
+# =========================
+
+# 첨부 목록 영역 (포털 / 그누보드 / 학과 CMS)
+ATTACH_SELECTORS = ".attach a, .file a, .files a, .vw-file a, #bo_v_file a, .file-list a, .attach-list a"
+_DOWNLOAD_HREF = re.compile(r"download|filedown|file_down|down\.php|fileDown", re.I)
+
+def extract_attachment_links(html: str, page_url: str) -> List[tuple]:
+    """
+    [(절대 URL, 표시 이름)] — 첨부 영역이 있으면 그 안의 링크만,
+    없으면 본문 컨테이너(_select_main) 안에서 확장자가 보이는 링크만 (메뉴/푸터/관련글의 파일 링크 제외)
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    anchors = soup.select(ATTACH_SELECTORS)
+    in_attach_box = bool(anchors)
+    if not in_attach_box:
+        anchors = _select_main(soup).select("a[href]")
+    out, seen = [], set()
+    for a in anchors:
+        href = (a.get("href") or "").strip()
+        if not href or href.startswith(("javascript:", "#", "mailto:")):
+            continue
+        name = a.get_text(" ", strip=True)
+        name = re.sub(r"\s*\(\s*[\d.,]+\s*[KMG]?B\s*\)\s*$", "", name, flags=re.I)   # "파일.pdf (123KB)"
+        has_ext = any(x.lower().endswith(ATTACH_EXTS) for x in (name, href.split("?")[0]))
+        if not (has_ext or (in_attach_box and _DOWNLOAD_HREF.search(href))):
+            continue
+        url = urljoin(page_url, href)
+        if url not in seen:
+            seen.add(url)
+            out.append((url, name))
+    return out
+
+def collect_attachment_text(category: str, post_number: int, html: str, page_url: str) -> str:
+    """첨부를 동시에 내려받아 텍스트 추출 (URL/ETag/내용 해시 캐시), 요약 프롬프트용 문자열"""
+    if not ATTACH_ENABLED:
+        return ""
+    links = extract_attachment_links(html, page_url)
+    if not links:
+        return ""
+    try:
+        with stage("crawler.attachments"), mysql_conn() as conn:
+            cur = conn.cursor()
+            items = attachments.collect(cur, (category, post_number), links)
+            cur.close()
+    except MySQLError as e:
+        print(f"[attach] disabled (run scripts/run_migrations.py): {e}")
+        return ""
+    count("crawler.attachments", len(items))
+    if items:
+        print(f"↳ 첨부 {len(items)}/{len(links)}건 텍스트 추출: {', '.join(a.filename for a in items)}")
+    return attachments.format_attachments(items)
+
 # =========================
 # 4) HTML 파싱 (상세)
 # =========================
 CONNECT_TIMEOUT = 10    # 서버 TCP 연결까지 기다릴 최대 시간
 READ_TIMEOUT    = 20   # 실제 응답(HTML)을 받는 시간
 
+@timed("crawler.fetch_notice_html")
 def fetch_notice_html(list_id: str, seq: int) -> Optional[str]:
     try:
         params = {
@@ -367,7 +652,7 @@ ON DUPLICATE KEY UPDATE
     department = new.department
 """
 
-EXISTS_SQL = "SELECT posted_date FROM notice WHERE category=%s AND post_number=%s LIMIT 1"
+# (category, post_number) 유니크 키 조회 — 스키마/인덱스는 uosai.common.migrations 참고
 
 def get_existing_posted_date(category: str, post_number: int) -> Optional[str]:
     with mysql_conn() as conn:
@@ -377,6 +662,7 @@ def get_existing_posted_date(category: str, post_number: int) -> Optional[str]:
         cur.close()
         return row[0] if row else None
 
+@timed("crawler.upsert_notice")
 def upsert_notice(row: dict):
     with mysql_conn() as conn:
         cur = conn.cursor()
@@ -395,6 +681,65 @@ def upsert_notice(row: dict):
         )
         cur.close()
 
+# 게시판 간 중복 공지 (MinHash LSH, notice_minhash 테이블 — 마이그레이션 006)
+
+_DEDUPER = None   # None: 아직 로드 안 함, False: 사용 불가
+
+def get_deduper() -> Optional[NoticeDeduper]:
+    global _DEDUPER
+    if _DEDUPER is None:
+        _DEDUPER = False
+        if DEDUP_ENABLED:
+            d = NoticeDeduper()
+            try:
+                with mysql_conn() as conn:
+                    cur = conn.cursor()
+                    n = d.load(cur)
+                    cur.close()
+                print(f"[dedup] loaded {n} signatures")
+                _DEDUPER = d
+            except MySQLError as e:
+                print(f"[dedup] disabled (run scripts/run_migrations.py): {e}")
+    return _DEDUPER or None
+
+def dedup_check(category: str, post_number: int, html_text: str, title: str):
+    """
+    (지문, 중복 매치, 재사용할 canonical 요약).
+    요약은 거의 동일한 공지(DuplicateMatch.reusable)일 때만 반환 — 그 외 중복은 연결만 하고 새로 요약한다.
+    canonical 요약이 없거나 DB 오류면 중복으로 보지 않는다 (DB 오류 시 지문도 버려 크롤링만 계속).
+    """
+    d = get_deduper()
+    if d is None:
+        return None, None, None
+    fp, match = d.check((category, post_number), html_text)
+    if match is None:
+        return fp, None, None
+    try:
+        with mysql_conn() as conn:
+            cur = conn.cursor()
+            cur.execute(FETCH_SUMMARY_SQL, match.canonical)
+            r = cur.fetchone()
+            cur.close()
+    except MySQLError as e:
+        print(f"[dedup] canonical lookup failed → dedup skipped: {e}")
+        return None, None, None
+    if not r or not r[0]:
+        return fp, None, None
+    summary, canonical_title = r
+    return fp, match, (summary if match.reusable(title, canonical_title or "") else None)
+
+def dedup_record(category: str, post_number: int, sig, posted_date, match: Optional[DuplicateMatch]) -> None:
+    d = get_deduper()
+    if d is None or sig is None:
+        return
+    try:
+        with mysql_conn() as conn:
+            cur = conn.cursor()
+            d.record(cur, (category, post_number), sig, posted_date, match)
+            cur.close()
+    except MySQLError as e:
+        print(f"[dedup] signature save failed: {e}")
+
 def _ymd(x: Optional[object]) -> Optional[str]:
     if x is None:
         return None
@@ -445,25 +790,38 @@ def process_one(category_key: str, list_id: str, seq: int) -> str:
     # 4-1) HTML 본문 텍스트 추출
     html_text = extract_main_text_from_html(html)
 
-    # 5) HTML → 전체 이미지 캡처 (슬라이스 포함)
-    imgs = html_to_images_playwright(
-        crawl_link,
-        viewport_width=1200,
-        slice_height=1800,
-        debug_full_image_path=None,     # 전체 1장 저장
-        full_image_format="png",
-    )
-    if not imgs:
-        print(f"↳ Seq {seq}: 이미지 캡처 실패 → 스킵")
-        return "skipped_error"
+    # 다른 게시판에 거의 같은 공지가 이미 있으면 캡처/요약(Playwright + LLM) 생략, canonical 요약 재사용
+    sig, dup, summary = dedup_check(category_key, post_number, html_text, title)
+    reused = summary is not None
+    if reused:
+        print(f"↳ Seq {seq}: {dup.canonical[0]}#{dup.canonical[1]} 와 중복 (유사도 {dup.similarity:.2f}) → 요약 재사용")
+    else:
+        if dup:
+            print(f"↳ Seq {seq}: {dup.canonical[0]}#{dup.canonical[1]} 와 유사 (유사도 {dup.similarity:.2f}) → 연결만 하고 새로 요약")
+        # 5) HTML → 전체 이미지 캡처 (슬라이스 포함)
+        # 캐시에 있는 포스터/배너는 텍스트로 대체하고 캡처에서 제외
+        img_texts, hide_srcs = describe_content_images(html, crawl_link)
+        # 첨부파일(PDF/HWP/DOCX) 텍스트
+        att_text = collect_attachment_text(category_key, post_number, html, crawl_link)
+        imgs = html_to_images_playwright(
+            crawl_link,
+            hide_srcs=hide_srcs,
+            viewport_width=1200,
+            slice_height=1800,
+            debug_full_image_path=None,     # 전체 1장 저장
+            full_image_format="png",
+        )
+        if not imgs:
+            print(f"↳ Seq {seq}: 이미지 캡처 실패 → 스킵")
+            return "skipped_error"
 
-    # 6) 텍스트 + 이미지 동시 요약
-    summary = summarize_with_text_and_images(html_text, imgs)
-    if not summary:
-        print(f"↳ Seq {seq}: 텍스트+이미지 요약 실패 → 스킵")
-        return "skipped_error"
+        # 6) 텍스트 + 이미지 동시 요약
+        summary = summarize_with_text_and_images(html_text, imgs, img_texts, att_text)
+        if not summary:
+            print(f"↳ Seq {seq}: 텍스트+이미지 요약 실패 → 스킵")
+            return "skipped_error"
 
-    print(summary)
+        print(summary)
 
     # 8) DB 업서트
     row = {
@@ -479,8 +837,9 @@ def process_one(category_key: str, list_id: str, seq: int) -> str:
     } 
     try:
         upsert_notice(row)
+        dedup_record(row["category"], post_number, sig, posted_date, dup)
         print(f"✅ 저장 완료: [{category_key}] seq={seq}, post_number={post_number}, posted_date={posted_date}, title={title[:30]}...")
-        return "stored"
+        return "duplicate" if reused else "stored"
     except MySQLError as e:
         print(f"❌ DB 저장 실패: {e.__class__.__name__}({getattr(e,'errno',None)}): {e}")
         tb = traceback.format_exc(limit=3)
@@ -630,6 +989,7 @@ def collect_recent_seqs_cheme(limit: int = 100, max_pages: int = 20) -> List[int
 
     return collected
 
+@timed("crawler.fetch_notice_html")
 def fetch_notice_html_cheme(wr_id: int) -> Optional[str]:
     """화학공학과 개별 공지 HTML 가져오기"""
     url = f"{CHEME_LIST_URL}&wr_id={wr_id}"
@@ -724,25 +1084,38 @@ def process_one_cheme(wr_id: int) -> str:
     # HTML 본문 텍스트 추출
     html_text = extract_main_text_from_html(html)
 
-    # HTML → 전체 이미지 캡처
-    imgs = html_to_images_playwright(
-        crawl_link,
-        viewport_width=1200,
-        slice_height=1800,
-        debug_full_image_path=None,
-        full_image_format="png",
-    )
-    if not imgs:
-        print(f"↳ wr_id={wr_id}: 이미지 캡처 실패 → 스킵")
-        return "skipped_error"
+    # 다른 게시판에 거의 같은 공지가 이미 있으면 캡처/요약(Playwright + LLM) 생략, canonical 요약 재사용
+    sig, dup, summary = dedup_check("COLLEGE_ENGINEERING", post_number, html_text, title)
+    reused = summary is not None
+    if reused:
+        print(f"↳ wr_id={wr_id}: {dup.canonical[0]}#{dup.canonical[1]} 와 중복 (유사도 {dup.similarity:.2f}) → 요약 재사용")
+    else:
+        if dup:
+            print(f"↳ wr_id={wr_id}: {dup.canonical[0]}#{dup.canonical[1]} 와 유사 (유사도 {dup.similarity:.2f}) → 연결만 하고 새로 요약")
+        # HTML → 전체 이미지 캡처
+        # 캐시에 있는 포스터/배너는 텍스트로 대체하고 캡처에서 제외
+        img_texts, hide_srcs = describe_content_images(html, crawl_link)
+        # 첨부파일(PDF/HWP/DOCX) 텍스트
+        att_text = collect_attachment_text("COLLEGE_ENGINEERING", post_number, html, crawl_link)
+        imgs = html_to_images_playwright(
+            crawl_link,
+            hide_srcs=hide_srcs,
+            viewport_width=1200,
+            slice_height=1800,
+            debug_full_image_path=None,
+            full_image_format="png",
+        )
+        if not imgs:
+            print(f"↳ wr_id={wr_id}: 이미지 캡처 실패 → 스킵")
+            return "skipped_error"
 
-    # 텍스트 + 이미지 동시 요약
-    summary = summarize_with_text_and_images(html_text, imgs)
-    if not summary:
-        print(f"↳ wr_id={wr_id}: 텍스트+이미지 요약 실패 → 스킵")
-        return "skipped_error"
+        # 텍스트 + 이미지 동시 요약
+        summary = summarize_with_text_and_images(html_text, imgs, img_texts, att_text)
+        if not summary:
+            print(f"↳ wr_id={wr_id}: 텍스트+이미지 요약 실패 → 스킵")
+            return "skipped_error"
 
-    print(summary)
+        print(summary)
     # DB 업서트
     row = {
         "category": "COLLEGE_ENGINEERING",
@@ -757,8 +1130,9 @@ def process_one_cheme(wr_id: int) -> str:
     }
     try:
         upsert_notice(row)
+        dedup_record(row["category"], post_number, sig, posted_date, dup)
         print(f"✅ 저장 완료: [화학공학과] wr_id={wr_id}, post_number={post_number}, title={title[:50]}, link={db_link}, posted_date={posted_date}, department={department}, viewCount={view_count}")
-        return "stored"
+        return "duplicate" if reused else "stored"
     except MySQLError as e:
         print(f"❌ DB 저장 실패: {e.__class__.__name__}({getattr(e,'errno',None)}): {e}")
         tb = traceback.format_exc(limit=3)
@@ -810,6 +1184,7 @@ def collect_recent_seqs_lifesci(limit: int = 100, max_pages: int = 20) -> List[i
 
     return collected
 
+@timed("crawler.fetch_notice_html")
 def fetch_notice_html_lifesci(bbsidx: int) -> Optional[str]:
     """생명과학과 개별 공지 HTML 가져오기 (화공과 fetch 함수와 구조 동일)"""
     # URL 구조: ...notice?md=v&bbsidx=11971
@@ -894,25 +1269,38 @@ def process_one_lifesci(bbsidx: int) -> str:
     # HTML 본문 텍스트 추출
     html_text = extract_main_text_from_html(html)
 
-    # HTML → 전체 이미지 캡처
-    imgs = html_to_images_playwright(
-        crawl_link,
-        viewport_width=1200,
-        slice_height=1800,
-        debug_full_image_path=None,
-        full_image_format="png",
-    )
-    if not imgs:
-        print(f"↳ bbsidx={bbsidx}: 이미지 캡처 실패 → 스킵")
-        return "skipped_error"
+    # 다른 게시판에 거의 같은 공지가 이미 있으면 캡처/요약(Playwright + LLM) 생략, canonical 요약 재사용
+    sig, dup, summary = dedup_check("COLLEGE_NATURAL_SCIENCES", post_number, html_text, title)
+    reused = summary is not None
+    if reused:
+        print(f"↳ bbsidx={bbsidx}: {dup.canonical[0]}#{dup.canonical[1]} 와 중복 (유사도 {dup.similarity:.2f}) → 요약 재사용")
+    else:
+        if dup:
+            print(f"↳ bbsidx={bbsidx}: {dup.canonical[0]}#{dup.canonical[1]} 와 유사 (유사도 {dup.similarity:.2f}) → 연결만 하고 새로 요약")
+        # HTML → 전체 이미지 캡처
+        # 캐시에 있는 포스터/배너는 텍스트로 대체하고 캡처에서 제외
+        img_texts, hide_srcs = describe_content_images(html, crawl_link)
+        # 첨부파일(PDF/HWP/DOCX) 텍스트
+        att_text = collect_attachment_text("COLLEGE_NATURAL_SCIENCES", post_number, html, crawl_link)
+        imgs = html_to_images_playwright(
+            crawl_link,
+            hide_srcs=hide_srcs,
+            viewport_width=1200,
+            slice_height=1800,
+            debug_full_image_path=None,
+            full_image_format="png",
+        )
+        if not imgs:
+            print(f"↳ bbsidx={bbsidx}: 이미지 캡처 실패 → 스킵")
+            return "skipped_error"
 
-    # 텍스트 + 이미지 동시 요약
-    summary = summarize_with_text_and_images(html_text, imgs)
-    if not summary:
-        print(f"↳ bbsidx={bbsidx}: 텍스트+이미지 요약 실패 → 스킵")
-        return "skipped_error"
+        # 텍스트 + 이미지 동시 요약
+        summary = summarize_with_text_and_images(html_text, imgs, img_texts, att_text)
+        if not summary:
+            print(f"↳ bbsidx={bbsidx}: 텍스트+이미지 요약 실패 → 스킵")
+            return "skipped_error"
 
-    print(summary)
+        print(summary)
     
     # DB 업서트
     row = {
@@ -928,8 +1316,9 @@ def process_one_lifesci(bbsidx: int) -> str:
     }
     try:
         upsert_notice(row)
+        dedup_record(row["category"], post_number, sig, posted_date, dup)
         print(f"✅ 저장 완료: [생명과학과] bbsidx={bbsidx}, post_number={post_number}, title={title[:50]}, link={db_link}, posted_date={posted_date}, viewcount={view_count}, department={department}")
-        return "stored"
+        return "duplicate" if reused else "stored"
     except MySQLError as e:
         print(f"❌ DB 저장 실패: {e.__class__.__name__}: {e}")
         traceback.print_exc(limit=3, file=sys.stdout)
@@ -938,23 +1327,23 @@ def process_one_lifesci(bbsidx: int) -> str:
 # =========================
 # 9) 실행부
 # =========================
+PORTAL_TARGETS = [
+    "GENERAL",
+    "ACADEMIC",
+    "COLLEGE_ENGINEERING",
+    "COLLEGE_HUMANITIES",
+    "COLLEGE_SOCIAL_SCIENCES",
+    "COLLEGE_URBAN_SCIENCE",
+    "COLLEGE_ARTS_SPORTS",
+    "COLLEGE_BUSINESS",
+    "COLLEGE_NATURAL_SCIENCES",
+    "COLLEGE_LIBERAL_CONVERGENCE"
+]
+
 def main() -> int:
     print(f"Screenshot directory: {OUT_DIR}")
 
-    targets = [
-        "GENERAL",
-        "ACADEMIC",
-        "COLLEGE_ENGINEERING",
-        "COLLEGE_HUMANITIES",
-        "COLLEGE_SOCIAL_SCIENCES",
-        "COLLEGE_URBAN_SCIENCE",
-        "COLLEGE_ARTS_SPORTS",
-        "COLLEGE_BUSINESS",
-        "COLLEGE_NATURAL_SCIENCES",
-        "COLLEGE_LIBERAL_CONVERGENCE"
-    ]
-
-    for cat in targets:
+    for cat in PORTAL_TARGETS:
         list_id = CATEGORIES.get(cat)
         if not list_id or "TODO" in list_id.lower():
             print(f"⏭️  {cat}: list_id 미설정 → 건너뜀")
@@ -968,27 +1357,114 @@ def main() -> int:
 
         print(f"==== [{cat}] list_id={list_id}, {len(seqs)}개 수집됨 (목록 노출 항목만) ====")
         for seq in reversed(seqs):
-            process_one(cat, list_id, seq)
+            count(f"crawler.{process_one(cat, list_id, seq)}")
             time.sleep(REQUEST_SLEEP)
+        checkpoint(cat)
 
     # # 🔹 화학공학과 공지 처리
     seqs = collect_recent_seqs_cheme(limit=100)
     
     print(f"==== [화학공학과] {len(seqs)}개 수집됨 ====", flush=True)
     for wr_id in reversed(seqs):
-        process_one_cheme(wr_id)
+        count(f"crawler.{process_one_cheme(wr_id)}")
         time.sleep(REQUEST_SLEEP)
+    checkpoint("CHEME")
 
     # 🔹 생명과학과 공지 처리
     seqs = collect_recent_seqs_lifesci(limit=100)
     
     print(f"==== [생명과학과] {len(seqs)}개 수집됨 ====", flush=True)
     for wr_id in reversed(seqs):
-        process_one_lifesci(wr_id)
+        count(f"crawler.{process_one_lifesci(wr_id)}")
         time.sleep(REQUEST_SLEEP)
+    checkpoint("LIFESCI")
 
     return 0
 
+# =========================
+# 10) 작업 큐 모드 (crawl_job 테이블 — 마이그레이션 009)
+#   enqueue: 목록만 훑어 작업 등록 / worker: SKIP LOCKED 로 한 건씩 가져와 처리 (여러 프로세스 동시 실행 가능)
+# =========================
+
+# 처리 결과 → 완료 여부 (skipped_error 는 재시도 대상)
+DONE_RESULTS = {"stored", "duplicate", "not_found"}
+
+def enqueue_recent(retry_failed: bool = False) -> int:
+    """main()과 같은 범위(게시판별 최근 목록)를 crawl_job 에 등록"""
+    jobs = []
+    for cat in PORTAL_TARGETS:
+        list_id = CATEGORIES.get(cat)
+        if not list_id or "TODO" in list_id.lower():
+            continue
+        seqs = collect_recent_seqs(list_id, extra_params=None, limit=RECENT_WINDOW, max_pages=10)
+        jobs += [("portal", cat, list_id, seq) for seq in reversed(seqs)]
+        print(f"[queue] {cat}: {len(seqs)}")
+    jobs += [("cheme", "COLLEGE_ENGINEERING", None, w) for w in reversed(collect_recent_seqs_cheme(limit=100))]
+    jobs += [("lifesci", "COLLEGE_NATURAL_SCIENCES", None, b) for b in reversed(collect_recent_seqs_lifesci(limit=100))]
+    with mysql_conn() as conn:
+        cur = conn.cursor()
+        job_queue.enqueue(cur, jobs, retry_failed=retry_failed)
+        counts = job_queue.status_counts(cur)
+        cur.close()
+    count("crawler.enqueued", len(jobs))
+    print(f"[queue] enqueued {len(jobs)} items → {counts}")
+    return len(jobs)
+
+def process_job(job: job_queue.Job) -> str:
+    if job.source == "portal":
+        return process_one(job.category, job.list_id, job.item_id)
+    if job.source == "cheme":
+        return process_one_cheme(job.item_id)
+    if job.source == "lifesci":
+        return process_one_lifesci(job.item_id)
+    raise ValueError(f"unknown job source: {job.source}")
+
+def run_worker(max_jobs: Optional[int] = None, idle_exit: bool = True, poll_sec: float = 10.0) -> int:
+    """
+    큐에서 한 건씩 임대해 처리. 예외/skipped_error 는 지수 백오프로 재시도, 한도 초과 시 failed.
+    idle_exit=False 면 큐가 비어도 poll_sec 간격으로 계속 대기.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        with mysql_conn() as conn:   # 커밋 시점에 행 잠금 해제
+            cur = conn.cursor()
+            jobs = job_queue.claim(cur, owner, limit=1)
+            due = 0 if jobs else job_queue.due_count(cur)
+            cur.close()
+        if not jobs:
+            # SKIP LOCKED 로 빈 결과가 나와도 다른 워커가 잠깐 잡고 있는 행일 수 있음 → 실행 가능한 행이 0 일 때만 종료
+            if idle_exit and not due:
+                break
+            time.sleep(poll_sec if not due else REQUEST_SLEEP)
+            continue
+        job = jobs[0]
+        print(f"[worker {owner}] job#{job.id} {job.source}/{job.category}/{job.item_id} (attempt {job.attempts})")
+        error = ""
+        try:
+            result = process_job(job)
+        except Exception as e:
+            result, error = "exception", f"{type(e).__name__}: {e}"
+            traceback.print_exc(limit=3, file=sys.stdout)
+        count(f"crawler.{result}")
+        with mysql_conn() as conn:
+            cur = conn.cursor()
+            if result in DONE_RESULTS:
+                if not job_queue.complete(cur, job, owner, result):
+                    print(f"[worker {owner}] job#{job.id} lease lost (taken over after expiry)")
+            else:
+                state = job_queue.fail(cur, job, owner, result, error)
+                if state is None:
+                    print(f"[worker {owner}] job#{job.id} lease lost (taken over after expiry)")
+                else:
+                    count(f"crawler.job_{state}")
+                    print(f"[worker {owner}] job#{job.id} {result} → {state}")
+            cur.close()
+        done += 1
+        time.sleep(REQUEST_SLEEP)
+    print(f"[worker {owner}] processed {done} jobs")
+    return done
+
 if __name__ == "__main__":
     try:
         main()
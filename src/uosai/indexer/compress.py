@@ -0,0 +1,78 @@
+# src/uosai/indexer/compress.py : 청크 벡터 압축 단계 (PCA 학습/저장 + int8 양자화 평가)
+#
+#   python scripts/run_compress.py --pca 128,256             # notice_chunk 전체로 평가 리포트
+#   python scripts/run_compress.py --pca 256 --save          # models/pca_256.npz 저장 → VECTOR_PCA_DIM=256 으로 인덱싱
+#   python scripts/run_compress.py --queries data/bench/retrieval_queries.json   # 실제 질의로 recall 측정
+#
+# 리포트: 설정별 벡터 메모리(바이트, float32 대비 절감률)와 float32 정확 검색 대비 recall@k (재점수 전/후)
+import os, sys, json, argparse, traceback
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+from uosai.common.utils import EMBED_MODEL, load_chunk_matrix, get_embedding_instance
+from uosai.common.quantize import VECTOR_PCA_PATH, VECTOR_RESCORE_FACTOR, PCAReducer, evaluate, write_report
+from uosai.common.metrics import report_path
+
+HOLDOUT_QUERIES = int(os.getenv("COMPRESS_HOLDOUT", "200"))   # 질의셋이 없을 때 코퍼스에서 떼어 낼 질의 수
+
+def log(msg: str) -> None:
+    print(f"[compress {datetime.now():%Y-%m-%d %H:%M:%S}] {msg}")
+
+
+def query_vectors(X: np.ndarray, path: Optional[str], seed: int = 0):
+    """(코퍼스, 질의). 질의 파일이 없으면 청크 일부를 떼어 질의로 사용"""
+    if path:
+        spec = json.loads(open(path, encoding="utf-8").read())
+        texts = [q["query"] for q in spec["queries"]]
+        Q = np.asarray(get_embedding_instance().embed_documents(texts), dtype=np.float32)
+        return X, Q
+    rng = np.random.default_rng(seed)
+    idx = rng.permutation(len(X))
+    n = min(HOLDOUT_QUERIES, len(X) // 10)
+    return X[idx[n:]], X[idx[:n]]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Evaluate/fit vector compression (int8, PCA) on stored chunk vectors")
+    ap.add_argument("--pca", default="", help="PCA 차원 목록, 예: 128,256")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--rescore-factor", type=int, default=VECTOR_RESCORE_FACTOR)
+    ap.add_argument("--queries", help="라벨 질의셋 JSON (없으면 홀드아웃 청크)")
+    ap.add_argument("--save", action="store_true", help="--pca 의 각 차원을 VECTOR_PCA_PATH 에 저장")
+    args = ap.parse_args(argv)
+    dims = [int(d) for d in args.pca.split(",") if d.strip()]
+
+    try:
+        keys, X = load_chunk_matrix(EMBED_MODEL)
+        if len(X) < 20:
+            log(f"not enough stored chunk vectors for {EMBED_MODEL}: {len(X)} (run the indexer first)")
+            return 1
+        corpus, Q = query_vectors(X, args.queries)
+        log(f"chunks={len(X)} dim={X.shape[1]} corpus={len(corpus)} queries={len(Q)} k={args.k}")
+
+        rows = evaluate(corpus, Q, args.k, dims, args.rescore_factor)
+        for r in rows:
+            rescored = f"{r['recall_rescored']:.3f}" if r["recall_rescored"] is not None else "  -  "
+            log(f"{r['config']:<16} dim={r['dim']:<4} mem={r['bytes'] / 2**20:8.1f}MB (-{r['saved_pct']:4.1f}%) "
+                f"recall@{args.k}={r['recall']:.3f} rescored={rescored}")
+        path = report_path("compress")
+        write_report(rows, path)
+        log(f"report → {path}")
+
+        if args.save:
+            for d in dims:
+                reducer = PCAReducer.fit(X, d, embed_model=EMBED_MODEL)
+                out = VECTOR_PCA_PATH.format(dim=d)
+                reducer.save(out)
+                log(f"PCA {X.shape[1]}→{d} (explained={reducer.explained:.3f}) → {out}")
+        return 0
+    except Exception as e:
+        log(f"ERROR: {type(e).__name__}: {e}")
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,12 @@ import os, sys, time, traceback
 from datetime import datetime
 
 # 공통 유틸
-from uosai.common.utils import fetch_all_rows, row_to_doc, split_docs, upsert_docs
+from uosai.common.utils import (
+    fetch_all_rows, collapse_duplicates, merge_attachments, row_to_doc, split_docs, upsert_docs, trim_chunk_vectors,
+    mark_notices_indexed,
+)
+from uosai.common.metrics import stage, count
+from uosai.common.profiling import checkpoint
 
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "200"))
 BATCH_SLEEP_SEC = float(os.getenv("BATCH_SLEEP_SEC", "0.8"))  # 레이트리밋 대응
@@ -14,12 +19,18 @@ def log(msg: str) -> None:
 def main() -> int:
     log("Full rebuild start")
     rows = fetch_all_rows()
+    checkpoint("fetch_all_rows")
     if not rows:
         log("No rows found")
         return 0
 
-    docs = split_docs([row_to_doc(r) for r in rows])
+    # 게시판 간 중복 공지는 canonical 하나만 임베딩 (출처 링크는 메타데이터로)
+    with stage("indexer.collapse_duplicates"):
+        unique_rows = collapse_duplicates(rows)
+    count("indexer.duplicate_notices", len(rows) - len(unique_rows))
+    docs = split_docs([row_to_doc(r) for r in merge_attachments(unique_rows)])
     log(f"Rows={len(rows)} → Chunks={len(docs)}")
+    checkpoint("split_docs")
 
     total = 0
     for i in range(0, len(docs), BATCH_SIZE):
@@ -32,6 +43,18 @@ def main() -> int:
             time.sleep(BATCH_SLEEP_SEC)
 
     log(f"Full rebuild done: chunks={total}")
+    checkpoint("upsert_docs")
+
+    # 짧아진 공지의 뒤쪽 청크 벡터 정리 (배치가 아니라 전체 split 결과 기준)
+    log(f"Trimmed stale chunk vectors: {trim_chunk_vectors(docs)}")
+
+    # 새로 생기거나 바뀐 공지 기록 → 챗봇 답변 캐시가 폴링해서 무효화
+    with stage("indexer.mark_notices_indexed"):
+        changed = mark_notices_indexed(unique_rows)
+    count("indexer.notices", len(rows))
+    count("indexer.chunks", total)
+    count("indexer.changed_notices", len(changed))
+    log(f"Changed notices since last index: {len(changed)}")
     return total
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+# src/uosai/indexer/reconcile.py : MySQL ↔ Pinecone 드리프트 정리 (전체 재구축 없이 차이만 반영)
+#
+#   python scripts/run_reconcile.py              # 차이 계산 후 삭제/업서트
+#   python scripts/run_reconcile.py --dry-run    # 차이만 출력
+#
+# 기대 상태: MySQL 공지 → row_to_doc → split_docs → chunk_id (내용 주소 ID)
+# 실제 상태: 네임스페이스의 벡터 ID를 페이지 단위로 나열
+# 기대에 없는 ID는 삭제, 실제에 없는 청크만 임베딩(notice_chunk 재사용)+업서트.
+# 예전 위치 기반 ID({category}_{post_number}_{i})는 첫 실행에서 모두 교체된다.
+import os, sys, time, argparse, traceback
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+
+from langchain.schema import Document
+
+from uosai.common.utils import (
+    PINECONE_API_KEY, PINECONE_INDEX, PINECONE_NS,
+    fetch_all_rows, collapse_duplicates, merge_attachments, row_to_doc, split_docs, chunk_id, upsert_docs,
+    trim_chunk_vectors,
+)
+
+LIST_PAGE_SIZE   = int(os.getenv("RECONCILE_PAGE_SIZE", "100"))   # list_paginated 최대 100
+DELETE_BATCH     = int(os.getenv("RECONCILE_DELETE_BATCH", "1000"))  # delete 요청당 ID 상한
+UPSERT_BATCH     = int(os.getenv("BATCH_SIZE", "200"))
+
+def log(msg: str) -> None:
+    print(f"[reconcile {datetime.now():%Y-%m-%d %H:%M:%S}] {msg}")
+
+
+def iter_vector_ids(index, namespace: Optional[str], prefix: Optional[str] = None) -> Iterator[List[str]]:
+    """네임스페이스의 벡터 ID를 페이지 단위로 (값/메타데이터는 가져오지 않음)"""
+    token = None
+    while True:
+        kwargs = {"limit": LIST_PAGE_SIZE, "namespace": namespace or ""}
+        if prefix:
+            kwargs["prefix"] = prefix
+        if token:
+            kwargs["pagination_token"] = token
+        page = index.list_paginated(**kwargs)
+        ids = [v.id for v in (page.vectors or [])]
+        if ids:
+            yield ids
+        token = page.pagination.next if page.pagination else None
+        if not token:
+            break
+
+
+def expected_chunks() -> Dict[str, Document]:
+    rows = fetch_all_rows()
+    docs = split_docs([row_to_doc(r) for r in merge_attachments(collapse_duplicates(rows))])
+    out: Dict[str, Document] = {}
+    for d in docs:
+        out.setdefault(chunk_id(d), d)
+    log(f"MySQL: notices={len(rows)} chunks={len(out)}")
+    return out
+
+
+def reconcile(namespace: Optional[str] = PINECONE_NS, dry_run: bool = False) -> Dict[str, int]:
+    if not PINECONE_API_KEY:
+        raise RuntimeError("PINECONE_API_KEY missing")
+    from pinecone import Pinecone
+    index = Pinecone(api_key=PINECONE_API_KEY).Index(PINECONE_INDEX)
+
+    expected = expected_chunks()
+    actual: Set[str] = set()
+    for page in iter_vector_ids(index, namespace):
+        actual.update(page)
+    log(f"Pinecone: namespace={namespace or '__default__'} vectors={len(actual)}")
+
+    to_delete = sorted(actual - expected.keys())
+    to_add = [expected[i] for i in sorted(expected.keys() - actual)]
+    stats = {"expected": len(expected), "actual": len(actual), "delete": len(to_delete), "upsert": len(to_add)}
+    log(f"diff: {stats}")
+    if dry_run:
+        for i in to_delete[:10]:
+            log(f"  - {i}")
+        for d in to_add[:10]:
+            log(f"  + {chunk_id(d)} {d.metadata.get('title', '')[:40]}")
+        return stats
+
+    t0 = time.perf_counter()
+    for i in range(0, len(to_delete), DELETE_BATCH):
+        index.delete(ids=to_delete[i:i + DELETE_BATCH], namespace=namespace or "")
+    for i in range(0, len(to_add), UPSERT_BATCH):
+        upsert_docs(to_add[i:i + UPSERT_BATCH], namespace=namespace)
+    trim_chunk_vectors(list(expected.values()))
+    log(f"applied in {time.perf_counter() - t0:.1f}s")
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Reconcile Pinecone vectors with MySQL notices")
+    ap.add_argument("--namespace", default=PINECONE_NS, help="기본: PINECONE_NAMESPACE")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args(argv)
+    try:
+        reconcile(args.namespace, args.dry_run)
+        return 0
+    except Exception as e:
+        log(f"ERROR: {type(e).__name__}: {e}")
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# src/uosai/preprocess/abbrev.py : 캠퍼스 줄임말/은어 확장 (Aho-Corasick 트라이)
+#
+# 사전: data/abbreviations.tsv (data/make_tsv.py 로 생성/검증)
+# "컴공 졸업요건" → "컴공(컴퓨터과학부) 졸업요건"
+# 원문은 남기고 정식 명칭을 덧붙이므로 오탐이어도 검색어가 망가지지 않는다.
+# 사전 크기와 무관하게 질의 길이에 선형 → 요청 지연에 영향 없음.
+import os, re
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+ABBREV_PATH = os.getenv(
+    "ABBREV_PATH",
+    os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "data", "abbreviations.tsv")),
+)
+
+# 줄임말 뒤에 붙어도 같은 단어로 보는 꼬리 (컴공과, 공대생, 중도에서 …)
+_SUFFIX = re.compile(r"(?:과|생|생들)?(?:은|는|이|가|을|를|에|에서|으로|로|의|도|만|까지|부터|이야|야|요|랑|이랑|하고)?")
+
+
+def _is_hangul(ch: str) -> bool:
+    return "가" <= ch <= "힣"
+
+
+class Match(NamedTuple):
+    start: int
+    end: int          # 줄임말 끝
+    word_end: int     # 꼬리(조사 등)까지 포함한 어절 끝
+    abbr: str
+    canonical: str
+    kind: str
+
+
+class AbbreviationExpander:
+    """줄임말 사전을 Aho-Corasick 오토마톤으로 컴파일해 한 번의 스캔으로 모든 후보를 찾는다"""
+
+    def __init__(self, entries: List[Tuple[str, str, str]]):
+        self.entries: Dict[str, Tuple[str, str]] = {a: (c, k) for a, c, k in entries}
+        # goto / fail / output
+        self._next: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for abbr in self.entries:
+            node = 0
+            for ch in abbr:
+                nxt = self._next[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._next)
+                    self._next[node][ch] = nxt
+                    self._next.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(abbr)
+        queue = deque(self._next[0].values())   # 깊이 1 노드의 fail 은 루트
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._next[node].items():
+                f = self._fail[node]
+                while f and ch not in self._next[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._next[f].get(ch, 0)
+                self._out[child] += self._out[self._fail[child]]
+                queue.append(child)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _scan(self, text: str):
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._next[node]:
+                node = self._fail[node]
+            node = self._next[node].get(ch, 0)
+            for abbr in self._out[node]:
+                yield i + 1 - len(abbr), i + 1, abbr
+
+    def matches(self, text: str) -> List[Match]:
+        """어절 경계에 맞는 매치만, 겹치면 먼저 시작하는 것 → 긴 것 우선"""
+        found = []
+        for start, end, abbr in self._scan(text):
+            if start > 0 and _is_hangul(text[start - 1]):
+                continue                       # '확인지' 안의 '인지' 등
+            word_end = end
+            while word_end < len(text) and _is_hangul(text[word_end]):
+                word_end += 1
+            if _SUFFIX.fullmatch(text, end, word_end) is None:
+                continue                       # '영문학' 안의 '영문' 등
+            canon, kind = self.entries[abbr]
+            found.append(Match(start, end, word_end, abbr, canon, kind))
+
+        found.sort(key=lambda m: (m.start, -(m.end - m.start)))
+        out: List[Match] = []
+        for m in found:
+            if not out or m.start >= out[-1].word_end:
+                out.append(m)
+        return out
+
+    def expand(self, text: str) -> str:
+        """각 줄임말 어절 뒤에 '(정식 명칭)'을 덧붙인 문자열 (이미 붙어 있으면 그대로)"""
+        parts, pos = [], 0
+        for m in self.matches(text):
+            if text.startswith(f"({m.canonical})", m.word_end):
+                continue
+            parts += [text[pos:m.word_end], f"({m.canonical})"]
+            pos = m.word_end
+        parts.append(text[pos:])
+        return "".join(parts)
+
+
+def load_abbreviations(path: str = ABBREV_PATH) -> List[Tuple[str, str, str]]:
+    """abbreviations.tsv → [(줄임말, 정식 명칭, 종류)], 파일이 없으면 빈 목록"""
+    if not os.path.exists(path):
+        print(f"[Abbrev] dictionary not found: {path} (python data/make_tsv.py 로 생성)")
+        return []
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        next(f, None)   # header
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) == 3 and all(cols):
+                rows.append((cols[0], cols[1], cols[2]))
+    return rows
+
+
+_expander: Optional[AbbreviationExpander] = None
+
+def get_expander() -> AbbreviationExpander:
+    global _expander
+    if _expander is None:
+        _expander = AbbreviationExpander(load_abbreviations())
+    return _expander
+
+def expand_query(text: str) -> str:
+    return get_expander().expand(text)
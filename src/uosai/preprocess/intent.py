@@ -0,0 +1,59 @@
+# src/uosai/preprocess/intent.py : 공지 질문 vs 일반 대화 라우팅 (문장 임베딩 위 선형 분류기)
+#
+# 학습: PYTHONPATH=src python -m uosai.train.train_intent --from-db  → models/intent_linear.npz
+# 쿼리 임베딩(캐시/검색과 공유)에 내적 한 번이면 되므로 라우팅 비용은 수 μs.
+import os
+from typing import Optional
+
+import numpy as np
+
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", "models/intent_linear.npz")
+INTENT_LOW  = float(os.getenv("INTENT_LOW", "0.2"))   # p ≤ LOW  → 일반 대화 확정
+INTENT_HIGH = float(os.getenv("INTENT_HIGH", "0.8"))  # p ≥ HIGH → 공지 질문 확정 (그 사이는 LLM 판단)
+
+
+class IntentClassifier:
+    """p(공지 관련 | 질의 임베딩) = sigmoid(w·x + b), x는 L2 정규화된 임베딩"""
+
+    def __init__(self, w: np.ndarray, b: float, embed_model: str = "",
+                 low: float = INTENT_LOW, high: float = INTENT_HIGH):
+        self.w = np.asarray(w, dtype=np.float32)
+        self.b = float(b)
+        self.embed_model = embed_model
+        self.low = low
+        self.high = high
+
+    @classmethod
+    def load(cls, path: str = INTENT_MODEL_PATH) -> "IntentClassifier":
+        z = np.load(path, allow_pickle=False)
+        return cls(z["w"], float(z["b"]), str(z["embed_model"]))
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, w=self.w, b=np.float32(self.b), embed_model=np.str_(self.embed_model))
+
+    def predict_proba(self, vec) -> float:
+        x = np.asarray(vec, dtype=np.float32)
+        n = float(np.sqrt(x @ x))
+        z = float(self.w @ x) / n + self.b if n > 0 else self.b
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def route(self, vec) -> Optional[bool]:
+        """True=공지 질문, False=일반 대화, None=애매함(LLM에 맡김)"""
+        p = self.predict_proba(vec)
+        if p >= self.high:
+            return True
+        if p <= self.low:
+            return False
+        return None
+
+
+def load_intent_classifier(path: str = INTENT_MODEL_PATH, embed_model: str = "") -> Optional[IntentClassifier]:
+    """학습된 모델이 없거나 임베딩 모델이 다르면 None (라우팅은 규칙/LLM으로)"""
+    if not os.path.exists(path):
+        return None
+    clf = IntentClassifier.load(path)
+    if embed_model and clf.embed_model and clf.embed_model != embed_model:
+        print(f"[Intent] model trained on {clf.embed_model}, current {embed_model} → disabled")
+        return None
+    return clf
@@ -0,0 +1,263 @@
+# src/uosai/preprocess/prepare_dataset.py : AIHUB 코퍼스 → Parquet (data/data_to_csv.ipynb 대체)
+#
+#   PYTHONPATH=src python -m uosai.preprocess.prepare_dataset dialogue "/data/AIHUB/용도별 목적 대화 데이터" \
+#       -o "data/processed/용도별 목적 대화 데이터.parquet"
+#   PYTHONPATH=src python -m uosai.preprocess.prepare_dataset squad "/data/AIHUB/일반 상식/ko_wiki_v1_squad.json" \
+#       -o "data/processed/일반 상식.parquet"
+#
+# - 파일 단위로 워커 프로세스에서 파싱, 파서는 제너레이터라 워커는 DATASET_BATCH 행씩 잘라 보냄
+#   결과 큐는 크기 제한(워커 수 × 2 배치)이라 기록이 밀리면 워커가 기다림 → 메모리 상한 ≈ 큐 + row group
+# - JSON은 ijson으로 점진 파싱 (수 GB 단일 파일도 통째로 올리지 않음, 없으면 json.load)
+# - 중복 제거는 고정 크기 Bloom 필터 (DATASET_DEDUP_CAPACITY 행 기준 오탐 ~0.1% → 드물게 새 행도 중복으로 버림)
+# - row group 단위로 Parquet에 바로 기록
+# 필요 패키지: pyarrow, ijson
+import os, sys, re, json, math, hashlib, argparse, time, threading
+from multiprocessing import Process, Queue
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+ROW_GROUP       = int(os.getenv("DATASET_ROW_GROUP", "50000"))
+BATCH           = int(os.getenv("DATASET_BATCH", "5000"))                # 워커 → 기록 프로세스 한 번에 보내는 행 수
+DEDUP_CAPACITY  = int(os.getenv("DATASET_DEDUP_CAPACITY", "20000000"))    # Bloom 필터 크기 기준 (≈ 36MB)
+DEDUP_FP_RATE   = float(os.getenv("DATASET_DEDUP_FP_RATE", "0.001"))
+
+# 발화 앞의 화자 표시 제거: "A. 안녕", "1 : 안녕"
+_SPEAKER = re.compile(r"^\s*(?:[A-Za-z]\s*[.:]|\d+\s*:)\s*")
+
+def log(msg: str) -> None:
+    print(f"[prepare_dataset] {msg}", flush=True)
+
+
+# ===== JSON 스트리밍 =====
+def _iter_items(path: str, prefix: str):
+    """prefix 경로의 원소를 하나씩 (ijson 없으면 전체 로드 후 같은 경로를 따라감)"""
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+    with open(path, "rb") as f:
+        if ijson is not None:
+            yield from ijson.items(f, prefix)
+            return
+        node = json.load(f)
+    keys = prefix.split(".")
+    def walk(obj, i):
+        if i == len(keys):
+            yield obj
+        elif keys[i] == "item":
+            for x in obj if isinstance(obj, list) else []:
+                yield from walk(x, i + 1)
+        elif isinstance(obj, dict) and keys[i] in obj:
+            yield from walk(obj[keys[i]], i + 1)
+    yield from walk(node, 0)
+
+
+# ===== 코퍼스별 파서 (워커 프로세스에서 실행) =====
+def parse_dialogue(path: str) -> Iterator[Dict[str, str]]:
+    """info[].annotations.lines[].norm_text|text → {text, source}"""
+    src = os.path.basename(os.path.dirname(path))
+    for line in _iter_items(path, "info.item.annotations.lines.item"):
+        text = line.get("norm_text") or line.get("text")
+        if text:
+            text = _SPEAKER.sub("", text).strip()
+            if text:
+                yield {"text": text, "source": src}
+
+
+def parse_squad(path: str) -> Iterator[Dict[str, str]]:
+    """data[].paragraphs[].qas[] → {intent, query, answer} (기존 '일반 상식.csv'와 같은 열)"""
+    for para in _iter_items(path, "data.item.paragraphs.item"):
+        for qa in para.get("qas", []):
+            answers = qa.get("answers") or [{}]
+            q = (qa.get("question") or "").strip()
+            if q:
+                yield {"intent": "일반상식", "query": q, "answer": (answers[0].get("text") or "").strip()}
+
+
+PARSERS = {
+    "dialogue": (parse_dialogue, "text"),
+    "squad": (parse_squad, "query"),
+}
+
+
+# ===== 파이프라인 =====
+def iter_json_files(src: str) -> Iterator[str]:
+    if os.path.isfile(src):
+        yield src
+        return
+    for root, dirs, files in os.walk(src):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(".json"):
+                yield os.path.join(root, name)
+
+
+def _worker(kind: str, tasks: "Queue", results: "Queue", batch: int) -> None:
+    """tasks 에서 경로를 받아 파싱, ("rows", path, [...]) 를 batch 행씩, 파일 끝에 ("file", path, 오류)"""
+    parse = PARSERS[kind][0]
+    while True:
+        path = tasks.get()
+        if path is None:
+            results.put(("exit", None, None))
+            return
+        buf: List[Dict[str, str]] = []
+        err = None
+        try:
+            for row in parse(path):
+                buf.append(row)
+                if len(buf) >= batch:
+                    results.put(("rows", path, buf))     # 큐가 차 있으면 여기서 대기 (backpressure)
+                    buf = []
+        except Exception as e:
+            err = f"{type(e).__name__}: {e}"
+        if buf:
+            results.put(("rows", path, buf))
+        results.put(("file", path, err))
+
+
+class BloomFilter:
+    """고정 크기 비트 배열 + 이중 해싱. add() 는 이미 있었을(수도 있는) 값이면 True"""
+
+    def __init__(self, capacity: int = DEDUP_CAPACITY, fp_rate: float = DEDUP_FP_RATE):
+        self.m = max(64, int(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = np.zeros((self.m + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def add(self, data: bytes) -> bool:
+        d = hashlib.blake2b(data, digest_size=16).digest()
+        h1, h2 = int.from_bytes(d[:8], "little"), int.from_bytes(d[8:], "little") | 1
+        present = True
+        for i in range(self.k):
+            b = (h1 + i * h2) % self.m
+            byte, mask = b >> 3, 1 << (b & 7)
+            if not self.bits[byte] & mask:
+                present = False
+                self.bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+
+class ParquetSink:
+    """레코드를 모아 row_group 단위로 기록, 키 열 기준 중복 제거"""
+
+    def __init__(self, path: str, key: str, row_group: int = ROW_GROUP, dedup: bool = True):
+        self.path = path
+        self.key = key
+        self.row_group = row_group
+        self.dedup = dedup
+        self.seen = BloomFilter() if dedup else None   # 크기 고정 (행 수와 무관)
+        self.buf: List[Dict[str, str]] = []
+        self.writer = None
+        self.written = 0
+        self.dropped = 0
+
+    def add(self, rows: List[Dict[str, str]]) -> None:
+        for r in rows:
+            if self.dedup:
+                norm = " ".join(r[self.key].split())
+                if self.seen.add(norm.encode("utf-8")):
+                    self.dropped += 1
+                    continue
+            self.buf.append(r)
+            if len(self.buf) >= self.row_group:
+                self.flush()
+
+    def flush(self) -> None:
+        if not self.buf:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pylist(self.buf)
+        if self.writer is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.writer = pq.ParquetWriter(self.path, table.schema, compression="zstd")
+        self.writer.write_table(table)
+        self.written += len(self.buf)
+        self.buf = []
+
+    def close(self) -> None:
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+
+def prepare(kind: str, src: str, out: str, workers: int = 0, row_group: int = ROW_GROUP,
+            dedup: bool = True, limit: Optional[int] = None, batch: int = BATCH) -> Dict[str, int]:
+    key = PARSERS[kind][1]
+    sink = ParquetSink(out, key, row_group, dedup)
+    files = errors = 0
+    t0 = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    tasks: "Queue" = Queue(maxsize=workers * 4)
+    results: "Queue" = Queue(maxsize=workers * 2)     # 동시에 떠 있는 배치 수 상한
+
+    def feed() -> None:
+        for p in iter_json_files(src):
+            tasks.put(p)
+        for _ in range(workers):
+            tasks.put(None)
+
+    procs = [Process(target=_worker, args=(kind, tasks, results, batch), daemon=True) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    threading.Thread(target=feed, daemon=True).start()
+
+    exited = 0
+    try:
+        while exited < workers:
+            msg, path, payload = results.get()
+            if msg == "exit":
+                exited += 1
+            elif msg == "rows":
+                sink.add(payload)
+                if limit and sink.written + len(sink.buf) >= limit:
+                    break
+            else:
+                files += 1
+                if payload:
+                    errors += 1
+                    log(f"skip {path}: {payload}")
+                if files % 1000 == 0:
+                    log(f"files={files} rows={sink.written + len(sink.buf)} dup={sink.dropped}")
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        sink.close()
+    stats = {"files": files, "errors": errors, "rows": sink.written, "duplicates": sink.dropped}
+    log(f"{kind}: {stats} → {out} ({time.perf_counter() - t0:.1f}s)")
+    if sink.seen is not None and sink.seen.count > DEDUP_CAPACITY:
+        log(f"warning: {sink.seen.count} unique rows > DATASET_DEDUP_CAPACITY={DEDUP_CAPACITY}, "
+            "중복 오탐률이 높아졌으니 용량을 늘려 다시 실행")
+    return stats
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Stream AIHUB JSON corpora into Parquet")
+    ap.add_argument("kind", choices=sorted(PARSERS))
+    ap.add_argument("src", help="코퍼스 디렉터리 또는 JSON 파일")
+    ap.add_argument("-o", "--out", required=True, help="출력 .parquet 경로")
+    ap.add_argument("--workers", type=int, default=0, help="프로세스 수 (기본: CPU 수)")
+    ap.add_argument("--row-group", type=int, default=ROW_GROUP)
+    ap.add_argument("--no-dedup", action="store_true")
+    ap.add_argument("--limit", type=int, help="최대 행 수 (샘플링/테스트용)")
+    ap.add_argument("--batch", type=int, default=BATCH, help="워커가 한 번에 보내는 행 수")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.src):
+        log(f"not found: {args.src}")
+        return 1
+    stats = prepare(args.kind, args.src, args.out, args.workers, args.row_group,
+                    not args.no_dedup, args.limit, args.batch)
+    return 0 if stats["rows"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
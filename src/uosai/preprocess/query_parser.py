@@ -0,0 +1,297 @@
+# src/uosai/preprocess/query_parser.py : 규칙 기반 질의 분석 (상대 날짜/학사 용어/카테고리/학과 약어)
+#
+# 챗봇의 요구사항 추출 LLM 호출 전에 돌리는 결정적 파서.
+# 결과 형식은 LLM 추출 JSON과 같고, confidence가 낮을 때만 LLM으로 넘어간다.
+import os, re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from uosai.common.categories import CATEGORY_LABELS
+from uosai.preprocess.abbrev import get_expander, load_abbreviations
+
+RULE_CONFIDENCE = float(os.getenv("RULE_CONFIDENCE", "0.7"))  # 이 이상이면 LLM 추출 생략
+
+# ===== 사전 =====
+# 게시판 이름/줄임말 → 카테고리
+CATEGORY_ALIASES: Dict[str, str] = {label: cat for cat, label in CATEGORY_LABELS.items()}
+CATEGORY_ALIASES.update({
+    "학사공지": "ACADEMIC", "학사": "ACADEMIC",
+    "일반공지": "GENERAL",
+})
+# 단과대 줄임말(공대, 자과대 …)은 줄임말 사전(data/abbreviations.tsv)에서 게시판 이름을 거쳐 매핑
+_ABBREVIATIONS = load_abbreviations()
+CATEGORY_ALIASES.update({
+    abbr: CATEGORY_ALIASES[canon]
+    for abbr, canon, kind in _ABBREVIATIONS if kind == "college" and canon in CATEGORY_ALIASES
+})
+
+# 학과 줄임말 → 정식 명칭 (같은 사전의 department 항목)
+DEPARTMENT_ALIASES: Dict[str, str] = {
+    abbr: canon for abbr, canon, kind in _ABBREVIATIONS if kind == "department"
+}
+
+# 공지 검색이 필요한 질문의 단서
+NOTICE_CUES = (
+    "공지", "안내", "신청", "접수", "마감", "기간", "일정", "모집", "선발", "발표", "제출",
+    "장학", "수강", "졸업", "휴학", "복학", "등록금", "학점", "전공", "복수전공", "부전공",
+    "성적", "시험", "기숙사", "생활관", "교환학생", "인턴", "현장실습", "채용", "특강",
+    "설명회", "행사", "대회", "공모", "학위", "계절학기", "개강", "종강", "수업", "강의",
+    "학생증", "증명서", "폐강", "정정", "포기", "대학원", "입학", "편입",
+)
+SMALLTALK_CUES = (
+    "안녕", "하이", "고마워", "감사", "ㅋㅋ", "ㅎㅎ", "뭐해", "심심", "배고파", "잘자",
+    "누구야", "이름이 뭐", "날씨", "사랑해", "반가워",
+)
+# 이전 대화를 가리키는 표현 → 히스토리가 있으면 LLM이 맥락을 해석해야 함
+CONTEXT_CUES = ("그럼", "그거", "그건", "그 공지", "거기", "아까", "저번에", "방금", "위에", "그때", "그것")
+
+AUDIENCE_CUES: Dict[str, str] = {
+    "대학원생": "대학원생", "대학원": "대학원생",
+    "신입생": "신입생", "편입생": "편입생", "재학생": "학부 재학생", "학부생": "학부 재학생",
+    "졸업예정자": "졸업예정자", "휴학생": "휴학생", "외국인": "외국인 유학생", "유학생": "외국인 유학생",
+}
+
+ACADEMIC_TERMS = (
+    "수강신청", "수강정정", "개강", "종강", "중간고사", "기말고사", "계절학기",
+    "여름방학", "겨울방학", "1학기", "2학기", "학위수여식", "졸업식", "오리엔테이션",
+)
+
+_STOPWORDS = {"알려줘", "알려주세요", "언제", "언제야", "어디", "어떻게", "뭐야", "있어", "있나요",
+              "좀", "해줘", "궁금해", "관련", "대해", "대한", "무엇", "정보", "찾아줘"}
+_JOSA = re.compile(r"(은|는|이|가|을|를|에|에서|으로|로|의|도|만|까지|부터|이야|야|요)$")
+
+RECENT_WORDS = ("최근", "요즘", "요새", "최신", "새로 올라온", "방금 올라온")
+
+
+# ===== 날짜 계산 =====
+def _month_range(y: int, m: int) -> Tuple[date, date]:
+    start = date(y, m, 1)
+    nxt = date(y + (m == 12), m % 12 + 1, 1)
+    return start, nxt - timedelta(days=1)
+
+def _add_months(d: date, n: int) -> date:
+    idx = d.year * 12 + (d.month - 1) + n
+    return date(idx // 12, idx % 12 + 1, 1)
+
+def _event_month(y: int, m: int) -> Tuple[date, date]:
+    """'3월 수강신청'처럼 월을 말하면 그 달 일정 공지 → 한 달 앞부터 게시된 공지까지 포함"""
+    start, end = _month_range(y, m)
+    return _add_months(start, -1), end
+
+def _week_range(d: date) -> Tuple[date, date]:
+    start = d - timedelta(days=d.weekday())
+    return start, start + timedelta(days=6)
+
+# 학기 공지 게시 구간: 수강신청/등록 안내가 학기 시작 두세 달 전부터 올라오므로 달력 반기보다 앞당긴다
+# 1학기 = 전년 11월 ~ 6월, 2학기 = 5월 ~ 12월 (겹치는 5~6월은 양쪽에 포함)
+def _semester_window(y: int, n: int) -> Tuple[date, date]:
+    return (date(y - 1, 11, 1), date(y, 6, 30)) if n == 1 else (date(y, 5, 1), date(y, 12, 31))
+
+def _current_semester(d: date, offset: int = 0) -> Tuple[int, int]:
+    """d 가 속한 학기 (1~6월 → 1학기, 7~12월 → 2학기) 에서 offset 학기 이동 → (연도, 학기)"""
+    y, h = divmod(d.year * 2 + (0 if d.month <= 6 else 1) + offset, 2)
+    return y, h + 1
+
+def _semester_year(today: date, n: int) -> int:
+    """연도 없이 'N학기' → 게시 구간이 이미 시작된 가장 최근 학기의 연도"""
+    y = today.year
+    return y + 1 if _semester_window(y + 1, n)[0] <= today else (y if _semester_window(y, n)[0] <= today else y - 1)
+
+# 방학/계절학기 공지 구간: 여름 = 4~8월, 겨울 = 10월 ~ 이듬해 2월
+def _vacation_window(y: int, season: str) -> Tuple[date, date]:
+    if season == "여름":
+        return date(y, 4, 1), date(y, 8, 31)
+    return date(y, 10, 1), _month_range(y + 1, 2)[1]
+
+def _vacation_year(today: date, season: str) -> int:
+    y = today.year
+    return y if _vacation_window(y, season)[0] <= today else y - 1
+
+def _season_of(today: date) -> str:
+    """'계절학기'만 말하면 가까운 쪽 (3~8월 여름, 나머지 겨울)"""
+    return "여름" if 3 <= today.month <= 8 else "겨울"
+
+def _ago(today: date, n: int, unit: str) -> date:
+    if unit == "일":
+        return today - timedelta(days=n)
+    if unit == "주":
+        return today - timedelta(weeks=n)
+    if unit in ("개월", "달"):
+        return _add_months(today, -n).replace(day=min(today.day, 28))
+    return today.replace(year=today.year - n, day=min(today.day, 28))
+
+
+# (패턴, 처리 함수) — 위에서부터 먼저 매칭된 구간은 제거하고 다음 패턴을 적용
+# 결과는 공지 게시일(posted_date) 범위. 'M월 D일'처럼 특정 일자는 행사 날짜인 경우가 많아 필터로 쓰지 않고 검색어에 남긴다.
+def _date_rules(today: date):
+    y = today.year
+    prev_month = _add_months(today, -1)
+    return [
+        (r"(\d{4})\s*년도?\s*([12])\s*학기", lambda m: _semester_window(int(m[1]), int(m[2]))),
+        (r"(\d{4})\s*년도?\s*(여름|겨울)\s*(?:방학|계절학기|계절)",
+         lambda m: _vacation_window(int(m[1]), m[2])),
+        (r"(\d{4})\s*년\s*(\d{1,2})\s*월(?!\s*\d)", lambda m: _event_month(int(m[1]), int(m[2]))),
+        (r"(\d{4})\s*년(?![도\s]*\d)", lambda m: (date(int(m[1]), 1, 1), date(int(m[1]), 12, 31))),
+        (r"(?<![\d학])(\d{1,2})\s*월(?!\s*\d)", lambda m: _event_month(y, int(m[1]))),
+        (r"(?:최근|지난)\s*(\d+)\s*(일|주|개월|달|년)", lambda m: (_ago(today, int(m[1]), m[2]), today)),
+        (r"(\d+)\s*(일|주|개월|달|년)\s*(?:전부터|전|이내|동안)", lambda m: (_ago(today, int(m[1]), m[2]), today)),
+        (r"오늘", lambda m: (today, today)),
+        (r"어제", lambda m: (today - timedelta(days=1),) * 2),
+        (r"그저께|그제", lambda m: (today - timedelta(days=2),) * 2),
+        (r"이번\s*주|금주", lambda m: _week_range(today)),
+        (r"(?:지난|저번)\s*주", lambda m: _week_range(today - timedelta(weeks=1))),
+        (r"이번\s*달|이달", lambda m: _month_range(y, today.month)),
+        (r"(?:지난|저번)\s*달", lambda m: _month_range(prev_month.year, prev_month.month)),
+        (r"이번\s*학기", lambda m: _semester_window(*_current_semester(today))),
+        (r"(?:지난|저번)\s*학기", lambda m: _semester_window(*_current_semester(today, -1))),
+        (r"(?<![\d번난])([12])\s*학기", lambda m: _semester_window(_semester_year(today, int(m[1])), int(m[1]))),
+        (r"(여름|겨울)\s*(?:방학|계절학기|계절)", lambda m: _vacation_window(_vacation_year(today, m[1]), m[1])),
+        (r"계절\s*학기", lambda m: _vacation_window(_vacation_year(today, _season_of(today)), _season_of(today))),
+        (r"올해|금년|이번\s*년도", lambda m: (date(y, 1, 1), today)),
+        (r"작년|지난\s*해|전년도?", lambda m: (date(y - 1, 1, 1), date(y - 1, 12, 31))),
+    ]
+
+# 앞으로의 일정(다음 주/다음 달/다음 학기)은 이미 게시된 최신 공지에 있으므로 recent로 처리
+_FUTURE = re.compile(r"다음\s*(?:주|달|학기)|다가오는|곧")
+
+
+def parse_dates(text: str, today: Optional[date] = None) -> Dict[str, Any]:
+    """상대/절대 날짜 표현 → {date_from, date_to, recent, spans}"""
+    today = today or date.today()
+    out: Dict[str, Any] = {"date_from": None, "date_to": None, "recent": False, "spans": []}
+    rest = text
+    ranges: List[Tuple[date, date]] = []
+    for pat, fn in _date_rules(today):
+        for m in re.finditer(pat, rest):
+            try:
+                ranges.append(fn(m))
+            except ValueError:       # 13월, 2월 30일 등
+                continue
+            out["spans"].append(m.group(0))
+        rest = re.sub(pat, " ", rest)
+
+    if ranges:
+        out["date_from"] = min(r[0] for r in ranges).isoformat()
+        out["date_to"] = max(r[1] for r in ranges).isoformat()
+    elif _FUTURE.search(text) or any(w in text for w in RECENT_WORDS):
+        out["recent"] = True
+    for m in _FUTURE.finditer(text):
+        out["spans"].append(m.group(0))
+    out["spans"] += [w for w in RECENT_WORDS if w in text]
+    return out
+
+
+# ===== 카테고리/학과/대상 =====
+def _longest_match(text: str, table: Dict[str, str]) -> Optional[str]:
+    for key in sorted(table, key=len, reverse=True):
+        if key in text:
+            return table[key]
+    return None
+
+_NOT_DEPARTMENT = {"복수전공", "부전공", "연계전공", "융합전공", "다전공", "주전공"}
+
+def parse_department(text: str) -> Optional[str]:
+    for m in re.finditer(r"([가-힣]{2,}(?:학과|학부|전공))", text):
+        if m.group(1) not in _NOT_DEPARTMENT:
+            return m.group(1)
+    # 줄임말은 어절 경계를 보는 트라이 매칭 ('기간인지'의 '인지'는 무시)
+    for m in get_expander().matches(text):
+        if m.kind == "department":
+            return m.canonical
+    return None
+
+def _keywords(text: str) -> List[str]:
+    words = []
+    for w in re.findall(r"[가-힣A-Za-z0-9]+", text):
+        w = _JOSA.sub("", w)
+        if len(w) >= 2 and w not in _STOPWORDS:
+            words.append(w)
+    return list(dict.fromkeys(words))
+
+
+# ===== 질의 분석 =====
+def parse_query(query: str, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    LLM 요구사항 추출과 같은 형식의 dict + confidence/needs_context.
+    confidence ≥ RULE_CONFIDENCE 이면 그대로 검색에 사용한다.
+    """
+    text = (query or "").strip()
+    dates = parse_dates(text, today)
+
+    notice_hits = [c for c in NOTICE_CUES if c in text]
+    small_hits = [c for c in SMALLTALK_CUES if c in text]
+    category = _longest_match(text, CATEGORY_ALIASES)
+    department = parse_department(text)
+    audience = _longest_match(text, AUDIENCE_CUES)
+    terms = [t for t in ACADEMIC_TERMS if t in text.replace(" ", "")]
+
+    # 검색어: 날짜 표현은 메타데이터 필터로 넘기므로 본문 검색어에서 제거
+    search = text
+    for span in dates["spans"]:
+        search = search.replace(span, " ")
+    search = re.sub(r"\s+", " ", search).strip() or text
+
+    # 줄임말의 정식 명칭은 키워드에 추가 (검색어 확장은 챗봇에서 LLM 결과까지 포함해 한 번에)
+    canon = [m.canonical for m in get_expander().matches(search)]
+
+    related = bool(notice_hits or terms or category or department)
+    if related:
+        confidence = 0.6 + 0.2 * bool(dates["date_from"] or dates["recent"] or len(notice_hits) >= 2 or terms) \
+                         + 0.2 * bool(category or department or audience)
+    elif small_hits:
+        confidence = 0.9 if len(text) <= 20 else 0.6
+    else:
+        confidence = 0.2   # 단서 없음 → LLM 판단
+
+    return {
+        "is_notice_related": related,
+        "category": category,
+        "department": department,
+        "keywords": list(dict.fromkeys(terms + _keywords(search) + canon)),
+        "target_audience": audience,
+        "date_from": dates["date_from"],
+        "date_to": dates["date_to"],
+        "recent": dates["recent"],
+        "search_query": search,
+        "confidence": round(min(confidence, 1.0), 2),
+        "needs_context": any(c in text for c in CONTEXT_CUES),
+        "source": "rule",
+    }
+
+
+# ===== 회귀 예시 =====
+#   PYTHONPATH=src python -m uosai.preprocess.query_parser
+# (질의, 기준일, 기대 date_from, 기대 date_to)
+EXAMPLES: List[Tuple[str, date, Optional[str], Optional[str]]] = [
+    ("2024년 2학기 수강신청 공지", date(2025, 3, 1), "2024-05-01", "2024-12-31"),
+    ("2025년도 1학기 등록금 납부", date(2025, 3, 1), "2024-11-01", "2025-06-30"),
+    ("이번 학기 장학 공지", date(2025, 7, 1), "2025-05-01", "2025-12-31"),
+    ("이번 학기 휴학 신청", date(2025, 3, 15), "2024-11-01", "2025-06-30"),
+    ("지난 학기 성적 공지", date(2025, 7, 1), "2024-11-01", "2025-06-30"),
+    ("2학기 수강신청 언제야", date(2025, 3, 10), "2024-05-01", "2024-12-31"),
+    ("2학기 수강신청 언제야", date(2025, 6, 10), "2025-05-01", "2025-12-31"),
+    ("1학기 수강신청", date(2025, 12, 10), "2025-11-01", "2026-06-30"),
+    ("여름방학 기숙사 신청", date(2025, 6, 1), "2025-04-01", "2025-08-31"),
+    ("겨울 계절학기 신청", date(2025, 11, 1), "2025-10-01", "2026-02-28"),
+    ("계절학기 수강신청", date(2025, 5, 1), "2025-04-01", "2025-08-31"),
+    ("2024년 공지", date(2025, 1, 1), "2024-01-01", "2024-12-31"),
+    ("3월 수강신청", date(2025, 1, 1), "2025-02-01", "2025-03-31"),
+]
+
+def check_examples() -> List[str]:
+    """EXAMPLES 중 날짜 범위가 다르게 나오는 항목"""
+    fails = []
+    for q, today, want_from, want_to in EXAMPLES:
+        r = parse_query(q, today)
+        if (r["date_from"], r["date_to"]) != (want_from, want_to):
+            fails.append(f"{q!r} @{today}: {r['date_from']}~{r['date_to']} (expected {want_from}~{want_to})")
+    return fails
+
+
+if __name__ == "__main__":
+    import sys
+    failed = check_examples()
+    for f in failed:
+        print(f"FAIL {f}")
+    print(f"{len(EXAMPLES) - len(failed)}/{len(EXAMPLES)} ok")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,245 @@
+# src/uosai/train/train_intent.py : 공지/일반 대화 라우팅 분류기 학습 + 정확도/지연 리포트
+#
+#   PYTHONPATH=src python -m uosai.train.train_intent --from-db
+#   PYTHONPATH=src python -m uosai.train.train_intent --notice-csv data/notice_titles.csv
+#
+# 데이터
+# - 일반 대화(0): AIHUB 코퍼스 (용도별 목적 대화, 주제별 일상 대화, 일반 상식)
+#   uosai.preprocess.prepare_dataset 의 Parquet 또는 예전 노트북이 만든 CSV
+# - 공지 질문(1): notice 제목을 질문 템플릿에 넣어 생성 + 의도 질의셋(--intent-data) + 추가 CSV(text,label)
+#   data/bench 의 검색/리랭크 벤치마크 질의는 평가용이므로 섞지 않는다
+# - 평가: 템플릿 단위로 묶어 나눈 held-out 셋 (같은 템플릿 문장이 학습/평가 양쪽에 있으면 정확도가 부풀려짐)
+import os, sys, csv, json, random, re, time, argparse
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from uosai.common.utils import EMBED_MODEL, get_embedding_instance, fetch_all_rows
+from uosai.preprocess.intent import INTENT_MODEL_PATH, INTENT_LOW, INTENT_HIGH, IntentClassifier
+
+DEFAULT_SMALLTALK = [
+    "data/processed/용도별 목적 대화 데이터.parquet",   # uosai.preprocess.prepare_dataset 출력
+    "data/processed/주제별 일상 대화 데이터.parquet",
+    "data/processed/일반 상식.parquet",
+    "data/용도별 목적 대화 데이터.csv",
+    "data/주제별 일상 대화 데이터.csv",
+    "주제별 일상 대화 데이터.csv",      # 노트북이 저장소 루트에 쓰는 경우
+    "data/일반 상식.csv",
+]
+
+DEFAULT_INTENT_DATA = "data/intent/notice_queries.json"     # {"queries": [{"query": ...}]}, 없으면 건너뜀
+
+QUESTION_TEMPLATES = [
+    "{t}", "{t} 알려줘", "{t} 언제야?", "{t} 공지 있어?", "{t} 어떻게 신청해?",
+    "{t} 관련해서 궁금한 게 있어", "{k} 관련 공지 찾아줘", "{k} 언제까지야?", "{k} 신청 방법",
+]
+
+def log(msg: str) -> None:
+    print(f"[train_intent] {msg}")
+
+
+# ===== 데이터 =====
+def read_csv_texts(path: str, limit: int) -> List[str]:
+    """text 또는 query 열을 읽어 최대 limit개 (저수지 샘플링)"""
+    rnd = random.Random(0)
+    out: List[str] = []
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        col = "text" if "text" in (reader.fieldnames or []) else "query"
+        for i, row in enumerate(reader):
+            t = (row.get(col) or "").strip()
+            if not t:
+                continue
+            if len(out) < limit:
+                out.append(t)
+            else:
+                j = rnd.randint(0, i)
+                if j < limit:
+                    out[j] = t
+    return out
+
+def read_parquet_texts(path: str, limit: int) -> List[str]:
+    """text 또는 query 열, row group 단위로 읽다가 limit개에서 중단"""
+    import pyarrow.parquet as pq
+    pf = pq.ParquetFile(path)
+    col = "text" if "text" in pf.schema_arrow.names else "query"
+    out: List[str] = []
+    for batch in pf.iter_batches(columns=[col]):
+        out += [t for t in batch.column(0).to_pylist() if t]
+        if len(out) >= limit:
+            break
+    return out[:limit]
+
+def title_questions(titles: List[str], seed: int = 0) -> Tuple[List[str], List[str]]:
+    """제목 → (질문, 그룹). 그룹은 사용한 템플릿 ("tpl:번호")"""
+    rnd = random.Random(seed)
+    out, groups = [], []
+    for t in titles:
+        t = re.sub(r"^\s*[\[\(【<][^\]\)】>]*[\]\)】>]\s*", "", t).strip()   # [학사] 등 머리말 제거
+        if not t:
+            continue
+        words = [w for w in re.findall(r"[가-힣A-Za-z0-9]+", t) if len(w) >= 2 and not w.isdigit()]
+        k = " ".join(words[:2]) or t
+        i = rnd.randrange(len(QUESTION_TEMPLATES))
+        out.append(QUESTION_TEMPLATES[i].format(t=t, k=k))
+        groups.append(f"tpl:{i}")
+    return out, groups
+
+def read_intent_queries(path: Optional[str]) -> List[str]:
+    if not path or not os.path.exists(path):
+        return []
+    data = json.load(open(path, encoding="utf-8"))
+    return [q["query"] for q in data.get("queries", []) if q.get("query")]
+
+def load_dataset(args) -> Tuple[List[str], np.ndarray, List[str]]:
+    """(문장, 라벨, 그룹) — 템플릿으로 만든 질문은 템플릿별, 나머지는 문장마다 각자 그룹"""
+    neg: List[str] = []
+    for path in args.smalltalk:
+        if os.path.exists(path):
+            reader = read_parquet_texts if path.endswith(".parquet") else read_csv_texts
+            texts = reader(path, args.max_per_source)
+            log(f"smalltalk {path}: {len(texts)}")
+            neg += texts
+
+    titles: List[str] = []
+    if args.from_db:
+        titles += [r["title"] for r in fetch_all_rows()]
+    if args.notice_csv:
+        titles += read_csv_texts(args.notice_csv, 10 ** 9)
+    pos, pos_groups = title_questions(titles)
+    queries = read_intent_queries(args.intent_data)
+    if queries:
+        log(f"intent queries {args.intent_data}: {len(queries)}")
+    pos += queries
+
+    extra_pos, extra_neg = [], []
+    if args.extra_csv:
+        with open(args.extra_csv, encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                (extra_pos if str(row.get("label")) == "1" else extra_neg).append(row["text"])
+    pos += extra_pos
+    neg += extra_neg
+
+    if not pos or not neg:
+        raise SystemExit("need both notice (--from-db/--notice-csv/--intent-data/--extra-csv) and smalltalk data")
+    log(f"dataset: notice={len(pos)} smalltalk={len(neg)}")
+    texts = pos + neg
+    y = np.concatenate([np.ones(len(pos)), np.zeros(len(neg))]).astype(np.float32)
+    groups = pos_groups + [f"row:{i}" for i in range(len(pos_groups), len(texts))]
+    return texts, y, groups
+
+def group_split(groups: List[str], test_size: float, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    그룹 단위 held-out 분할 → (train 인덱스, test 인덱스).
+    질문 템플릿은 전체 템플릿 중 test_size 비율(최소 1개)을 통째로 평가셋에 두고, 나머지 문장은 무작위로 나눈다.
+    """
+    rng = np.random.default_rng(seed)
+    g = np.asarray(groups)
+    templates = sorted({x for x in groups if x.startswith("tpl:")})
+    held = set(rng.permutation(templates)[:max(1, round(len(templates) * test_size))]) if templates else set()
+    is_test = np.isin(g, list(held)) if held else np.zeros(len(g), dtype=bool)
+    rest = np.flatnonzero(~np.char.startswith(g.astype(str), "tpl:"))
+    is_test[rng.permutation(rest)[:int(len(rest) * test_size)]] = True
+    return np.flatnonzero(~is_test), np.flatnonzero(is_test)
+
+
+# ===== 학습 =====
+def train_logreg(X: np.ndarray, y: np.ndarray, epochs: int, lr: float, l2: float) -> Tuple[np.ndarray, float]:
+    """클래스 가중치를 맞춘 L2 로지스틱 회귀 (full-batch 경사하강)"""
+    n, d = X.shape
+    pos = y.sum()
+    sw = np.where(y == 1, n / (2 * max(pos, 1)), n / (2 * max(n - pos, 1))).astype(np.float32)
+    w = np.zeros(d, dtype=np.float32)
+    b = 0.0
+    for ep in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(X @ w + b)))
+        g = sw * (p - y)
+        w -= lr * (X.T @ g / n + l2 * w)
+        b -= lr * float(g.mean())
+        if (ep + 1) % max(1, epochs // 5) == 0:
+            loss = float(-(sw * (y * np.log(p + 1e-7) + (1 - y) * np.log(1 - p + 1e-7))).mean())
+            log(f"epoch {ep + 1}/{epochs} loss={loss:.4f}")
+    return w, b
+
+
+def evaluate(clf: IntentClassifier, X: np.ndarray, y: np.ndarray) -> dict:
+    p = np.array([clf.predict_proba(x) for x in X])
+    pred = p >= 0.5
+    tp = int((pred & (y == 1)).sum()); fp = int((pred & (y == 0)).sum()); fn = int((~pred & (y == 1)).sum())
+    routed = (p >= clf.high) | (p <= clf.low)
+    routed_acc = float(((p[routed] >= 0.5) == (y[routed] == 1)).mean()) if routed.any() else 0.0
+    return {
+        "accuracy": float((pred == (y == 1)).mean()),
+        "precision": tp / max(tp + fp, 1),
+        "recall": tp / max(tp + fn, 1),
+        "coverage": float(routed.mean()),       # LLM 없이 라우팅된 비율
+        "routed_accuracy": routed_acc,          # 그중 정답 비율
+        "thresholds": {"low": clf.low, "high": clf.high},
+    }
+
+
+def measure_latency(clf: IntentClassifier, emb, samples: List[str], n: int = 2000) -> dict:
+    x = np.asarray(emb.embed_query(samples[0]), dtype=np.float32)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        clf.predict_proba(x)
+    predict_us = (time.perf_counter() - t0) / n * 1e6
+
+    embed_ms = []
+    for s in samples[:50]:
+        t0 = time.perf_counter()
+        emb.embed_query(s)
+        embed_ms.append((time.perf_counter() - t0) * 1000)
+    return {"predict_us": round(predict_us, 2),
+            "embed_ms_p50": round(float(np.percentile(embed_ms, 50)), 2),
+            "embed_ms_p95": round(float(np.percentile(embed_ms, 95)), 2)}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Train notice/smalltalk intent classifier")
+    ap.add_argument("--smalltalk", nargs="*", default=DEFAULT_SMALLTALK)
+    ap.add_argument("--from-db", action="store_true", help="notice 제목으로 공지 질문 생성")
+    ap.add_argument("--notice-csv", help="공지 제목 CSV (text 열)")
+    ap.add_argument("--intent-data", default=DEFAULT_INTENT_DATA, help="공지 의도 질의셋 JSON (data/bench 는 쓰지 않음)")
+    ap.add_argument("--extra-csv", help="추가 라벨 데이터 CSV (text,label[1=공지])")
+    ap.add_argument("--max-per-source", type=int, default=20000)
+    ap.add_argument("--epochs", type=int, default=300)
+    ap.add_argument("--lr", type=float, default=2.0)
+    ap.add_argument("--l2", type=float, default=1e-4)
+    ap.add_argument("--test-size", type=float, default=0.2)
+    ap.add_argument("--out", default=INTENT_MODEL_PATH)
+    args = ap.parse_args()
+
+    texts, y, groups = load_dataset(args)
+    emb = get_embedding_instance()
+    t0 = time.perf_counter()
+    X = np.asarray(emb.embed_documents(texts), dtype=np.float32)
+    X /= np.linalg.norm(X, axis=1, keepdims=True) + 1e-12
+    log(f"embedded {len(texts)} texts in {time.perf_counter() - t0:.1f}s")
+
+    tr, te = group_split(groups, args.test_size)
+    held_templates = sorted({groups[i] for i in te if groups[i].startswith("tpl:")})
+    log(f"split: train={len(tr)} test={len(te)} held-out templates={held_templates}")
+
+    w, b = train_logreg(X[tr], y[tr], args.epochs, args.lr, args.l2)
+    clf = IntentClassifier(w, b, embed_model=EMBED_MODEL, low=INTENT_LOW, high=INTENT_HIGH)
+    clf.save(args.out)
+
+    report = {
+        "model": args.out,
+        "embed_model": EMBED_MODEL,
+        "train": len(tr), "test": len(te),
+        "held_out_templates": [QUESTION_TEMPLATES[int(t[4:])] for t in held_templates],
+        "test_metrics": evaluate(clf, X[te], y[te]),
+        "latency": measure_latency(clf, emb, [texts[i] for i in te[:50]] or texts[:50]),
+    }
+    report_path = os.path.splitext(args.out)[0] + "_report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    log(f"saved {args.out}, report {report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())